@@ -0,0 +1,138 @@
+# bench_transport.py
+# Benchmark of the command transports (transport.py): one-way latency and maximum
+# sustained message rate. The receiver runs in its own process, like the controller.
+#
+#   python bench_transport.py [--transports tcp udp shm] [--messages 2000] [--rate-messages 100000]
+#
+# One-way latency = receive time - Frame.sent_at (same-host clock, latency_stats.clock).
+# --poll-interval emulates the controller polling once per simulation step.
+# The receiver is a separate interpreter (not multiprocessing) so it has its own
+# shared-memory resource tracker, exactly like the Webots controller.
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from command_protocol import encode_command
+from latency_stats import clock
+from transport import DISCONNECT, FRAME, TRANSPORTS, connect, create_server
+
+BENCH_PORT = 10030
+BENCH_SHM_NAME = "group46_bench"
+IDLE_TIMEOUT = 2.0   # s without frames before the receiver gives up
+
+
+def receiver(kind, port, poll_interval, result_path):
+    server = create_server(kind, "127.0.0.1", port, BENCH_SHM_NAME)
+    print("ready", flush=True)
+    latencies = []
+    seqs = []
+    first_recv = last_recv = None
+    last_activity = clock()
+    try:
+        while True:
+            events = server.poll()
+            now = clock()
+            done = False
+            for event, _, value in events:
+                if event == FRAME:
+                    latencies.append(now - value.sent_at)
+                    seqs.append(value.seq)
+                    if first_recv is None:
+                        first_recv = now
+                    last_recv = now
+                elif event == DISCONNECT:
+                    done = True
+            if events:
+                last_activity = now
+            if done or now - last_activity > IDLE_TIMEOUT:
+                break
+            time.sleep(poll_interval)   # sleep(0) still yields the CPU to the sender
+    finally:
+        server.close()
+    np.savez(result_path, latencies=np.array(latencies), seqs=np.array(seqs, dtype=np.int64),
+             first_recv=np.float64(first_recv or 0.0), last_recv=np.float64(last_recv or 0.0))
+
+
+def run_phase(kind, port, count, interval, payload, poll_interval):
+    """Send `count` frames (`interval` s apart, 0 = back to back) and collect receiver results."""
+    fd, result_path = tempfile.mkstemp(suffix=".npz")
+    os.close(fd)
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--receiver", kind, "--port", str(port),
+         "--poll-interval", str(poll_interval), "--result", result_path],
+        stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()   # "ready": the server is listening
+
+    link = connect(kind, "127.0.0.1", port, BENCH_SHM_NAME)
+    body = bytes(payload)
+    first_sent = clock()
+    next_send = first_sent
+    for seq in range(count):
+        if interval:
+            delay = next_send - clock()
+            if delay > 0:
+                time.sleep(delay)
+            next_send += interval
+        link.sendall(encode_command("FORWARD", seq, body=body))
+    send_elapsed = clock() - first_sent
+    # Let the last datagrams / ring bytes drain before announcing the close
+    time.sleep(0.05)
+    link.close()
+
+    proc.wait()
+    with np.load(result_path) as data:
+        latencies, seqs, last_recv = data["latencies"], data["seqs"], float(data["last_recv"])
+    os.remove(result_path)
+    return latencies, seqs, first_sent, send_elapsed, last_recv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark command transports")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS))
+    parser.add_argument("--messages", type=int, default=2000, help="frames for the latency run")
+    parser.add_argument("--interval", type=float, default=0.001,
+                        help="seconds between frames in the latency run")
+    parser.add_argument("--rate-messages", type=int, default=100000,
+                        help="frames sent back to back for the throughput run")
+    parser.add_argument("--payload", type=int, default=0,
+                        help="extra body bytes per frame (an encoded FrameTrace is ~150)")
+    parser.add_argument("--poll-interval", type=float, default=0.0,
+                        help="receiver sleep between polls (0 = busy poll, 0.016 = 16 ms step)")
+    parser.add_argument("--port", type=int, default=BENCH_PORT)
+    parser.add_argument("--receiver", choices=TRANSPORTS, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.receiver:
+        receiver(args.receiver, args.port, args.poll_interval, args.result)
+        return
+
+    print(f"[Bench] {args.messages} frames every {args.interval * 1000:.1f} ms for latency, "
+          f"{args.rate_messages} back to back for throughput, payload {args.payload} B")
+    rows = []
+    for kind in args.transports:
+        latencies, seqs, _, _, _ = run_phase(
+            kind, args.port, args.messages, args.interval, args.payload, args.poll_interval)
+        us = latencies * 1e6
+        p50, p95, p99 = np.percentile(us, [50, 95, 99]) if len(us) else (np.nan,) * 3
+
+        _, rate_seqs, first_sent, send_elapsed, last_recv = run_phase(
+            kind, args.port, args.rate_messages, 0.0, args.payload, args.poll_interval)
+        received = len(rate_seqs)
+        rate = received / (last_recv - first_sent) if received else 0.0
+        lost = args.rate_messages - received
+        rows.append((kind, p50, p95, p99, len(us), rate, lost, args.rate_messages / send_elapsed))
+
+    print(f"\n{'transport':10s} {'p50 us':>9s} {'p95 us':>9s} {'p99 us':>9s} {'recv':>6s}"
+          f" {'msg/s recv':>12s} {'lost':>7s} {'msg/s send':>12s}")
+    for kind, p50, p95, p99, n, rate, lost, send_rate in rows:
+        print(f"{kind:10s} {p50:9.1f} {p95:9.1f} {p99:9.1f} {n:6d} {rate:12.0f} {lost:7d} {send_rate:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
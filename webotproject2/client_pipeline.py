@@ -0,0 +1,97 @@
+# client_pipeline.py
+# Threaded stage helpers for the pipelined gesture client (capture -> detect -> classify).
+import collections
+import queue
+import threading
+import time
+
+
+class LatestQueue:
+    """
+    Bounded queue with a "drop stale, keep newest" policy.
+    When full, put() discards the oldest item instead of blocking,
+    so a slow consumer always works on the most recent data.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest remaining item, raising queue.Empty after timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+    def get_nowait(self):
+        with self._cond:
+            if not self._items:
+                raise queue.Empty
+            return self._items.popleft()
+
+
+class StageThread(threading.Thread):
+    """
+    One pipeline stage running in its own thread.
+
+    fn(item) is called for every item taken from inbox (or fn() with no
+    argument for a source stage without inbox). A non-None return value is
+    pushed to every queue in outboxes. Returning StageThread.STOP, or the
+    stop event being set, ends the stage.
+    """
+
+    STOP = object()
+    POLL_TIMEOUT = 0.1  # s, how often an idle stage re-checks the stop event
+
+    def __init__(self, name, fn, stop_event, inbox=None, outboxes=()):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.stop_event = stop_event
+        self.inbox = inbox
+        self.outboxes = list(outboxes)
+        self.processed = 0
+        self.busy_time = 0.0
+        self.error = None
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                if self.inbox is None:
+                    t0 = time.perf_counter()
+                    out = self.fn()
+                else:
+                    try:
+                        item = self.inbox.get(timeout=self.POLL_TIMEOUT)
+                    except queue.Empty:
+                        continue
+                    t0 = time.perf_counter()
+                    out = self.fn(item)
+                self.busy_time += time.perf_counter() - t0
+                self.processed += 1
+
+                if out is StageThread.STOP:
+                    break
+                if out is not None:
+                    for q in self.outboxes:
+                        q.put(out)
+        except Exception as e:
+            self.error = e
+            print(f"[Pipeline] Stage {self.name} failed: {e}")
+        finally:
+            # Any stage ending (camera closed, error) shuts the whole pipeline down
+            self.stop_event.set()
+
+    def summary(self):
+        avg_ms = self.busy_time / self.processed * 1000.0 if self.processed else 0.0
+        return f"{self.name}: {self.processed} items, {avg_ms:.2f} ms/item"
@@ -0,0 +1,64 @@
+# command_driver.py
+# Scripted command client: sends a fixed sequence of commands to the controller,
+# e.g. to test arbitration against a running gesture client.
+#
+#   python command_driver.py FORWARD 2 TURN_LEFT 0.5 STOP
+#   python command_driver.py --priority 5 --name tester EMERGENCY_STOP
+#
+# Numbers are pauses in seconds, everything else is a command name (COMMAND_OPCODES).
+import argparse
+import time
+
+from command_protocol import COMMAND_OPCODES, CommandSender
+from transport import DEFAULT_HOST, DEFAULT_PORT, TRANSPORTS, connect
+
+KEEPALIVE_INTERVAL = 1.0   # s, longest sleep between keepalive checks during a pause
+
+
+def parse_steps(items):
+    steps = []
+    for item in items:
+        try:
+            steps.append(float(item))
+        except ValueError:
+            cmd = item.upper()
+            if cmd not in COMMAND_OPCODES:
+                raise SystemExit(f"Unknown command {item!r}, expected one of {sorted(COMMAND_OPCODES)}")
+            steps.append(cmd)
+    return steps
+
+
+def pause(sender, seconds):
+    """Sleep, keeping the client registered over links that expire silent clients."""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        time.sleep(min(end - time.monotonic(), KEEPALIVE_INTERVAL))
+        sender.keepalive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a scripted command sequence to the controller")
+    parser.add_argument("steps", nargs="+", help="command names and pauses (seconds)")
+    parser.add_argument("--name", default="driver")
+    parser.add_argument("--priority", type=int, default=0, help="arbitration priority (0-255)")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="tcp")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    steps = parse_steps(args.steps)
+
+    sender = CommandSender(connect(args.transport, args.host, args.port))
+    sender.hello(args.name, args.priority)
+    try:
+        for step in steps:
+            if isinstance(step, float):
+                pause(sender, step)
+            else:
+                sender.send(step)
+                print(f"[Driver] Sent: {step}")
+    finally:
+        sender.close()
+
+
+if __name__ == "__main__":
+    main()
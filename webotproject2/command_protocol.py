@@ -0,0 +1,203 @@
+# command_protocol.py
+# Length-prefixed binary command frames between gesture_client.py and the controller.
+#
+# Frame layout (network byte order):
+#   length   u16   number of bytes that follow (header + body)
+#   opcode   u8    command, see COMMAND_OPCODES
+#   seq      u32   per-sender sequence number (wraps at 2**32)
+#   sent_at  f64   send timestamp, latency_stats.clock() seconds
+#   body     ...   optional payload (e.g. an encoded FrameTrace)
+#
+# VELOCITY frames (streaming mode) start their body with two f32 values,
+# linear (m/s) and angular (rad/s), followed by the optional trace.
+# A HELLO frame (optional, first frame of a client) carries a u8 arbitration
+# priority followed by the client name in UTF-8. Over links that forget silent
+# clients (UDP, see transport.UDP_IDLE_TIMEOUT) CommandSender.keepalive() repeats it
+# whenever nothing was sent for half the timeout; clients call it once per frame.
+#
+# FrameDecoder is incremental: feed() accepts any chunking of the byte stream and
+# returns every complete frame, so several commands arriving in one segment are
+# all delivered and a frame split across segments is reassembled.
+import struct
+from collections import namedtuple
+
+from latency_stats import clock
+
+LENGTH = struct.Struct("!H")
+HEADER = struct.Struct("!BId")
+VELOCITY_BODY = struct.Struct("!ff")
+HELLO_BODY = struct.Struct("!B")
+MAX_FRAME_SIZE = 0xFFFF
+
+COMMAND_OPCODES = {
+    "STOP": 0x01,
+    "FORWARD": 0x02,
+    "BACKWARD": 0x03,
+    "TURN_LEFT": 0x04,
+    "TURN_RIGHT": 0x05,
+    "SPEED_UP": 0x06,
+    "SLOW_DOWN": 0x07,
+    "EMERGENCY_STOP": 0x08,
+    "PARK": 0x09,
+}
+OPCODE_COMMANDS = {op: name for name, op in COMMAND_OPCODES.items()}
+
+OP_VELOCITY = 0x10   # continuous (linear, angular) setpoint
+OP_HELLO = 0x20      # client name and arbitration priority
+
+Frame = namedtuple("Frame", ["opcode", "seq", "sent_at", "body"])
+
+
+class ProtocolError(Exception):
+    """Raised when the byte stream cannot be decoded as command frames."""
+
+
+def command_name(frame):
+    """Command string of a frame, or None for an unknown opcode."""
+    return OPCODE_COMMANDS.get(frame.opcode)
+
+
+def encode_frame(opcode, seq, sent_at=None, body=b""):
+    if sent_at is None:
+        sent_at = clock()
+    length = HEADER.size + len(body)
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    return LENGTH.pack(length) + HEADER.pack(opcode, seq & 0xFFFFFFFF, sent_at) + body
+
+
+def encode_command(cmd, seq, sent_at=None, body=b""):
+    opcode = COMMAND_OPCODES.get(cmd)
+    if opcode is None:
+        raise ProtocolError(f"Unknown command: {cmd}")
+    return encode_frame(opcode, seq, sent_at, body)
+
+
+def encode_velocity(linear, angular, seq, sent_at=None, body=b""):
+    return encode_frame(OP_VELOCITY, seq, sent_at, VELOCITY_BODY.pack(linear, angular) + body)
+
+
+def decode_velocity(frame):
+    """(linear, angular, remaining body) of a VELOCITY frame."""
+    if len(frame.body) < VELOCITY_BODY.size:
+        raise ProtocolError("Truncated velocity frame")
+    linear, angular = VELOCITY_BODY.unpack_from(frame.body)
+    return linear, angular, frame.body[VELOCITY_BODY.size:]
+
+
+def encode_hello(name, priority, seq, sent_at=None):
+    return encode_frame(OP_HELLO, seq, sent_at, HELLO_BODY.pack(priority) + name.encode("utf-8"))
+
+
+def decode_hello(frame):
+    """(name, priority) of a HELLO frame."""
+    if len(frame.body) < HELLO_BODY.size:
+        raise ProtocolError("Truncated hello frame")
+    (priority,) = HELLO_BODY.unpack_from(frame.body)
+    return frame.body[HELLO_BODY.size:].decode("utf-8", "replace"), priority
+
+
+class FrameDecoder:
+    """Reassembles frames from arbitrary chunks of a byte stream."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.frames = 0
+
+    def feed(self, data):
+        """Append received bytes and return the list of complete frames (possibly empty)."""
+        buf = self._buf
+        buf += data
+        frames = []
+        pos = 0
+        end = len(buf)
+
+        while end - pos >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(buf, pos)
+            if length < HEADER.size:
+                raise ProtocolError(f"Invalid frame length {length}")
+            if end - pos - LENGTH.size < length:
+                break  # incomplete frame, wait for more data
+            start = pos + LENGTH.size
+            opcode, seq, sent_at = HEADER.unpack_from(buf, start)
+            body = bytes(buf[start + HEADER.size:start + length])
+            frames.append(Frame(opcode, seq, sent_at, body))
+            pos = start + length
+
+        if pos:
+            del buf[:pos]
+        self.frames += len(frames)
+        return frames
+
+
+class SequenceTracker:
+    """Counts frames missing or reordered between consecutive sequence numbers."""
+
+    def __init__(self):
+        self.last_seq = None
+        self.lost = 0
+        self.reordered = 0
+
+    def update(self, seq):
+        if self.last_seq is not None:
+            gap = (seq - self.last_seq) & 0xFFFFFFFF
+            if gap == 0 or gap > 0x7FFFFFFF:
+                self.reordered += 1
+                return
+            self.lost += gap - 1
+        self.last_seq = seq
+
+
+class CommandSender:
+    """
+    Sends framed commands with a running sequence number over a connected socket
+    or any transport.py client (anything with sendall() and close()).
+    """
+
+    def __init__(self, link):
+        self.link = link
+        self.seq = 0
+        self._hello = None       # (name, priority) to repeat after idle_timeout / 2 of silence
+        self._last_send = clock()
+
+    def keepalive(self):
+        """
+        Repeat the HELLO if the link drops silent clients (idle_timeout) and nothing was
+        sent for half that time. Cheap enough to call on every frame or loop iteration.
+        """
+        idle_timeout = getattr(self.link, "idle_timeout", None)
+        if self._hello is not None and idle_timeout is not None and clock() - self._last_send > idle_timeout / 2:
+            self._send_hello()
+
+    def _sendall(self, data):
+        self.link.sendall(data)
+        self.seq += 1
+        self._last_send = clock()
+
+    def _send_hello(self):
+        self._sendall(encode_hello(*self._hello, self.seq))
+
+    def _trace_body(self, trace):
+        if trace is None:
+            return None, b""
+        trace.mark("send")
+        return trace.marks[-1][1], trace.encode().encode("utf-8")
+
+    def send(self, cmd, trace=None):
+        """trace: optional FrameTrace, marked "send" and attached as the frame body."""
+        self.keepalive()
+        sent_at, body = self._trace_body(trace)
+        self._sendall(encode_command(cmd, self.seq, sent_at, body))
+
+    def send_velocity(self, linear, angular, trace=None):
+        self.keepalive()
+        sent_at, body = self._trace_body(trace)
+        self._sendall(encode_velocity(linear, angular, self.seq, sent_at, body))
+
+    def hello(self, name, priority=0):
+        """Introduce this client to the controller's arbitration (0-255, higher wins)."""
+        self._hello = (name, priority)
+        self._send_hello()
+
+    def close(self):
+        self.link.close()
@@ -0,0 +1,82 @@
+# arbitration.py
+# Decides which of several connected command clients (gesture client, keyboard
+# bridge, scripted test drivers, ...) may drive the robot.
+#
+#   last_writer  every client's command is applied, the most recent one wins
+#   priority     the client that last drove the robot ("owner") keeps control until
+#                it disconnects or stays silent for hold_time seconds; meanwhile only
+#                clients with an equal or higher priority can take over
+#
+# EMERGENCY_STOP is accepted from any client under every policy.
+# Clients announce their name and priority with a HELLO frame (command_protocol.py);
+# clients that never do are "client<id>" with DEFAULT_PRIORITY.
+from command_protocol import COMMAND_OPCODES, SequenceTracker
+
+POLICIES = ("last_writer", "priority")
+DEFAULT_PRIORITY = 0
+ALWAYS_ACCEPTED = {COMMAND_OPCODES["EMERGENCY_STOP"]}
+
+
+class ClientState:
+    """Per-client bookkeeping: identity, frame counts and sequence tracking."""
+
+    def __init__(self, client, peer):
+        self.client = client
+        self.peer = peer
+        self.name = f"client{client}"
+        self.priority = DEFAULT_PRIORITY
+        self.frames = 0
+        self.rejected = 0
+        self.seq = SequenceTracker()
+
+    def describe(self):
+        return f"{self.name} (id={self.client}, priority={self.priority}, {self.peer})"
+
+
+class CommandArbiter:
+    def __init__(self, policy="last_writer", hold_time=1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown arbitration policy {policy!r}, expected one of {POLICIES}")
+        self.policy = policy
+        self.hold_time = hold_time
+        self.clients = {}
+        self.owner = None          # client id whose commands currently drive the robot
+        self.owner_since = 0.0     # time of the owner's last accepted command
+
+    def connect(self, client, peer):
+        state = self.clients[client] = ClientState(client, peer)
+        return state
+
+    def hello(self, client, name, priority):
+        state = self.clients.get(client)
+        if state is None:
+            return
+        state.name = name
+        state.priority = priority
+
+    def disconnect(self, client):
+        """Forget a client; returns (state, was_owner)."""
+        state = self.clients.pop(client, None)
+        was_owner = client == self.owner
+        if was_owner:
+            self.owner = None
+        return state, was_owner
+
+    def accept(self, client, frame, now):
+        """True if this motion/velocity frame from client may be applied now."""
+        state = self.clients.get(client)
+        if state is None:
+            return False
+        if self.policy == "priority" and self.owner not in (None, client):
+            owner = self.clients.get(self.owner)
+            expired = now - self.owner_since > self.hold_time
+            if (frame.opcode not in ALWAYS_ACCEPTED and not expired
+                    and owner is not None and state.priority < owner.priority):
+                state.rejected += 1
+                return False
+
+        if client != self.owner:
+            self.owner = client
+            print(f"[Controller] Control taken by {state.describe()}")
+        self.owner_since = now
+        return True
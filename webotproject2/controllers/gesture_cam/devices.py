@@ -0,0 +1,121 @@
+# devices.py
+# Write-coalescing wrappers for the e-puck actuators used by gesture_cam.py.
+#
+# Every Webots setter call is forwarded to the simulator, even when it writes the
+# value the device already has. The wrappers remember the last value written and
+# only forward changes:
+#   CachedMotor  setVelocity() only when the velocity differs from the last one
+#   LedBank      the on/off state of led0..led9 as one bitmask; a pattern is applied
+#                as the diff against the current mask (LED_PATTERNS are precomputed)
+# With cache=False every write is forwarded, and an LED pattern is applied the way
+# the controller originally did it (all LEDs off, then the pattern on). This gives
+# the "before" numbers for DeviceStats, which counts forwarded and skipped writes
+# and the controller time per simulation step.
+import json
+
+from latency_stats import RollingPercentiles
+
+NUM_LEDS = 10
+
+
+def led_mask(indices):
+    """Bitmask with the bits of the given LED indices set."""
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+# Command -> LEDs that are on (led0~7 ring, led8 body, led9 front); other commands: all off
+LED_PATTERNS = {
+    "STOP": led_mask([8]),
+    "FORWARD": led_mask(range(8)),
+    "BACKWARD": led_mask([4, 5, 6, 7]),
+    "TURN_LEFT": led_mask([5, 6, 7]),
+    "TURN_RIGHT": led_mask([1, 2, 3]),
+    "SPEED_UP": led_mask([1, 7, 0]),
+    "SLOW_DOWN": led_mask([3, 4, 5]),
+    "PARK": led_mask([8, 9]),
+}
+
+
+class DeviceStats:
+    """Forwarded / skipped writes per device kind and controller time per step."""
+
+    def __init__(self, window=4096):
+        self.writes = {"motor": 0, "led": 0}
+        self.skipped = {"motor": 0, "led": 0}
+        self.step_time = RollingPercentiles(window)
+
+    def report(self):
+        return {"writes": dict(self.writes), "skipped": dict(self.skipped),
+                "step_time": self.step_time.summary()}
+
+    def print_summary(self, prefix):
+        s = self.step_time.summary()
+        if s["count"]:
+            print(f"{prefix} {s['count']} steps, controller time per step: mean={s['mean_ms'] * 1000:.1f} us  "
+                  f"p50={s['p50_ms'] * 1000:.1f} us  p99={s['p99_ms'] * 1000:.1f} us")
+        for kind in self.writes:
+            print(f"{prefix} {kind} writes: {self.writes[kind]} forwarded, {self.skipped[kind]} skipped")
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"[Devices] Written to {path}")
+
+
+class CachedMotor:
+    """A velocity-controlled motor that only forwards velocity changes."""
+
+    def __init__(self, motor, stats, cache=True):
+        self.motor = motor
+        self.stats = stats
+        self.cache = cache
+        self.velocity = None   # last velocity written, None = unknown
+
+    def set_velocity(self, velocity):
+        if self.cache and velocity == self.velocity:
+            self.stats.skipped["motor"] += 1
+            return
+        self.motor.setVelocity(velocity)
+        self.velocity = velocity
+        self.stats.writes["motor"] += 1
+
+
+class LedBank:
+    """led0..led9 driven as one bitmask; apply() only writes the LEDs that change."""
+
+    def __init__(self, leds, stats, cache=True):
+        self.leds = dict(leds)   # index -> LED device, missing LEDs are skipped
+        self.present = led_mask(self.leds)
+        self.stats = stats
+        self.cache = cache
+        self.mask = None         # LEDs currently on, None = unknown (first apply writes all)
+
+    def apply(self, mask):
+        mask &= self.present
+        if not self.cache:
+            # Original behaviour: every LED off, then the pattern on
+            for led in self.leds.values():
+                led.set(0)
+            self.stats.writes["led"] += len(self.leds)
+            self._write(mask, mask)
+            self.mask = mask
+            return
+        changed = self.present if self.mask is None else mask ^ self.mask
+        self.stats.skipped["led"] += len(self.leds) - bin(changed).count("1")
+        self._write(changed, mask)
+        self.mask = mask
+
+    def _write(self, bits, mask):
+        while bits:
+            low = bits & -bits
+            i = low.bit_length() - 1
+            self.leds[i].set(1 if mask & low else 0)
+            self.stats.writes["led"] += 1
+            bits ^= low
+
+    def show(self, cmd):
+        """Show the pattern of a command (all LEDs off for commands without one)."""
+        self.apply(LED_PATTERNS.get(cmd, 0))
@@ -0,0 +1,111 @@
+# experiment_log.py
+# Background CSV logging for the controller's experiment results and event streams.
+#
+# log() only appends the row to a queue.SimpleQueue (put never blocks and takes no
+# Python-level lock), so writing results never stalls robot.step. A daemon thread
+# collects rows for up to FLUSH_INTERVAL after the first one arrives, groups them per
+# stream and writes each group with one writerows() call into files it keeps open,
+# flushing after every batch. close() (also registered with atexit) writes what was
+# logged before it and closes the files.
+#
+#   log = ExperimentLog()
+#   log.register("trials", "results_trials.csv", ["participant", "mode", ...])
+#   log.log("trials", [PARTICIPANT_ID, CONTROL_MODE, ...])
+import atexit
+import csv
+import queue
+import threading
+import time
+
+FLUSH_INTERVAL = 0.5   # s, longest time a row waits in the queue before it is written
+BATCH_SIZE = 4096      # max. rows per batch
+_STOP = object()
+
+
+class ExperimentLog:
+    """Named CSV streams written by one background thread."""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.streams = {}    # name -> (path, header)
+        self.rows_logged = 0
+        self.rows_written = 0
+        self.batches = 0
+        self._queue = queue.SimpleQueue()
+        self._files = {}     # name -> (file, csv writer), only used by the writer thread
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="experiment-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def register(self, name, path, header):
+        """Declare a CSV stream; the header is written if the file is new or empty."""
+        self.streams[name] = (path, list(header))
+
+    def log(self, name, row):
+        """Queue one row for stream `name`. Never blocks."""
+        if name not in self.streams:
+            raise KeyError(f"Unknown log stream {name!r}")
+        self.rows_logged += 1
+        self._queue.put((name, row))
+
+    def close(self, timeout=5.0):
+        """Write every row logged so far, close the files and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"[Exp] Log writer did not finish within {timeout} s, "
+                  f"{self.rows_logged - self.rows_written} rows may be lost")
+
+    # ========= Writer thread =========
+    def _run(self):
+        item = None
+        while item is not _STOP:
+            item = self._queue.get()   # sleeps until the first row arrives
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _STOP:
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._write(batch)
+        for f, _ in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def _write(self, batch):
+        grouped = {}
+        for name, row in batch:
+            grouped.setdefault(name, []).append(row)
+        for name, rows in grouped.items():
+            path = self.streams[name][0]
+            try:
+                f, writer = self._open(name)
+                writer.writerows(rows)
+                f.flush()
+                self.rows_written += len(rows)
+            except OSError as e:
+                print(f"[Exp] Failed to write {len(rows)} rows to {path}: {e}")
+        if batch:
+            self.batches += 1
+
+    def _open(self, name):
+        entry = self._files.get(name)
+        if entry is None:
+            path, header = self.streams[name]
+            f = open(path, "a", newline="", encoding="utf-8")
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(header)
+            entry = self._files[name] = (f, writer)
+            print("[Exp] Logging to", path)
+        return entry
@@ -1,13 +1,46 @@
 # E:\webotproject2\controllers\gesture_cam\gesture_cam.py
 from controller import Robot, Keyboard
-import socket
-import select
 import time
-import csv
 import os
+import sys
+
+# Shared modules from the project root (command_protocol.py, latency_stats.py, ...)
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+sys.path.insert(0, PROJECT_DIR)
+from command_protocol import OP_HELLO, OP_VELOCITY, ProtocolError, command_name, decode_hello, decode_velocity
+from latency_stats import FrameTrace, LatencyStats, clock
+from transport import CONNECT, DISCONNECT, FRAME, create_server
+from arbitration import CommandArbiter
+from devices import CachedMotor, DeviceStats, LedBank
+from experiment_log import ExperimentLog
+from odometry import create_odometry
+from park_assist import ParkAssist
+from telemetry import TelemetryRecorder
 
 HOST = '0.0.0.0'
 PORT = 10020
+# Command transport: "tcp" (default), "udp" or "shm" (shared-memory ring, same host);
+# the client must use the same one (gesture_client.py --transport)
+TRANSPORT = "tcp"
+# Several clients may be connected at once (gesture client, keyboard bridge, test drivers):
+# "last_writer" applies every command, "priority" lets the current driver keep control
+# for ARBITRATION_HOLD seconds against lower-priority clients (see arbitration.py)
+ARBITRATION_POLICY = "last_writer"
+ARBITRATION_HOLD = 1.0  # s
+# Actuator writes: True = only forward changed motor velocities / LED states (devices.py),
+# False = write every value every time (to measure the difference, see DEVICE_STATS_FILE)
+DEVICE_WRITE_CACHE = True
+DEVICE_STATS_FILE = "device_stats.json"
+# Pose tracking: "auto" (lib/odometry.c if built with 'python odometry.py --build',
+# else pure Python), "native" or "python"; see odometry.py
+ODOMETRY_BACKEND = "auto"
+# Autonomous parking (PARK command, 'G' key; see park_assist.py). World poses
+# (x m, y m, heading rad) from worlds/gesture_world.wbt: the red parking square, and the
+# robot at controller start (later task starts 'B' are tracked through the odometry)
+PARK_POSE = (1.13, -1.145, 0.0)
+ROBOT_START_POSE = (-0.065, -0.031, -1.169)
+PARK_POSITION_TOLERANCE = 0.05   # m
+PARK_HEADING_TOLERANCE = 0.2     # rad
 
 robot = Robot()
 time_step = int(robot.getBasicTimeStep())
@@ -22,8 +55,13 @@ right_motor = robot.getMotor('right wheel motor')
 
 left_motor.setPosition(float('inf'))
 right_motor.setPosition(float('inf'))
-left_motor.setVelocity(0.0)
-right_motor.setVelocity(0.0)
+
+# Motor / LED writes go through devices.py, which counts them and drops repeated values
+device_stats = DeviceStats()
+left_wheel = CachedMotor(left_motor, device_stats, DEVICE_WRITE_CACHE)
+right_wheel = CachedMotor(right_motor, device_stats, DEVICE_WRITE_CACHE)
+left_wheel.set_velocity(0.0)
+right_wheel.set_velocity(0.0)
 
 # ======== Wheel Position Sensors (for real speed estimation) ========
 left_ps = robot.getPositionSensor('left wheel sensor')
@@ -33,10 +71,20 @@ right_ps.enable(time_step)
 
 # e-puck wheel radius (approx. 20.5mm)
 WHEEL_RADIUS = 0.0205  # m
+AXLE_LENGTH = 0.052    # m, distance between the wheels
+MAX_WHEEL_SPEED = 6.28 # rad/s
 
 prev_left_pos = left_ps.getValue()
 prev_right_pos = right_ps.getValue()
 
+# Live (x, y, theta) pose from the wheel positions, reset when a task starts. The
+# sensors read NaN until the first robot.step; the odometry then starts at the first
+# valid reading. Same wheel geometry as the speed estimate above.
+odometry = create_odometry(prev_left_pos, prev_right_pos, ODOMETRY_BACKEND, WHEEL_RADIUS, AXLE_LENGTH)
+print(f"[Controller] Odometry backend: {odometry.backend}")
+park_assist = ParkAssist(PARK_POSE, ROBOT_START_POSE, PARK_POSITION_TOLERANCE, PARK_HEADING_TOLERANCE,
+                         backend=ODOMETRY_BACKEND)
+
 # "Stuck detection" parameters
 stuck_counter = 0
 STUCK_STEPS_THRESHOLD = 5        # Number of consecutive steps with almost no movement → collision
@@ -54,10 +102,11 @@ for i in range(10):   # led0 ~ led9
     except Exception:
         print(f"[WARN] No device named {name}")
 
+led_bank = LedBank(leds, device_stats, DEVICE_WRITE_CACHE)
+
 def set_all_leds(value: int):
     """Set all detected LEDs to 0 or 1"""
-    for led in leds.values():
-        led.set(value)
+    led_bank.apply(led_bank.present if value else 0)
 
 # LED feedback enable: True = enabled, False = disabled
 WITH_LED = True
@@ -72,6 +121,8 @@ def update_led_by_command(cmd: str):
     BACKWARD    -> Rear LEDs
     SPEED_UP    -> Front LEDs (assumed led9)
     SLOW_DOWN   -> Middle LEDs
+    PARK        -> Body and front LEDs
+    The patterns are bitmasks (devices.LED_PATTERNS); only LEDs that change are written.
     """
     cmd = cmd.strip().upper()
 
@@ -80,41 +131,7 @@ def update_led_by_command(cmd: str):
         set_all_leds(0)
         return
 
-    set_all_leds(0)  # Turn off all LEDs first
-
-    if cmd == "STOP":
-        if 8 in leds:
-            leds[8].set(1)
-
-    elif cmd == "FORWARD":
-        for i in range(8):   # led0~7 ring
-            if i in leds:
-                leds[i].set(1)
-
-    elif cmd == "BACKWARD":
-        for i in [4, 5, 6, 7]:
-            if i in leds:
-                leds[i].set(1)
-
-    elif cmd == "TURN_LEFT":
-        for i in [5, 6, 7]:
-            if i in leds:
-                leds[i].set(1)
-
-    elif cmd == "TURN_RIGHT":
-        for i in [1, 2, 3]:
-            if i in leds:
-                leds[i].set(1)
-
-    elif cmd == "SPEED_UP":
-        for i in [1, 7, 0]:
-            if i in leds:
-                leds[i].set(1)
-
-    elif cmd == "SLOW_DOWN":
-        for i in [3, 4, 5]:
-            if i in leds:
-                leds[i].set(1)
+    led_bank.show(cmd)
 
 # ======== Speed & State Variables ========
 base_speed_default = 3.0
@@ -141,25 +158,94 @@ parking_success = False
 # Result files
 RESULT_TIME_FILE = "results_time.csv"
 RESULT_TRIAL_FILE = "results_trials.csv"
-
-# ======== TCP Server Initialization (Gesture Client) ========
-server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-server_socket.bind((HOST, PORT))
-server_socket.listen(1)
-server_socket.setblocking(False)
-
-print(f"[Controller] Gesture control server started: {HOST}:{PORT}")
-
-client_conn = None
-client_addr = None
+# Every command, velocity setpoint and experiment event with wall-clock and simulation time
+RESULT_EVENT_FILE = "results_events.csv"
+LOG_EVENTS = True
+# Per-step telemetry (sim time, wheel positions, odometry pose, commanded / measured
+# speed, motion state, LED mask, ...) into a memory-mapped file; see telemetry.py
+TELEMETRY_ENABLED = False
+TELEMETRY_FILE = "telemetry_{}.bin"   # formatted with the start time
+
+# Rows are written by a background thread (experiment_log.py), never inside robot.step
+experiment_log = ExperimentLog()
+experiment_log.register("time", RESULT_TIME_FILE, ["participant", "mode", "trial", "duration_sec"])
+experiment_log.register("trials", RESULT_TRIAL_FILE,
+                        ["participant", "mode", "trial", "duration_sec", "collision", "parking"])
+experiment_log.register("events", RESULT_EVENT_FILE,
+                        ["wall_time", "sim_time", "participant", "mode", "trial", "event", "linear", "angular"])
+
+telemetry = None
+if TELEMETRY_ENABLED:
+    telemetry = TelemetryRecorder(
+        TELEMETRY_FILE.format(time.strftime("%Y%m%d-%H%M%S")),
+        metadata={"participant": PARTICIPANT_ID, "mode": CONTROL_MODE, "time_step_ms": time_step,
+                  "wheel_radius": WHEEL_RADIUS, "with_led": WITH_LED, "odometry": odometry.backend})
+    print(f"[Telemetry] Recording every step to {telemetry.path}")
+
+def log_event(event, linear="", angular=""):
+    """Queue one row for RESULT_EVENT_FILE (no file I/O in the control loop)"""
+    if LOG_EVENTS:
+        experiment_log.log("events", [time.time(), robot.getTime(), PARTICIPANT_ID, CONTROL_MODE,
+                                      TRIAL_ID, event, linear, angular])
+
+# ======== Latency Instrumentation ========
+# Commands sent by "gesture_client.py --latency FILE" carry their frame trace; the
+# controller adds "recv" (select loop) and "actuate" (setVelocity) marks and writes
+# the end-to-end percentiles to LATENCY_FILE when the simulation ends.
+LATENCY_FILE = "latency_controller.json"
+latency_stats = LatencyStats()
+pending_traces = []  # traces received this step, waiting for the motor update
+
+# ======== Velocity Streaming ("gesture_client.py --stream") ========
+# VELOCITY frames carry a (linear m/s, angular rad/s) setpoint every camera frame.
+# Only the newest setpoint is applied each step; if none arrives for
+# STREAM_TIMEOUT seconds the robot stops (client stalled or hand lost without a frame).
+STREAM_TIMEOUT = 0.3   # s
+STREAM_TIMEOUT_STEPS = max(1, int(STREAM_TIMEOUT * 1000 / time_step))
+stream_linear = 0.0
+stream_angular = 0.0
+stream_seq = None        # seq of the newest setpoint, older frames are ignored
+stream_client = None     # client that sent it (sequence numbers are per client)
+stream_trace = None      # trace of the newest setpoint, marked on actuation
+stream_idle_steps = 0
+stream_received = 0
+stream_applied = 0
+
+# ======== Command Server Initialization (Gesture Clients) ========
+command_server = create_server(TRANSPORT, HOST, PORT)
+arbiter = CommandArbiter(ARBITRATION_POLICY, ARBITRATION_HOLD)
+
+print(f"[Controller] Gesture control server started: {command_server.address} "
+      f"(arbitration: {ARBITRATION_POLICY})")
+
+def finish_parking(reason):
+    """Stop after a parking run and record whether the robot ended within the tolerances"""
+    global motion_state, parking_success
+    motion_state = "STOP"
+    left_wheel.set_velocity(0.0)
+    right_wheel.set_velocity(0.0)
+    update_led_by_command("STOP")
+    success, position_error, heading_error = park_assist.result(odometry.pose())
+    print(f"[Park] {reason}: {'success' if success else 'failed'} (position error {position_error * 1000:.0f} mm, "
+          f"heading error {heading_error:.2f} rad)")
+    if success and task_running:
+        parking_success = True
+    log_event("PARKING" if success else "PARK_FAILED")
+
+def cancel_parking(cause):
+    """A driving command or velocity stream takes over from a running park assist"""
+    if park_assist.active:
+        park_assist.cancel()
+        print(f"[Park] Cancelled by {cause}")
 
 def handle_command(cmd: str):
     """Unified command handler for network and keyboard inputs"""
     global base_speed, turn_speed, motion_state
     cmd = cmd.strip().upper()
+    log_event(cmd)
 
     if cmd in {"FORWARD", "STOP", "TURN_LEFT", "TURN_RIGHT", "BACKWARD"}:
+        cancel_parking(cmd)
         motion_state = cmd
         print(f"[Controller] Motion state set to: {motion_state}")
         update_led_by_command(cmd)
@@ -177,61 +263,112 @@ def handle_command(cmd: str):
         update_led_by_command(cmd)
 
     elif cmd == "EMERGENCY_STOP":
+        cancel_parking(cmd)
         motion_state = "STOP"
-        left_motor.setVelocity(0.0)
-        right_motor.setVelocity(0.0)
+        left_wheel.set_velocity(0.0)
+        right_wheel.set_velocity(0.0)
         print("[Controller] Emergency stop activated!")
         update_led_by_command("STOP")
 
+    elif cmd == "PARK":
+        motion_state = "PARK"
+        park_assist.start(robot.getTime())
+        print(f"[Park] Parking at {park_assist.goal[0]:.2f}, {park_assist.goal[1]:.2f} m "
+              f"(odometry frame, {park_assist.backend} go-to controller)")
+        update_led_by_command(cmd)
+
     else:
         print(f"[Controller] Unknown command: {cmd}")
 
+def handle_velocity(client, frame, recv_time):
+    """Store the setpoint of a VELOCITY frame; the motor block applies the newest one"""
+    global stream_linear, stream_angular, stream_seq, stream_client, stream_trace, stream_idle_steps
+    global stream_received, motion_state
+    linear, angular, body = decode_velocity(frame)
+    # Decoded before any state changes, so a malformed frame is dropped as a whole
+    trace = FrameTrace.decode(body.decode('utf-8')) if body else None
+    stream_received += 1
+    log_event("VELOCITY", linear, angular)
+    if (client == stream_client and stream_seq is not None
+            and ((frame.seq - stream_seq) & 0xFFFFFFFF) > 0x7FFFFFFF):
+        return  # older than the setpoint already held
+
+    stream_linear, stream_angular, stream_seq, stream_client = linear, angular, frame.seq, client
+    stream_idle_steps = 0
+    stream_trace = trace
+    if trace is not None:
+        trace.marks.append(("recv", recv_time))
+    if motion_state != "STREAM":
+        cancel_parking("velocity stream")
+        motion_state = "STREAM"
+        print("[Controller] Motion state set to: STREAM")
+        update_led_by_command("FORWARD")
+
+def handle_frame(client, frame, recv_time):
+    """Apply one command frame from a connected client, subject to arbitration"""
+    state = arbiter.clients.get(client)
+    if state is None:
+        print(f"[Controller] Dropped frame from unknown client {client}")
+        return
+    state.frames += 1
+    state.seq.update(frame.seq)
+    if frame.opcode == OP_HELLO:
+        name, priority = decode_hello(frame)
+        arbiter.hello(client, name, priority)
+        print(f"[Controller] Client identified: {state.describe()}")
+        return
+    if not arbiter.accept(client, frame, recv_time):
+        return
+    if frame.opcode == OP_VELOCITY:
+        handle_velocity(client, frame, recv_time)
+        return
+    cmd = command_name(frame)
+    if cmd is None:
+        print(f"[Controller] Unknown opcode: {frame.opcode:#04x}")
+        return
+
+    if frame.body:
+        trace = FrameTrace.decode(frame.body.decode('utf-8'))
+        trace.marks.append(("recv", recv_time))
+        pending_traces.append(trace)
+    handle_command(cmd)
+
 # ======== Main Loop ========
 while robot.step(time_step) != -1:
+    step_start = clock()
     # ======== Handle network connection (gesture client) ========
-    if client_conn is None:
-        try:
-            conn, addr = server_socket.accept()
-            conn.setblocking(False)
-            client_conn = conn
-            client_addr = addr
-            print(f"[Controller] Client connected: {client_addr}")
-            update_led_by_command(motion_state)
-        except BlockingIOError:
-            pass
-    else:
-        try:
-            ready_to_read, _, _ = select.select([client_conn], [], [], 0)
-            if ready_to_read:
-                data = client_conn.recv(1024)
-                if data:
-                    cmd_str = data.decode('utf-8')
-                    handle_command(cmd_str)
-                else:
-                    print("[Controller] Client disconnected")
-                    client_conn.close()
-                    client_conn = None
-                    client_addr = None
-                    motion_state = "STOP"
-                    left_motor.setVelocity(0.0)
-                    right_motor.setVelocity(0.0)
-                    update_led_by_command("STOP")
-        except (BlockingIOError, InterruptedError):
-            pass
-        except OSError:
-            print("[Controller] Socket error, closing connection")
+    # poll() never blocks; every complete frame is applied, even several per step
+    events = command_server.poll()
+    recv_time = clock()
+    for event, client, value in events:
+        if event == FRAME:
             try:
-                client_conn.close()
-            except Exception:
-                pass
-            client_conn = None
-            client_addr = None
+                handle_frame(client, value, recv_time)
+            except (ProtocolError, ValueError, UnicodeDecodeError) as e:
+                # Truncated body or unreadable trace: drop this frame, keep the controller running
+                print(f"[Controller] Dropped malformed frame (opcode {value.opcode:#04x}) "
+                      f"from client {client}: {e}")
+        elif event == CONNECT:
+            state = arbiter.connect(client, value)
+            print(f"[Controller] Client connected: {state.describe()} "
+                  f"({len(arbiter.clients)} connected)")
+            update_led_by_command(motion_state)
+        elif event == DISCONNECT:
+            state, was_owner = arbiter.disconnect(client)
+            print(f"[Controller] Client disconnected: {state.name}, {value} ({state.frames} frames, "
+                  f"{state.seq.lost} lost, {state.seq.reordered} reordered, {state.rejected} rejected)")
+            if not was_owner:
+                continue  # another client (or nobody) is driving, leave the robot alone
+            if stream_received:
+                print(f"[Controller] Velocity setpoints: {stream_received} received, "
+                      f"{stream_applied} applied")
+            cancel_parking("disconnect")
             motion_state = "STOP"
-            left_motor.setVelocity(0.0)
-            right_motor.setVelocity(0.0)
+            left_wheel.set_velocity(0.0)
+            right_wheel.set_velocity(0.0)
             update_led_by_command("STOP")
 
-    # ======== Keyboard Input Handling (WASD + J/K + B/N + P + L) ========
+    # ======== Keyboard Input Handling (WASD + J/K + B/N + P + L + G) ========
     key = keyboard.getKey()
     while key != -1:
         if key in (ord('W'), ord('w')):
@@ -246,15 +383,23 @@ while robot.step(time_step) != -1:
             handle_command("SPEED_UP")
         elif key in (ord('K'), ord('k')):
             handle_command("EMERGENCY_STOP")
+        elif key in (ord('G'), ord('g')):
+            handle_command("PARK")
 
         elif key in (ord('B'), ord('b')):
-            if not task_running:
+            if park_assist.active:
+                print("[Exp] Parking in progress, start ignored")
+            elif not task_running:
                 task_running = True
                 start_time = time.time()
                 collision_happened = False
                 parking_success = False
+                # New odometry origin here; the parking goal moves into the new frame
+                park_assist.reanchor(odometry.pose())
+                odometry.reset(left_ps.getValue(), right_ps.getValue())
                 print("[Exp] Task started (PARTICIPANT_ID={}, MODE={}, TRIAL={})"
                       .format(PARTICIPANT_ID, CONTROL_MODE, TRIAL_ID))
+                log_event("TASK_START")
             else:
                 print("[Exp] Task already running, start ignored")
 
@@ -262,6 +407,7 @@ while robot.step(time_step) != -1:
             if task_running:
                 parking_success = True
                 print("[Exp] Parking success marked")
+                log_event("PARKING")
             else:
                 print("[Exp] No active task, P key ignored")
 
@@ -280,42 +426,18 @@ while robot.step(time_step) != -1:
                 duration = end_time - start_time
                 task_running = False
                 print(f"[Exp] Task ended, duration {duration:.3f} seconds")
-
-                try:
-                    write_header = not os.path.exists(RESULT_TIME_FILE)
-                    with open(RESULT_TIME_FILE, "a", newline="", encoding="utf-8") as f:
-                        writer = csv.writer(f)
-                        if write_header:
-                            writer.writerow(["participant", "mode", "trial", "duration_sec"])
-                        writer.writerow([PARTICIPANT_ID, CONTROL_MODE, TRIAL_ID, duration])
-                    print("[Exp] Written to", RESULT_TIME_FILE)
-                except Exception as e:
-                    print("[Exp] Failed to write", RESULT_TIME_FILE, ":", e)
-
-                try:
-                    write_header = not os.path.exists(RESULT_TRIAL_FILE)
-                    with open(RESULT_TRIAL_FILE, "a", newline="", encoding="utf-8") as f:
-                        writer = csv.writer(f)
-                        if write_header:
-                            writer.writerow([
-                                "participant",
-                                "mode",
-                                "trial",
-                                "duration_sec",
-                                "collision",
-                                "parking"
-                            ])
-                        writer.writerow([
-                            PARTICIPANT_ID,
-                            CONTROL_MODE,
-                            TRIAL_ID,
-                            duration,
-                            int(collision_happened),
-                            int(parking_success),
-                        ])
-                    print("[Exp] Written to", RESULT_TRIAL_FILE)
-                except Exception as e:
-                    print("[Exp] Failed to write", RESULT_TRIAL_FILE, ":", e)
+                log_event("TASK_END")
+
+                # Queued only; the background writer appends them to the CSV files
+                experiment_log.log("time", [PARTICIPANT_ID, CONTROL_MODE, TRIAL_ID, duration])
+                experiment_log.log("trials", [
+                    PARTICIPANT_ID,
+                    CONTROL_MODE,
+                    TRIAL_ID,
+                    duration,
+                    int(collision_happened),
+                    int(parking_success),
+                ])
 
                 TRIAL_ID += 1
             else:
@@ -325,30 +447,66 @@ while robot.step(time_step) != -1:
 
     # ======== Motor Control According to Motion State ========
     if motion_state == "STOP":
-        left_motor.setVelocity(0.0)
-        right_motor.setVelocity(0.0)
+        left_wheel.set_velocity(0.0)
+        right_wheel.set_velocity(0.0)
         commanded_speed_mag = 0.0
     elif motion_state == "FORWARD":
-        left_motor.setVelocity(base_speed)
-        right_motor.setVelocity(base_speed)
+        left_wheel.set_velocity(base_speed)
+        right_wheel.set_velocity(base_speed)
         commanded_speed_mag = abs(base_speed)
     elif motion_state == "BACKWARD":
-        left_motor.setVelocity(-base_speed)
-        right_motor.setVelocity(-base_speed)
+        left_wheel.set_velocity(-base_speed)
+        right_wheel.set_velocity(-base_speed)
         commanded_speed_mag = abs(base_speed)
     elif motion_state == "TURN_LEFT":
-        left_motor.setVelocity(-turn_speed)
-        right_motor.setVelocity(turn_speed)
+        left_wheel.set_velocity(-turn_speed)
+        right_wheel.set_velocity(turn_speed)
         commanded_speed_mag = abs(turn_speed)
     elif motion_state == "TURN_RIGHT":
-        left_motor.setVelocity(turn_speed)
-        right_motor.setVelocity(-turn_speed)
+        left_wheel.set_velocity(turn_speed)
+        right_wheel.set_velocity(-turn_speed)
         commanded_speed_mag = abs(turn_speed)
+    elif motion_state == "STREAM":
+        stream_idle_steps += 1
+        if stream_idle_steps > STREAM_TIMEOUT_STEPS:
+            print("[Controller] Velocity stream timed out, stopping")
+            motion_state = "STOP"
+            stream_linear = stream_angular = 0.0
+            update_led_by_command("STOP")
+        # Differential drive: wheel angular speed from (v, w)
+        half_axle = AXLE_LENGTH / 2.0
+        left_speed = (stream_linear - stream_angular * half_axle) / WHEEL_RADIUS
+        right_speed = (stream_linear + stream_angular * half_axle) / WHEEL_RADIUS
+        left_speed = max(-MAX_WHEEL_SPEED, min(MAX_WHEEL_SPEED, left_speed))
+        right_speed = max(-MAX_WHEEL_SPEED, min(MAX_WHEEL_SPEED, right_speed))
+        left_wheel.set_velocity(left_speed)
+        right_wheel.set_velocity(right_speed)
+        commanded_speed_mag = max(abs(left_speed), abs(right_speed))
+        if stream_idle_steps == 1:
+            stream_applied += 1
+            if stream_trace is not None:
+                pending_traces.append(stream_trace)
+                stream_trace = None
+    elif motion_state == "PARK":
+        # Closed-loop go-to on the odometry pose of the previous step (park_assist.py)
+        left_speed, right_speed = park_assist.step(odometry.pose(), robot.getTime())
+        left_wheel.set_velocity(left_speed)
+        right_wheel.set_velocity(right_speed)
+        commanded_speed_mag = max(abs(left_speed), abs(right_speed))
+        if not park_assist.active:
+            finish_parking("Timed out" if park_assist.timed_out else "Parked")
     else:
-        left_motor.setVelocity(0.0)
-        right_motor.setVelocity(0.0)
+        left_wheel.set_velocity(0.0)
+        right_wheel.set_velocity(0.0)
         commanded_speed_mag = 0.0
 
+    if pending_traces:
+        actuate_time = clock()
+        for trace in pending_traces:
+            trace.marks.append(("actuate", actuate_time))
+            latency_stats.add_trace(trace)
+        pending_traces.clear()
+
     # ======== Real Speed Estimation & Collision Detection ========
     left_pos = left_ps.getValue()
     right_pos = right_ps.getValue()
@@ -359,16 +517,48 @@ while robot.step(time_step) != -1:
     prev_left_pos = left_pos
     prev_right_pos = right_pos
 
+    pose_x, pose_y, pose_theta = odometry.step(left_pos, right_pos)
+
     dt = time_step / 1000.0
     lin_speed = (dl + dr) * 0.5 * WHEEL_RADIUS / dt
-
-    if task_running and motion_state != "STOP" and commanded_speed_mag > COMMAND_SPEED_THRESHOLD:
-        if abs(lin_speed) < ACTUAL_SPEED_THRESHOLD:
+    # A turn in place has no linear speed; count the wheels' speed along the turn circle
+    # (heading rate from the odometry) as movement too, so turning is not taken as stuck
+    move_speed = max(abs(lin_speed), abs(odometry.delta_theta) / dt * AXLE_LENGTH / 2.0)
+
+    # Not while parking: the go-to controller slows down near the goal on purpose
+    if (task_running and motion_state != "STOP" and not park_assist.active
+            and commanded_speed_mag > COMMAND_SPEED_THRESHOLD):
+        if move_speed < ACTUAL_SPEED_THRESHOLD:
             stuck_counter += 1
             if stuck_counter >= STUCK_STEPS_THRESHOLD and not collision_happened:
                 collision_happened = True
-                print("[Exp] Collision detected: commanded to move but speed dropped")
+                print("[Exp] Collision detected: commanded to move but speed dropped "
+                      f"(x={pose_x:.3f} m, y={pose_y:.3f} m, theta={pose_theta:+.2f} rad)")
+                log_event("COLLISION")
         else:
             stuck_counter = 0
     else:
         stuck_counter = 0
+
+    if telemetry is not None:
+        telemetry.record(robot.getTime(), TRIAL_ID, task_running, motion_state, led_bank.mask or 0,
+                         left_pos, right_pos, left_wheel.velocity, right_wheel.velocity,
+                         commanded_speed_mag, lin_speed, stuck_counter, pose_x, pose_y, pose_theta)
+
+    device_stats.step_time.add(clock() - step_start)
+
+# ======== Shutdown ========
+command_server.close()
+
+experiment_log.close()
+if telemetry is not None:
+    telemetry.close()
+    print(f"[Telemetry] {telemetry.flushed} steps written to {telemetry.path}")
+print(f"[Exp] {experiment_log.rows_written} log rows written in {experiment_log.batches} batches")
+
+device_stats.print_summary("[Devices]")
+device_stats.write(DEVICE_STATS_FILE)
+
+if latency_stats.intervals:
+    latency_stats.print_summary("[Latency]")
+    latency_stats.write(LATENCY_FILE)
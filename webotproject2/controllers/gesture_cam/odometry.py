@@ -0,0 +1,323 @@
+# odometry.py
+# Live (x, y, theta) pose of the e-puck from its wheel position sensors.
+#
+# The pose is integrated by lib/odometry.c (odometry_track_start_pos /
+# odometry_track_step_pos with its wheel-diameter calibration), called through ctypes.
+# The same library holds lib/odometry_goto.c for park_assist.py. Build it once with
+#   python controllers/gesture_cam/odometry.py --build
+# Without the library the same update runs in pure Python (PyOdometry); one scalar
+# update per step is faster in plain Python than through NumPy. integrate_positions()
+# is the vectorized NumPy version for whole recordings (e.g. the wheel positions in a
+# telemetry file), where cumulative sums replace the per-step loop.
+#
+# The Webots position sensors report radians; like the real e-puck, the C code works
+# on integer encoder increments, so positions are converted with INCREMENTS_PER_TOUR.
+# The calibration defaults are those of the real e-puck; create_odometry() takes the
+# wheel radius and axle length of the simulated robot instead (set_geometry).
+# Before the first robot.step the sensors read NaN; the first finite reading then
+# becomes the origin.
+#
+#   python odometry.py --bench        per-step cost of the native, Python and NumPy versions
+import argparse
+import ctypes
+import math
+import os
+import subprocess
+import sys
+import sysconfig
+import time
+
+import numpy as np
+
+LIB_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "lib"))
+LIB_SOURCES = [os.path.join(LIB_DIR, "odometry.c"), os.path.join(LIB_DIR, "odometry_goto.c")]
+if sys.platform == "win32":
+    LIB_FILE = os.path.join(LIB_DIR, "odometry.dll")
+elif sys.platform == "darwin":
+    LIB_FILE = os.path.join(LIB_DIR, "libodometry.dylib")
+else:
+    LIB_FILE = os.path.join(LIB_DIR, "libodometry.so")
+
+# Calibration defaults of lib/odometry.c (used by the Python and NumPy versions)
+INCREMENTS_PER_TOUR = 976.0
+AXIS_WHEEL_RATIO = 1.293186
+WHEEL_DIAMETER = 0.04105   # m, left and right
+SCALING_FACTOR = 0.974
+BACKENDS = ("auto", "native", "python")
+
+
+class _Configuration(ctypes.Structure):
+    _fields_ = [("wheel_distance", ctypes.c_float),
+                ("wheel_conversion_left", ctypes.c_float),
+                ("wheel_conversion_right", ctypes.c_float)]
+
+
+class _State(ctypes.Structure):
+    _fields_ = [("pos_left_prev", ctypes.c_int), ("pos_right_prev", ctypes.c_int)]
+
+
+class _Result(ctypes.Structure):
+    _fields_ = [("x", ctypes.c_float), ("y", ctypes.c_float), ("theta", ctypes.c_float)]
+
+
+class OdometryTrack(ctypes.Structure):
+    """struct sOdometryTrack of lib/odometry.h."""
+    _fields_ = [("configuration", _Configuration), ("state", _State), ("result", _Result)]
+
+
+class _GotoConfiguration(ctypes.Structure):
+    _fields_ = [("speed_min", ctypes.c_float)]
+
+
+class _GotoState(ctypes.Structure):
+    _fields_ = [("goal_x", ctypes.c_float), ("goal_y", ctypes.c_float), ("goal_theta", ctypes.c_float)]
+
+
+class _GotoResult(ctypes.Structure):
+    _fields_ = [("speed_left", ctypes.c_int), ("speed_right", ctypes.c_int), ("atgoal", ctypes.c_int)]
+
+
+class OdometryGoto(ctypes.Structure):
+    """struct sOdometryGoto of lib/odometry_goto.h."""
+    _fields_ = [("configuration", _GotoConfiguration), ("track", ctypes.POINTER(OdometryTrack)),
+                ("state", _GotoState), ("result", _GotoResult)]
+
+
+def load_library(path=LIB_FILE):
+    """The odometry shared library with argument types set, or None if it is not built."""
+    try:
+        lib = ctypes.CDLL(path)
+    except OSError:
+        return None
+    track = ctypes.POINTER(OdometryTrack)
+    lib.odometry_track_start_pos.argtypes = [track, ctypes.c_int, ctypes.c_int]
+    lib.odometry_track_start_pos.restype = ctypes.c_int
+    # Hot path, called every step: no argtypes, so ctypes passes the byref() and the two
+    # Python ints (C int) without per-call conversion checks (half the call overhead)
+    lib.odometry_track_step_pos.restype = None
+    lib.odometry_set_wheel_diameters.argtypes = [ctypes.c_float, ctypes.c_float]
+    lib.odometry_set_wheel_diameters.restype = None
+    lib.odometry_recompute_config.argtypes = [track]
+    lib.odometry_recompute_config.restype = None
+    if hasattr(lib, "odometry_goto_step"):   # libraries built before park_assist.py lack it
+        goto = ctypes.POINTER(OdometryGoto)
+        lib.odometry_goto_start.argtypes = [goto, track]
+        lib.odometry_goto_start.restype = None
+        lib.odometry_goto_set_goal.argtypes = [goto, ctypes.c_float, ctypes.c_float, ctypes.c_float]
+        lib.odometry_goto_set_goal.restype = None
+        lib.odometry_goto_step.restype = None   # hot path, no argtypes (see above)
+    return lib
+
+
+def build_library(sources=LIB_SOURCES, out=LIB_FILE):
+    """Compile lib/odometry.c and lib/odometry_goto.c into a shared library with the system C compiler."""
+    cc = (os.environ.get("CC") or sysconfig.get_config_var("CC") or "cc").split()
+    cmd = cc + ["-O2", "-shared", "-o", out] + list(sources)
+    if sys.platform != "win32":
+        cmd[len(cc) + 2:len(cc) + 2] = ["-fPIC"]
+        cmd.append("-lm")
+    print("[Odometry]", " ".join(cmd))
+    subprocess.run(cmd, check=True)
+    print(f"[Odometry] Built {out}")
+
+
+def wrap_angle(theta):
+    return (theta + math.pi) % (2.0 * math.pi) - math.pi
+
+
+class _Odometry:
+    """Pose (x, y in m, theta in rad) and the heading change of the last step."""
+
+    x = y = theta = 0.0
+    delta_theta = 0.0
+    started = False   # False until the wheel positions were finite once
+
+    def pose(self):
+        return self.x, self.y, self.theta
+
+    def set_geometry(self, wheel_radius, axle_length):
+        """Effective wheel radius and wheel distance (m), e.g. of the simulated e-puck."""
+        diameter = 2.0 * wheel_radius / SCALING_FACTOR
+        self._set_calibration(axle_length / (2.0 * wheel_radius), diameter)
+
+
+class NativeOdometry(_Odometry):
+    """Pose tracking by lib/odometry.c through ctypes."""
+
+    backend = "native"
+
+    def __init__(self, lib, pos_left, pos_right):
+        self._lib = lib
+        self._step = lib.odometry_track_step_pos
+        self._track = OdometryTrack()
+        self._ref = ctypes.byref(self._track)
+        # result.x, .y, .theta as one float[3], read with a single slice
+        self._result = (ctypes.c_float * 3).from_buffer(self._track, OdometryTrack.result.offset)
+        self.increments_per_rad = ctypes.c_float.in_dll(lib, "increments_per_tour").value / (2.0 * math.pi)
+        self.reset(pos_left, pos_right)
+
+    def reset(self, pos_left, pos_right):
+        """Restart at (0, 0, 0) from the given wheel positions (rad); NaN: at the first finite ones."""
+        self.x = self.y = self.theta = self.delta_theta = 0.0
+        self.started = math.isfinite(pos_left) and math.isfinite(pos_right)
+        if self.started:
+            k = self.increments_per_rad
+            self._lib.odometry_track_start_pos(self._ref, round(pos_left * k), round(pos_right * k))
+
+    def step(self, pos_left, pos_right):
+        """Integrate new wheel positions (rad); returns (x, y, theta)."""
+        if not self.started:
+            self.reset(pos_left, pos_right)
+            return self.x, self.y, self.theta
+        k = self.increments_per_rad
+        self._step(self._ref, round(pos_left * k), round(pos_right * k))
+        x, y, theta = self._result[:]
+        self.delta_theta = wrap_angle(theta - self.theta)
+        self.x, self.y, self.theta = x, y, theta
+        return x, y, theta
+
+    def set_wheel_diameters(self, left, right):
+        self._lib.odometry_set_wheel_diameters(left, right)
+        self._lib.odometry_recompute_config(self._ref)
+
+    def _set_calibration(self, axis_wheel_ratio, diameter):
+        # Calibration globals of odometry.c, also used by every later start_pos
+        ctypes.c_float.in_dll(self._lib, "axis_wheel_ratio").value = axis_wheel_ratio
+        self.set_wheel_diameters(diameter, diameter)
+
+
+class PyOdometry(_Odometry):
+    """The update of odometry_track_step_pos in pure Python (double precision)."""
+
+    backend = "python"
+
+    def __init__(self, pos_left, pos_right, diameter_left=WHEEL_DIAMETER, diameter_right=WHEEL_DIAMETER):
+        self.increments_per_rad = INCREMENTS_PER_TOUR / (2.0 * math.pi)
+        self.axis_wheel_ratio = AXIS_WHEEL_RATIO
+        self.set_wheel_diameters(diameter_left, diameter_right)
+        self.reset(pos_left, pos_right)
+
+    def reset(self, pos_left, pos_right):
+        self.x = self.y = self.theta = self.delta_theta = 0.0
+        self.started = math.isfinite(pos_left) and math.isfinite(pos_right)
+        if self.started:
+            self._prev_left = round(pos_left * self.increments_per_rad)
+            self._prev_right = round(pos_right * self.increments_per_rad)
+
+    def step(self, pos_left, pos_right):
+        if not self.started:
+            self.reset(pos_left, pos_right)
+            return self.x, self.y, self.theta
+        left = round(pos_left * self.increments_per_rad)
+        right = round(pos_right * self.increments_per_rad)
+        d_left = (left - self._prev_left) * self._conv_left
+        d_right = (right - self._prev_right) * self._conv_right
+        self._prev_left, self._prev_right = left, right
+        d_theta = (d_right - d_left) / self._wheel_distance
+        heading = self.theta + d_theta * 0.5
+        d = (d_left + d_right) * 0.5
+        self.x += d * math.cos(heading)
+        self.y += d * math.sin(heading)
+        self.theta = wrap_angle(self.theta + d_theta)
+        self.delta_theta = d_theta
+        return self.x, self.y, self.theta
+
+    def set_wheel_diameters(self, left, right):
+        self._wheel_distance = self.axis_wheel_ratio * SCALING_FACTOR * (left + right) / 2.0
+        self._conv_left = left * SCALING_FACTOR * math.pi / INCREMENTS_PER_TOUR
+        self._conv_right = right * SCALING_FACTOR * math.pi / INCREMENTS_PER_TOUR
+
+    def _set_calibration(self, axis_wheel_ratio, diameter):
+        self.axis_wheel_ratio = axis_wheel_ratio
+        self.set_wheel_diameters(diameter, diameter)
+
+
+def create_odometry(pos_left, pos_right, backend="auto", wheel_radius=None, axle_length=None):
+    """
+    Native odometry if the library is built (required for backend="native"), else PyOdometry.
+    With wheel_radius and axle_length (m) the pose uses that geometry instead of the
+    real e-puck calibration.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown odometry backend {backend!r}, expected one of {BACKENDS}")
+    lib = load_library() if backend != "python" else None
+    if lib is not None:
+        odometry = NativeOdometry(lib, pos_left, pos_right)
+    elif backend == "native":
+        raise OSError(f"{LIB_FILE} not found; build it with 'python odometry.py --build'")
+    else:
+        odometry = PyOdometry(pos_left, pos_right)
+    if wheel_radius is not None and axle_length is not None:
+        odometry.set_geometry(wheel_radius, axle_length)
+    return odometry
+
+
+def integrate_positions(pos_left, pos_right, diameter_left=WHEEL_DIAMETER, diameter_right=WHEEL_DIAMETER):
+    """
+    Vectorized odometry over whole arrays of wheel positions (rad), starting at (0, 0, 0)
+    at the first sample. Returns x, y, theta arrays of the same length.
+    """
+    per_rad = INCREMENTS_PER_TOUR / (2.0 * math.pi)
+    left = np.rint(np.asarray(pos_left, dtype=np.float64) * per_rad)
+    right = np.rint(np.asarray(pos_right, dtype=np.float64) * per_rad)
+    d_left = np.diff(left, prepend=left[:1]) * (diameter_left * SCALING_FACTOR * math.pi / INCREMENTS_PER_TOUR)
+    d_right = np.diff(right, prepend=right[:1]) * (diameter_right * SCALING_FACTOR * math.pi / INCREMENTS_PER_TOUR)
+    wheel_distance = AXIS_WHEEL_RATIO * SCALING_FACTOR * (diameter_left + diameter_right) / 2.0
+    d_theta = (d_right - d_left) / wheel_distance
+    theta = np.cumsum(d_theta)
+    d = (d_left + d_right) * 0.5
+    heading = theta - d_theta * 0.5
+    x = np.cumsum(d * np.cos(heading))
+    y = np.cumsum(d * np.sin(heading))
+    return x, y, (theta + np.pi) % (2.0 * np.pi) - np.pi
+
+
+# ========= Benchmark =========
+def synthetic_positions(n, dt=0.016, seed=0):
+    """Wheel positions (rad) of a robot driving random smooth curves."""
+    rng = np.random.default_rng(seed)
+    speed = np.cumsum(rng.normal(0.0, 0.2, (n, 2)), axis=0)
+    speed = np.clip(speed, -6.28, 6.28)
+    return np.cumsum(speed * dt, axis=0)
+
+
+def benchmark(n):
+    pos = synthetic_positions(n)
+    rows = pos.tolist()
+    results = {}
+    candidates = [("python", PyOdometry(*rows[0]))]
+    lib = load_library()
+    if lib is None:
+        print(f"[Odometry] {LIB_FILE} not built, skipping the native version")
+    else:
+        candidates.insert(0, ("native", NativeOdometry(lib, *rows[0])))
+    for name, odo in candidates:
+        t0 = time.perf_counter()
+        for left, right in rows:
+            odo.step(left, right)
+        results[name] = ((time.perf_counter() - t0) / n * 1e6, (odo.x, odo.y, odo.theta))
+
+    t0 = time.perf_counter()
+    x, y, theta = integrate_positions(pos[:, 0], pos[:, 1])
+    results["numpy (whole run)"] = ((time.perf_counter() - t0) / n * 1e6, (x[-1], y[-1], theta[-1]))
+
+    print(f"[Odometry] {n} steps")
+    for name, (us, (px, py, pt)) in results.items():
+        print(f"[Odometry] {name:18s} {us:7.3f} us/step   final pose x={px:8.4f} m  y={py:8.4f} m  "
+              f"theta={pt:+.4f} rad")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Odometry for the gesture_cam controller")
+    parser.add_argument("--build", action="store_true", help=f"compile {', '.join(LIB_SOURCES)}")
+    parser.add_argument("--bench", action="store_true", help="benchmark the per-step cost")
+    parser.add_argument("--steps", type=int, default=100000)
+    args = parser.parse_args()
+    if args.build:
+        build_library()
+    if args.bench or not args.build:
+        benchmark(args.steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# park_assist.py
+# Autonomous parking for the PARK command of gesture_cam.py.
+#
+# The pose comes from the controller's odometry (odometry.py), whose frame starts at
+# the robot's pose when it was last reset. The parking pose is configured in world
+# coordinates and converted into that frame with the world pose of the odometry origin:
+# the robot's start pose at first, and on every odometry reset (reanchor) the origin
+# moves to the current pose, chained through the odometry (drift accumulates without a
+# simulation reset, which restarts the controller).
+#   "goto"   the closed-loop go-to controller of lib/odometry_goto.c drives to the
+#            parking position (odometry_goto_step through ctypes, same shared library
+#            as odometry.py: 'python odometry.py --build'; without it the same control
+#            law runs in Python, goto_speeds)
+#   "align"  odometry_goto ignores goal_theta, so the robot then turns in place to the
+#            parking heading
+# result() judges the final pose against the position and heading tolerances. One step
+# is a few microseconds (python park_assist.py --bench), far below the step budget.
+#
+#   python park_assist.py --bench
+import argparse
+import ctypes
+import math
+import time
+
+from odometry import OdometryGoto, OdometryTrack, load_library, wrap_angle
+
+POSITION_TOLERANCE = 0.05   # m
+HEADING_TOLERANCE = 0.2     # rad
+TIMEOUT = 40.0              # s of simulation time
+ALIGN_GAIN = 2.0            # 1/s, turn rate per rad of heading error while aligning
+BACKENDS = ("auto", "native", "python")
+
+# Units of lib/odometry_goto.c: wheel speeds in e-puck steps/s (1000 steps per wheel turn)
+SPEED_UNIT = 2.0 * math.pi / 1000.0                # rad/s per step/s
+MAX_SPEED = 1000
+V_ADAPT = 1000.0 / 0.13                            # m/s -> steps/s
+OMEGA_ADAPT = 2000.0 / (270.0 * math.pi / 180.0)   # rad/s -> steps/s wheel difference
+K_RHO, K_ALPHA, K_BETA = 0.7, 8.9, -0.20
+
+
+def to_odometry_frame(pose, origin):
+    """World pose (x, y, theta) in the odometry frame that starts at the world pose origin."""
+    dx, dy = pose[0] - origin[0], pose[1] - origin[1]
+    c, s = math.cos(origin[2]), math.sin(origin[2])
+    return c * dx + s * dy, -s * dx + c * dy, wrap_angle(pose[2] - origin[2])
+
+
+def to_world_frame(pose, origin):
+    """Inverse of to_odometry_frame: odometry-frame pose in world coordinates."""
+    c, s = math.cos(origin[2]), math.sin(origin[2])
+    return (origin[0] + c * pose[0] - s * pose[1], origin[1] + s * pose[0] + c * pose[1],
+            wrap_angle(origin[2] + pose[2]))
+
+
+def goto_speeds(x, y, theta, goal_x, goal_y):
+    """odometry_goto_step in Python: (speed_left, speed_right, atgoal) in steps/s."""
+    dx, dy = goal_x - x, goal_y - y
+    rho = math.hypot(dx, dy)
+    alpha = wrap_angle(math.atan2(dy, dx) - theta)
+    beta = wrap_angle(-theta - alpha)
+    v = K_RHO * rho * V_ADAPT
+    omega = (K_ALPHA * alpha + K_BETA * beta) * OMEGA_ADAPT
+    left, right = v - omega / 2.0, v + omega / 2.0
+    peak = max(abs(left), abs(right))
+    if peak > MAX_SPEED:
+        left, right = left * MAX_SPEED / peak, right * MAX_SPEED / peak
+    left, right = int(left), int(right)
+    return left, right, (left == 0 and right == 0) or rho < 0.002
+
+
+class _PyGoto:
+    backend = "python"
+
+    def start(self, goal_x, goal_y):
+        self._goal = goal_x, goal_y
+
+    def __call__(self, x, y, theta):
+        return goto_speeds(x, y, theta, *self._goal)
+
+
+class _NativeGoto:
+    """odometry_goto_step of lib/odometry_goto.c on a pose copied into its own track."""
+
+    backend = "native"
+
+    def __init__(self, lib):
+        self._lib = lib
+        self._step = lib.odometry_goto_step
+        self._track = OdometryTrack()
+        self._goto = OdometryGoto()
+        self._ref = ctypes.byref(self._goto)
+        self._pose = (ctypes.c_float * 3).from_buffer(self._track, OdometryTrack.result.offset)
+        self._result = (ctypes.c_int * 3).from_buffer(self._goto, OdometryGoto.result.offset)
+
+    def start(self, goal_x, goal_y):
+        self._lib.odometry_goto_start(self._ref, ctypes.byref(self._track))
+        self._lib.odometry_goto_set_goal(self._ref, goal_x, goal_y, 0.0)
+
+    def __call__(self, x, y, theta):
+        self._pose[:] = (x, y, theta)
+        self._step(self._ref)
+        left, right, atgoal = self._result[:]
+        return left, right, bool(atgoal)
+
+
+class ParkAssist:
+    """Drives from the current odometry pose to a parking pose and judges the result."""
+
+    def __init__(self, park_pose, origin_pose, position_tolerance=POSITION_TOLERANCE,
+                 heading_tolerance=HEADING_TOLERANCE, timeout=TIMEOUT, backend="auto"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown park assist backend {backend!r}, expected one of {BACKENDS}")
+        self.park_pose = tuple(park_pose)
+        self.origin = tuple(origin_pose)   # world pose of the odometry origin
+        self.goal = to_odometry_frame(self.park_pose, self.origin)
+        self.position_tolerance = position_tolerance
+        self.heading_tolerance = heading_tolerance
+        self.timeout = timeout
+        lib = load_library() if backend != "python" else None
+        if lib is not None and hasattr(lib, "odometry_goto_step"):
+            self._goto = _NativeGoto(lib)
+        elif backend == "native":
+            raise OSError("odometry_goto is not built; build it with 'python odometry.py --build'")
+        else:
+            self._goto = _PyGoto()
+        self.backend = self._goto.backend
+        self.phase = None       # "goto", "align" or None when not parking
+        self.started = 0.0
+        self.timed_out = False
+
+    @property
+    def active(self):
+        return self.phase is not None
+
+    def reanchor(self, pose):
+        """The odometry is about to restart at pose (odometry frame): move the origin there."""
+        self.origin = to_world_frame(pose, self.origin)
+        self.goal = to_odometry_frame(self.park_pose, self.origin)
+
+    def start(self, sim_time):
+        self.phase = "goto"
+        self.started = sim_time
+        self.timed_out = False
+        self._goto.start(self.goal[0], self.goal[1])
+
+    def cancel(self):
+        self.phase = None
+
+    def step(self, pose, sim_time):
+        """Wheel speeds (rad/s) for this step; phase becomes None once parked or timed out."""
+        if self.phase is None:
+            return 0.0, 0.0
+        if sim_time - self.started > self.timeout:
+            self.phase = None
+            self.timed_out = True
+            return 0.0, 0.0
+        x, y, theta = pose
+        goal_x, goal_y, goal_theta = self.goal
+        if self.phase == "goto":
+            if math.hypot(goal_x - x, goal_y - y) >= self.position_tolerance / 2.0:
+                left, right, atgoal = self._goto(x, y, theta)
+                if not atgoal:
+                    return left * SPEED_UNIT, right * SPEED_UNIT
+            self.phase = "align"
+        error = wrap_angle(goal_theta - theta)
+        if abs(error) < self.heading_tolerance / 2.0:
+            self.phase = None
+            return 0.0, 0.0
+        turn = max(-MAX_SPEED, min(MAX_SPEED, ALIGN_GAIN * error * OMEGA_ADAPT / 2.0))
+        return -turn * SPEED_UNIT, turn * SPEED_UNIT
+
+    def result(self, pose):
+        """(success, position error in m, heading error in rad) of a pose."""
+        goal_x, goal_y, goal_theta = self.goal
+        position_error = math.hypot(goal_x - pose[0], goal_y - pose[1])
+        heading_error = abs(wrap_angle(goal_theta - pose[2]))
+        success = position_error <= self.position_tolerance and heading_error <= self.heading_tolerance
+        return success, position_error, heading_error
+
+
+# ========= Benchmark =========
+def simulate(park, pose=(0.0, 0.0, 0.0), dt=0.016, wheel_radius=0.0205, axle_length=0.052):
+    """Drive an ideal differential-drive robot with ParkAssist; returns (steps, s per step, pose)."""
+    x, y, theta = pose
+    park.start(0.0)
+    steps, busy = 0, 0.0
+    while park.active:
+        t0 = time.perf_counter()
+        left, right = park.step((x, y, theta), steps * dt)
+        busy += time.perf_counter() - t0
+        v = (left + right) * 0.5 * wheel_radius
+        w = (right - left) * wheel_radius / axle_length
+        x += v * dt * math.cos(theta + w * dt * 0.5)
+        y += v * dt * math.sin(theta + w * dt * 0.5)
+        theta = wrap_angle(theta + w * dt)
+        steps += 1
+    return steps, busy / max(steps, 1), (x, y, theta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Park assist of the gesture_cam controller")
+    parser.add_argument("--bench", action="store_true", help="simulate parking and time one control step")
+    parser.add_argument("--goal", type=float, nargs=3, default=(1.49, 0.66, 1.17), metavar=("X", "Y", "THETA"),
+                        help="parking pose in the odometry frame (default: the parking square seen from the start)")
+    args = parser.parse_args()
+    if not args.bench:
+        parser.print_help()
+        return
+    for backend in ("native", "python"):
+        try:
+            park = ParkAssist(args.goal, (0.0, 0.0, 0.0), backend=backend)
+        except OSError as e:
+            print(f"[Park] {backend}: {e}")
+            continue
+        steps, per_step, pose = simulate(park)
+        success, position_error, heading_error = park.result(pose)
+        print(f"[Park] {backend:6s} {steps} steps ({steps * 0.016:.1f} s), {per_step * 1e6:.2f} us per step, "
+              f"success={success} position error={position_error * 1000:.1f} mm "
+              f"heading error={math.degrees(heading_error):.1f} deg")
+
+
+if __name__ == "__main__":
+    main()
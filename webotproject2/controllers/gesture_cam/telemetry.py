@@ -0,0 +1,166 @@
+# telemetry.py
+# Per-step telemetry of the gesture_cam controller (TELEMETRY_ENABLED in gesture_cam.py).
+#
+# record() stores one fixed-schema record (TELEMETRY_DTYPE) in a preallocated NumPy
+# structured ring buffer: one tuple assignment, no allocation and no I/O. Every
+# flush_every steps the records not yet flushed are copied into a memory-mapped
+# file, which is preallocated and grown in GROW_RECORDS steps, and the JSON sidecar
+# (<file>.json: dtype, record count, motion-state names) is rewritten, so a crashed
+# run is readable up to its last flush. close() trims the file to the records written.
+# The newest `capacity` records also stay available in memory (latest()).
+#
+#   python telemetry.py telemetry_20250101-120000.bin      per-trial summary of a recording
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 2             # 2: odometry pose (x, y, theta) added
+READABLE_VERSIONS = (1, 2)     # the sidecar holds the dtype, so older recordings still load
+RING_CAPACITY = 4096    # records kept in memory
+FLUSH_EVERY = 1024      # steps between flushes to the file (<= RING_CAPACITY)
+GROW_RECORDS = 65536    # file growth step in records
+
+# Motion state names -> codes stored in the "motion" field
+MOTION_STATES = ("STOP", "FORWARD", "BACKWARD", "TURN_LEFT", "TURN_RIGHT", "STREAM", "PARK")
+MOTION_CODES = {name: i for i, name in enumerate(MOTION_STATES)}
+UNKNOWN_MOTION = 255
+
+TELEMETRY_DTYPE = np.dtype([
+    ("sim_time", "<f8"),        # s, robot.getTime()
+    ("trial", "<i4"),           # TRIAL_ID
+    ("task", "u1"),             # 1 while a task is running (between B and N)
+    ("motion", "u1"),           # index into MOTION_STATES
+    ("leds", "<u2"),            # LED bitmask (bit i = led i on)
+    ("left_pos", "<f8"),        # rad, wheel position sensors
+    ("right_pos", "<f8"),
+    ("left_cmd", "<f4"),        # rad/s, last velocity written to the motors
+    ("right_cmd", "<f4"),
+    ("commanded_speed", "<f4"), # rad/s, |commanded wheel speed|
+    ("lin_speed", "<f4"),       # m/s, measured from the wheel positions
+    ("stuck", "<i4"),           # stuck_counter
+    ("x", "<f4"),               # m, odometry pose since the task start (odometry.py)
+    ("y", "<f4"),
+    ("theta", "<f4"),           # rad
+])
+
+
+def sidecar_path(path):
+    return path + ".json"
+
+
+class TelemetryRecorder:
+    """Ring buffer of TELEMETRY_DTYPE records, flushed to a memory-mapped file."""
+
+    def __init__(self, path, capacity=RING_CAPACITY, flush_every=FLUSH_EVERY, metadata=None):
+        if not 0 < flush_every <= capacity:
+            raise ValueError("flush_every must be between 1 and the ring capacity")
+        self.path = path
+        self.ring = np.zeros(capacity, dtype=TELEMETRY_DTYPE)
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self.metadata = dict(metadata or {})
+        self.count = 0      # records recorded
+        self.flushed = 0    # records copied to the file
+        self._file_records = 0
+        self._mm = None
+        self._grow(GROW_RECORDS)
+        self._write_sidecar()
+
+    def record(self, sim_time, trial, task, motion, leds, left_pos, right_pos, left_cmd, right_cmd,
+               commanded_speed, lin_speed, stuck, x, y, theta):
+        """Store one step; motion is a state name (see MOTION_STATES)."""
+        self.ring[self.count % self.capacity] = (
+            sim_time, trial, task, MOTION_CODES.get(motion, UNKNOWN_MOTION), leds, left_pos, right_pos,
+            left_cmd, right_cmd, commanded_speed, lin_speed, stuck, x, y, theta)
+        self.count += 1
+        if self.count - self.flushed >= self.flush_every:
+            self.flush()
+
+    def latest(self, n=None):
+        """Copy of the newest n records still in memory (oldest first)."""
+        n = min(self.count, self.capacity) if n is None else min(n, self.count, self.capacity)
+        idx = np.arange(self.count - n, self.count) % self.capacity
+        return self.ring[idx]
+
+    def flush(self):
+        """Copy the records not yet flushed into the mapped file and update the sidecar."""
+        n = self.count - self.flushed
+        if n <= 0:
+            return
+        if self.flushed + n > self._file_records:
+            self._grow(max(GROW_RECORDS, self.flushed + n - self._file_records))
+        start = self.flushed % self.capacity
+        first = min(n, self.capacity - start)   # the unflushed part may wrap around
+        self._mm[self.flushed:self.flushed + first] = self.ring[start:start + first]
+        self._mm[self.flushed + first:self.flushed + n] = self.ring[:n - first]
+        self.flushed += n
+        self._write_sidecar()
+
+    def close(self):
+        """Flush, trim the file to the records written and write the final sidecar."""
+        if self._mm is None:
+            return
+        self.flush()
+        self._mm.flush()
+        self._mm = None
+        with open(self.path, "r+b") as f:
+            f.truncate(self.flushed * TELEMETRY_DTYPE.itemsize)
+        self._file_records = self.flushed
+        self._write_sidecar()
+
+    def _grow(self, records):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm = None
+        self._file_records += records
+        with open(self.path, "ab") as f:
+            f.truncate(self._file_records * TELEMETRY_DTYPE.itemsize)
+        self._mm = np.memmap(self.path, dtype=TELEMETRY_DTYPE, mode="r+", shape=(self._file_records,))
+
+    def _write_sidecar(self):
+        meta = dict(self.metadata, format_version=FORMAT_VERSION, count=self.flushed,
+                    dtype=TELEMETRY_DTYPE.descr, motion_states=list(MOTION_STATES),
+                    updated=time.strftime("%Y-%m-%d %H:%M:%S"))
+        tmp = sidecar_path(self.path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, sidecar_path(self.path))
+
+
+def load_telemetry(path):
+    """(read-only memory-mapped records, sidecar metadata) of a telemetry file."""
+    with open(sidecar_path(path), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") not in READABLE_VERSIONS:
+        raise ValueError(f"{path}: unsupported telemetry format {meta.get('format_version')}")
+    dtype = np.dtype([tuple(field) for field in meta["dtype"]])
+    if meta["count"] == 0:
+        return np.zeros(0, dtype=dtype), meta
+    return np.memmap(path, dtype=dtype, mode="r", shape=(meta["count"],)), meta
+
+
+def summarize(records, meta):
+    """Per-trial summary of the task steps: duration, distance driven, time per motion state."""
+    wheel_radius = meta.get("wheel_radius", 0.0205)
+    print(f"[Telemetry] {len(records)} steps, {meta.get('time_step_ms', '?')} ms per step")
+    task = records[records["task"] == 1]
+    for trial in np.unique(task["trial"]):
+        r = task[task["trial"] == trial]
+        wheel = (np.abs(np.diff(r["left_pos"])) + np.abs(np.diff(r["right_pos"]))) / 2.0
+        states = np.bincount(r["motion"], minlength=len(MOTION_STATES))[:len(MOTION_STATES)]
+        shares = ", ".join(f"{name} {c / len(r):.0%}" for name, c in zip(meta["motion_states"], states) if c)
+        end = ""
+        if "x" in r.dtype.names:   # recordings made before the odometry fields have no pose
+            end = f", end pose ({r['x'][-1]:.2f} m, {r['y'][-1]:.2f} m, {r['theta'][-1]:+.2f} rad)"
+        print(f"[Telemetry] trial {trial}: {r['sim_time'][-1] - r['sim_time'][0]:.2f} s, "
+              f"{wheel.sum() * wheel_radius:.2f} m driven, max stuck {r['stuck'].max()}{end}, {shares}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python telemetry.py TELEMETRY_FILE")
+        sys.exit(1)
+    summarize(*load_telemetry(sys.argv[1]))
@@ -1,84 +1,187 @@
 # E:\webotproject2\gesture_client.py
-import cv2
-import socket
-import mediapipe as mp
-import numpy as np
-import joblib
+import time
+STARTUP_T0 = time.perf_counter()  # origin of the startup timing breakdown
 
+import argparse
 import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from client_pipeline import LatestQueue, StageThread
+from landmark_recording import LandmarkRecorder, LandmarkRecording, ReplaySource
+from latency_stats import FrameTrace, LatencyStats, StartupTimer
+from command_protocol import CommandSender
+from transport import TRANSPORTS, connect
+from velocity_stream import VelocityFilter, hand_to_velocity
 
 # ========= Model Path =========
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "svmModle", "svmModel.joblib")
+ENGINE_PATH = os.path.join(BASE_DIR, "svmModle", "svmModel_engine.npz")  # exported by rbf_engine.py / train_svm.py
+ARTIFACT_PATH = os.path.join(BASE_DIR, "svmModle", "svmModel_artifact.bin")  # versioned engine + metadata
 
-print("Loaded SVM model path:", MODEL_PATH)
+# Shared feature extraction (same module used by collection and training)
+sys.path.insert(0, os.path.join(BASE_DIR, "svmModle"))
+from extract_features import FEATURE_DIM, extract_hand_features
+from model_artifact import GESTURE_LABELS, ArtifactError, FeatureSchemaError, load_artifact
+from rbf_engine import RbfSvmEngine
 
 # Mapping: numerical labels used during training -> gesture names
-ML_LABELS = {
-    0: "FIST",          # STOP
-    1: "PALM_FORWARD",  # FORWARD
-    2: "PALM_RIGHT",    # TURN_RIGHT
-    3: "PALM_LEFT",     # TURN_LEFT
-    4: "ONE",           # SPEED_UP
-    5: "TWO",           # SLOW_DOWN
-}
-
-# Try loading SVM model
-try:
-    ml_model = joblib.load(MODEL_PATH)
-    print(f"[Client] Loaded gesture classification model: {MODEL_PATH}")
-except Exception as e:
-    print(f"[Client] Failed to load model {MODEL_PATH}, fallback to rule-based recognition: {e}")
-    ml_model = None
+# (replaced by the label map stored in the model artifact when one is loaded)
+ML_LABELS = dict(GESTURE_LABELS)
 
-HOST = '127.0.0.1'
-PORT = 10020
+# Loaded by load_classifier() on first use (or during warm-up), not at import time
+ml_model = None
+ml_engine = None
+classifier_loaded = False
+_classifier_lock = threading.Lock()
 
-# ========= Feature Extraction (consistent with training) =========
-def extract_hand_features(landmarks):
+
+def load_classifier():
     """
-    landmarks: hand_landmarks.landmark (length 21)
-    Features: 21 keypoints (x,y), normalized relative to the wrist → 42 dimensions.
+    Load the gesture classifier once. Preferred is the versioned artifact (memory-mapped,
+    validated, no unpickling); then the exported engine; the sklearn pickle last.
+    classifier_loaded is only set once loading has finished, so callers may test it
+    without the lock.
     """
-    wrist = landmarks[0]
-    wx, wy = wrist.x, wrist.y
+    global classifier_loaded
+    with _classifier_lock:
+        if classifier_loaded:
+            return
+        try:
+            _load_classifier()
+        finally:
+            classifier_loaded = True
+
 
-    # Measure of hand size (wrist → middle finger tip)
-    middle_tip = landmarks[12]
-    hand_size = np.sqrt((middle_tip.x - wx) ** 2 + (middle_tip.y - wy) ** 2)
-    if hand_size < 1e-6:
-        hand_size = 1e-6  # avoid division by zero
+def _load_classifier():
+    global ml_model, ml_engine, ML_LABELS
+    schema_mismatch = False
 
-    features = []
-    for p in landmarks:
-        rx = (p.x - wx) / hand_size   # translation + scale normalization
-        ry = (p.y - wy) / hand_size
-        features.extend([rx, ry])
+    if os.path.exists(ARTIFACT_PATH):
+        try:
+            artifact = load_artifact(ARTIFACT_PATH)
+            ml_engine = artifact.engine
+            ML_LABELS = artifact.label_map
+            print(f"[Client] Loaded model artifact: {ARTIFACT_PATH} ({artifact.describe()})")
+            return
+        except FeatureSchemaError as e:
+            # The older formats carry no schema, so they are not tried either
+            print(f"[Client] Refusing model, fallback to rule-based recognition: {e}")
+            schema_mismatch = True
+        except (OSError, ArtifactError) as e:
+            print(f"[Client] Invalid model artifact, trying the other model files: {e}")
+    if schema_mismatch:
+        return
 
-    return np.array(features, dtype=np.float32)
+    print("Loaded SVM model path:", MODEL_PATH)
+
+    # Per-frame inference uses the flat NumPy engine; the sklearn pipeline is only a fallback
+    try:
+        if os.path.exists(ENGINE_PATH):
+            ml_engine = RbfSvmEngine.load(ENGINE_PATH)
+            print(f"[Client] Loaded precompiled RBF engine: {ENGINE_PATH}")
+            return
+    except Exception as e:
+        print(f"[Client] RBF engine unavailable, using sklearn predict: {e}")
+        ml_engine = None
+
+    try:
+        import joblib
+        ml_model = joblib.load(MODEL_PATH)
+        print(f"[Client] Loaded gesture classification model: {MODEL_PATH}")
+    except Exception as e:
+        print(f"[Client] Failed to load model {MODEL_PATH}, fallback to rule-based recognition: {e}")
+        ml_model = None
+        return
+
+    try:
+        ml_engine = RbfSvmEngine.from_pipeline(ml_model)
+        print("[Client] Compiled SVM model into NumPy RBF engine")
+    except Exception as e:
+        print(f"[Client] RBF engine unavailable, using sklearn predict: {e}")
+
+HOST = '127.0.0.1'
+PORT = 10020
+# Command transport (also --transport): "tcp", "udp" or "shm" (shared memory, same host);
+# must match TRANSPORT in controllers/gesture_cam/gesture_cam.py
+TRANSPORT = "tcp"
+# Identity for the controller's arbitration between several clients (0-255, higher wins)
+CLIENT_NAME = "gesture"
+CLIENT_PRIORITY = 1
+
+STABLE_THRESHOLD = 3  # consecutive frames before a new gesture becomes stable
+
+# Pipelined mode: capture, MediaPipe detection and classification/dispatch run in
+# separate threads linked by "keep newest" queues (also enabled with --pipelined)
+PIPELINED = False
+
+# Hand detection mode (also --tracking / --detect-scale):
+#   "full" -> every frame goes through hands.process at full resolution
+#   "roi"  -> downscaled full-frame search, then crop around the previous landmarks,
+#             falling back to full-frame search only when the hand is lost
+TRACKING_MODE = "full"
+DETECT_SCALE = 0.5    # downscale factor for full-frame search in "roi" mode
+ROI_MARGIN = 0.3      # ROI grows by this fraction of the hand box on each side
+
+# Streaming mode (also --stream): instead of debounced discrete commands, send a
+# (linear, angular) velocity setpoint derived from hand height and tilt every frame
+STREAM_VELOCITY = False
+
+# Per-stage latency instrumentation (enabled with --latency FILE): every frame carries
+# a FrameTrace, commands are sent with their trace, percentiles are written at exit
+latency_stats = None
+
+# Startup breakdown (module import -> warm-up -> first frame -> first command),
+# printed when the first command is sent
+startup = StartupTimer(STARTUP_T0)
+
+# OpenCV and MediaPipe are the slowest imports; they are only loaded when a camera
+# is used (load_cv2 / load_mediapipe), so replay mode and importing tools skip them
+cv2 = None
+mp = None
+
+
+# ========= Lazy Imports / Warm-up =========
+def load_cv2():
+    global cv2
+    if cv2 is None:
+        import cv2
+    return cv2
+
+def load_mediapipe():
+    global mp
+    if mp is None:
+        import mediapipe as mp
+    return mp
 
 # ========= Rule-Based Gesture Recognition =========
-def recognize_gesture_rule_based(landmarks, hand_label):
+def recognize_gesture_rule_based(points, hand_label):
     """
     Basic rule-based recognition using finger openness.
+    points: (21, 2|3) landmark array in frame-normalized coordinates.
     """
     finger_tips = [4, 8, 12, 16, 20]
     finger_dips = [2, 6, 10, 14, 18]
     finger_states = []
 
     # Thumb
-    thumb_tip = landmarks[finger_tips[0]]
-    thumb_dip = landmarks[finger_dips[0]]
+    thumb_tip = points[finger_tips[0]]
+    thumb_dip = points[finger_dips[0]]
     if hand_label == "Right":
-        finger_states.append(1 if thumb_tip.x > thumb_dip.x else 0)
+        finger_states.append(1 if thumb_tip[0] > thumb_dip[0] else 0)
     else:
-        finger_states.append(1 if thumb_tip.x < thumb_dip.x else 0)
+        finger_states.append(1 if thumb_tip[0] < thumb_dip[0] else 0)
 
     # Other fingers
     for i in range(1, 5):
-        tip = landmarks[finger_tips[i]]
-        dip = landmarks[finger_dips[i]]
-        finger_states.append(1 if tip.y < dip.y else 0)
+        tip = points[finger_tips[i]]
+        dip = points[finger_dips[i]]
+        finger_states.append(1 if tip[1] < dip[1] else 0)
 
     count = sum(finger_states)
 
@@ -98,22 +201,39 @@ def recognize_gesture_rule_based(landmarks, hand_label):
         return "UNKNOWN"
 
 # ========= SVM-Based Gesture Recognition =========
-def recognize_gesture_ml(landmarks):
+def recognize_gesture_ml(points, trace=None):
     """
     Use SVM model to classify gesture.
+    points: (21, 2|3) landmark array in frame-normalized coordinates.
     Returns gesture label string or None if classification fails.
     """
-    if ml_model is None:
+    if not classifier_loaded:
+        load_classifier()
+    if ml_engine is None and ml_model is None:
         return None
 
-    features = extract_hand_features(landmarks)
+    features = extract_hand_features(points)
+    if trace is not None:
+        trace.mark("features")
     try:
-        label = int(ml_model.predict([features])[0])  # 0~5
+        if ml_engine is not None:
+            label = int(ml_engine.predict_one(features))  # 0~5
+        else:
+            label = int(ml_model.predict([features])[0])
+        if trace is not None:
+            trace.mark("predict")
         return ML_LABELS.get(label, None)
     except Exception as e:
         print(f"[Client] SVM prediction failed. Fallback to rule-based: {e}")
         return None
 
+def classify_hand(points, hand_label, trace=None):
+    """Try ML prediction first, fall back to the rule-based method."""
+    g_ml = recognize_gesture_ml(points, trace)
+    if g_ml is not None:
+        return g_ml
+    return recognize_gesture_rule_based(points, hand_label)
+
 # ========= Command Mapping =========
 def map_gesture_to_command(gesture: str) -> str:
     mapping = {
@@ -126,116 +246,472 @@ def map_gesture_to_command(gesture: str) -> str:
     }
     return mapping.get(gesture, "")
 
-# ========= Main Program =========
-def main():
-    # Connect to robot controller server
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.connect((HOST, PORT))
-    print(f"[Client] Connected to {HOST}:{PORT}")
+# ========= Stable Gesture Logic =========
+class GestureDebouncer:
+    """
+    A new gesture only becomes stable after `threshold` consecutive frames agree.
+    update() returns the command to send when the stable gesture maps to a new command.
+    With a FrameTrace, the switching frame's trace gets a "debounce" mark and first_seen,
+    the capture time of the first frame that showed the new gesture.
+    """
 
-    # Open webcam
+    def __init__(self, threshold=STABLE_THRESHOLD):
+        self.threshold = threshold
+        self.stable_gesture = None
+        self.last_command = None
+        self.buffer = {"gesture": None, "count": 0}
+        self.candidate_since = None
+
+    def update(self, gesture, trace=None):
+        cmd = self._update(gesture, trace)
+        if trace is not None:
+            trace.mark("debounce")
+            if cmd:
+                trace.first_seen = self.candidate_since
+        return cmd
+
+    def _update(self, gesture, trace):
+        if gesture is None:
+            return None
+
+        if self.stable_gesture is None:
+            self.stable_gesture = gesture
+            print(f"[Client] Initial stable gesture: {self.stable_gesture}")
+            return None
+
+        if gesture == self.stable_gesture:
+            self.buffer = {"gesture": None, "count": 0}
+            return None
+
+        if gesture == self.buffer["gesture"]:
+            self.buffer["count"] += 1
+        else:
+            self.buffer = {"gesture": gesture, "count": 1}
+            self.candidate_since = trace.start if trace is not None else None
+
+        if self.buffer["count"] < self.threshold:
+            return None
+
+        self.stable_gesture = self.buffer["gesture"]
+        self.buffer = {"gesture": None, "count": 0}
+        print(f"[Client] Stable gesture switched to: {self.stable_gesture}")
+
+        cmd = map_gesture_to_command(self.stable_gesture)
+        if cmd and cmd != self.last_command:
+            self.last_command = cmd
+            return cmd
+        return None
+
+# ========= Frame Processing Helpers =========
+def open_camera():
+    load_cv2()
     cap = cv2.VideoCapture(0)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    return cap
 
-    if not cap.isOpened():
-        print("[Client] Failed to open camera")
-        return
-
-    mp_hands = mp.solutions.hands
-    mp_drawing = mp.solutions.drawing_utils
-
-    stable_gesture = None
-    gesture_buffer = {"gesture": None, "count": 0}
-    STABLE_THRESHOLD = 3
-    last_command = None
-
-    print("[Client] Camera activated, press 'q' to exit")
-
-    with mp_hands.Hands(
+def create_hands():
+    return load_mediapipe().solutions.hands.Hands(
         static_image_mode=False,
         max_num_hands=1,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5
-    ) as hands:
+    )
+
+def create_detector(hands, tracking_mode=TRACKING_MODE, detect_scale=DETECT_SCALE):
+    from hand_tracker import FullFrameDetector, RoiHandTracker
+    if tracking_mode == "roi":
+        # Crops get their own video-mode instance: hands tracks the full-frame stream only
+        return RoiHandTracker(hands, create_hands(),
+                              detect_scale=detect_scale, roi_margin=ROI_MARGIN)
+    return FullFrameDetector(hands)
+
+def detect_hand(detector, frame):
+    """
+    Run hand detection on a (flipped) BGR frame.
+    Returns (points, hand_label), points being a (21, 3) array in frame-normalized
+    coordinates, or (None, None) if no hand.
+    """
+    img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return detector.process(img_rgb)
+
+def draw_hand(frame, points):
+    """Draw landmarks and hand connections from a (21, 2|3) normalized landmark array."""
+    h, w = frame.shape[:2]
+    pixels = [(int(x * w), int(y * h)) for x, y in points[:, :2]]
+    for a, b in mp.solutions.hands.HAND_CONNECTIONS:
+        cv2.line(frame, pixels[a], pixels[b], (255, 255, 255), 2)
+    for p in pixels:
+        cv2.circle(frame, p, 3, (0, 0, 255), -1)
+
+def send_command(sender, cmd, trace=None):
+    # Framed binary command (command_protocol.py), trace attached when instrumented
+    sender.send(cmd, trace)
+    print(f"[Client] Sent command: {cmd}")
+
+def new_trace():
+    return FrameTrace() if latency_stats is not None else None
+
+def first_command_sent():
+    """Mark the first command of the session and print the startup breakdown."""
+    if startup.milestone("first_command"):
+        startup.print_summary("[Startup]")
+
+def warm_hands():
+    """Create the MediaPipe hand tracker and run one inference to initialise its graph."""
+    hands = create_hands()
+    hands.process(np.zeros((480, 640, 3), dtype=np.uint8))
+    return hands
+
+def warm_classifier():
+    load_classifier()
+    if ml_engine is not None:
+        ml_engine.predict_one(np.zeros(FEATURE_DIM))
+
+def connect_controller(transport, priority):
+    link = connect(transport, HOST, PORT)
+    sender = CommandSender(link)
+    sender.hello(CLIENT_NAME, priority)
+    print(f"[Client] Connected to {link.peer}")
+    return sender
+
+def warm_up(transport, priority, send=True):
+    """
+    Run the independent startup steps in parallel: camera open, MediaPipe import and
+    hand-tracker initialisation, classifier load and the controller connection.
+    Returns (cap, hands, sender); on failure everything already opened is released.
+    """
+    def timed(name, fn, *args):
+        with startup.span(name):
+            return fn(*args)
+
+    def camera():
+        timed("import cv2", load_cv2)
+        return timed("open camera", open_camera)
+
+    def tracker():
+        timed("import mediapipe", load_mediapipe)
+        return timed("hand tracker warm-up", warm_hands)
+
+    tasks = {"camera": camera, "hands": tracker,
+             "classifier": lambda: timed("classifier load + warm-up", warm_classifier)}
+    if send:
+        tasks["sender"] = lambda: timed("connect", connect_controller, transport, priority)
+
+    with startup.span("warm-up (parallel)"):
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="warmup") as pool:
+            futures = {name: pool.submit(fn) for name, fn in tasks.items()}
+        results, errors = {}, []
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors.append(e)
+
+    if errors:
+        if results.get("camera") is not None:
+            results["camera"].release()
+        if results.get("hands") is not None:
+            results["hands"].close()
+        if results.get("sender") is not None:
+            results["sender"].close()
+        raise errors[0]
+    return results["camera"], results["hands"], results.get("sender")
+
+def finish_trace(trace, hand_present):
+    """Record the client-side intervals of frames that reached the classifier."""
+    if trace is not None and hand_present:
+        latency_stats.add_trace(trace)
+
+# ========= Command Dispatch =========
+class GestureDispatcher:
+    """Discrete mode: classify -> debounce (STABLE_THRESHOLD) -> send when the command changes."""
+
+    def __init__(self, sender):
+        self.sender = sender
+        self.debouncer = GestureDebouncer()
+        self.commands = 0
+
+    @property
+    def status(self):
+        stable_gesture = self.debouncer.stable_gesture
+        return f"Stable: {stable_gesture if stable_gesture else 'None'}"
+
+    def process(self, points, hand_label, trace=None):
+        gesture = classify_hand(points, hand_label, trace) if points is not None else None
+        cmd = self.debouncer.update(gesture, trace)
+        if cmd:
+            self.commands += 1
+            if self.sender is not None:
+                send_command(self.sender, cmd, trace)
+            first_command_sent()
+        elif self.sender is not None:
+            # A held command is sent once: keep the UDP controller from expiring this client
+            self.sender.keepalive()
+        finish_trace(trace, points is not None)
+
+class VelocityDispatcher:
+    """
+    Streaming mode: one (linear, angular) setpoint per frame from hand height and tilt.
+    No hand or a fist commands zero velocity; the controller applies the newest setpoint.
+    """
+
+    def __init__(self, sender):
+        self.sender = sender
+        self.filter = VelocityFilter()
+        self.setpoint = (0.0, 0.0)
+        self.commands = 0
+
+    @property
+    def status(self):
+        linear, angular = self.setpoint
+        return f"Stream: v={linear:+.3f} m/s w={angular:+.2f} rad/s"
+
+    def process(self, points, hand_label, trace=None):
+        if points is None or recognize_gesture_ml(points, trace) == "FIST":
+            self.setpoint = self.filter.reset()
+        else:
+            self.setpoint = self.filter.update(*hand_to_velocity(points))
+        self.commands += 1
+        if self.sender is not None:
+            self.sender.send_velocity(*self.setpoint, trace)
+        first_command_sent()
+        finish_trace(trace, points is not None)
+
+def create_dispatcher(sender, stream=STREAM_VELOCITY):
+    return VelocityDispatcher(sender) if stream else GestureDispatcher(sender)
+
+def draw_status(frame, status):
+    cv2.putText(
+        frame,
+        status,
+        (10, 30),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (0, 255, 0),
+        2
+    )
+
+def exit_key_pressed():
+    key = cv2.waitKey(1) & 0xFF
+    return key == ord('q') or key == 27
+
+# ========= Main Program (sequential) =========
+def run_sequential(dispatcher, cap, tracking_mode=TRACKING_MODE, detect_scale=DETECT_SCALE, recorder=None,
+                   hands=None):
+    with hands or create_hands() as hands:
+        detector = create_detector(hands, tracking_mode, detect_scale)
         try:
             while True:
                 ret, frame = cap.read()
                 if not ret:
                     break
+                startup.milestone("first_frame")
+                trace = new_trace()
 
                 frame = cv2.flip(frame, 1)
-                img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img_rgb.flags.writeable = False
-                results = hands.process(img_rgb)
-                img_rgb.flags.writeable = True
-
-                current_frame_gesture = None
+                points, hand_label = detect_hand(detector, frame)
+                if trace is not None:
+                    trace.mark("detect")
+                if recorder is not None:
+                    recorder.add(points, hand_label)
 
                 # ===== Hand detection =====
-                if results.multi_hand_landmarks and results.multi_handedness:
-                    hand_landmarks = results.multi_hand_landmarks[0]
-                    hand_label = results.multi_handedness[0].classification[0].label
-                    mp_drawing.draw_landmarks(
-                        frame, hand_landmarks, mp_hands.HAND_CONNECTIONS
-                    )
-
-                    # 1. Try ML prediction first
-                    g_ml = recognize_gesture_ml(hand_landmarks.landmark)
-                    if g_ml is not None:
-                        current_frame_gesture = g_ml
-                    else:
-                        # 2. Fallback to rule-based method
-                        current_frame_gesture = recognize_gesture_rule_based(
-                            hand_landmarks.landmark, hand_label
-                        )
-
-                # ===== Stable gesture logic =====
-                if current_frame_gesture is not None:
-                    if stable_gesture is None:
-                        stable_gesture = current_frame_gesture
-                        print(f"[Client] Initial stable gesture: {stable_gesture}")
-                    elif current_frame_gesture != stable_gesture:
-                        if current_frame_gesture == gesture_buffer["gesture"]:
-                            gesture_buffer["count"] += 1
-                        else:
-                            gesture_buffer["gesture"] = current_frame_gesture
-                            gesture_buffer["count"] = 1
-
-                        if gesture_buffer["count"] >= STABLE_THRESHOLD:
-                            stable_gesture = gesture_buffer["gesture"]
-                            gesture_buffer = {"gesture": None, "count": 0}
-                            print(f"[Client] Stable gesture switched to: {stable_gesture}")
-
-                            cmd = map_gesture_to_command(stable_gesture)
-                            if cmd and cmd != last_command:
-                                sock.sendall(cmd.encode('utf-8'))
-                                print(f"[Client] Sent command: {cmd}")
-                                last_command = cmd
-                    else:
-                        gesture_buffer = {"gesture": None, "count": 0}
+                if points is not None:
+                    draw_hand(frame, points)
 
-                # ===== Display status =====
-                cv2.putText(
-                    frame,
-                    f"Stable: {stable_gesture if stable_gesture else 'None'}",
-                    (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.8,
-                    (0, 255, 0),
-                    2
-                )
+                # ===== Classification / stable gesture logic / send =====
+                dispatcher.process(points, hand_label, trace)
 
+                # ===== Display status =====
+                draw_status(frame, dispatcher.status)
                 cv2.imshow("Gesture Client", frame)
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q') or key == 27:
+                if exit_key_pressed():
                     break
+        finally:
+            detector.close()
+
+        print(f"[Client] Detection {detector.summary()}")
+
+# ========= Main Program (pipelined) =========
+def run_pipelined(dispatcher, cap, tracking_mode=TRACKING_MODE, detect_scale=DETECT_SCALE, recorder=None,
+                  hands=None):
+    """
+    capture thread  -> [frames]  -> detect thread -> [hands] -> classify/dispatch thread
+                                         |
+                                         +-> [display] -> main thread (imshow / keys)
+    Every queue keeps only the newest item, so a slow hand tracker drops stale
+    frames instead of building up latency.
+    """
+    stop_event = threading.Event()
+
+    frame_q = LatestQueue(maxsize=1)
+    hand_q = LatestQueue(maxsize=1)
+    display_q = LatestQueue(maxsize=1)
+
+    def capture():
+        ret, frame = cap.read()
+        if not ret:
+            return StageThread.STOP
+        startup.milestone("first_frame")
+        trace = new_trace()
+        return cv2.flip(frame, 1), trace
+
+    if hands is None:
+        hands = create_hands()
+    detector = create_detector(hands, tracking_mode, detect_scale)
+
+    def detect(item):
+        frame, trace = item
+        points, hand_label = detect_hand(detector, frame)
+        if trace is not None:
+            trace.mark("detect")
+        if recorder is not None:
+            recorder.add(points, hand_label)
+        if points is not None:
+            draw_hand(frame, points)
+        display_q.put(frame)
+        return (points, hand_label, trace)
+
+    def classify(item):
+        dispatcher.process(*item)
+
+    detect_stage = StageThread("detect", detect, stop_event, inbox=frame_q, outboxes=[hand_q])
+    stages = [
+        StageThread("capture", capture, stop_event, outboxes=[frame_q]),
+        detect_stage,
+        StageThread("classify", classify, stop_event, inbox=hand_q),
+    ]
+    for stage in stages:
+        stage.start()
 
+    try:
+        while not stop_event.is_set():
+            try:
+                frame = display_q.get(timeout=StageThread.POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+            draw_status(frame, dispatcher.status)
+            cv2.imshow("Gesture Client", frame)
+            if exit_key_pressed():
+                break
+    finally:
+        stop_event.set()
+        for stage in stages:
+            stage.join(timeout=1.0)
+        if detect_stage.is_alive():
+            # Closing MediaPipe under a running process() call would crash it; the
+            # thread is a daemon and the instances go away with the process
+            print("[Pipeline] Detect stage still running, hand tracker left open")
+        else:
+            detector.close()
+            hands.close()
+        for stage in stages:
+            print(f"[Pipeline] {stage.summary()}")
+        print(f"[Client] Detection {detector.summary()}")
+        print(f"[Pipeline] Dropped stale frames: detect={frame_q.dropped}, classify={hand_q.dropped}")
+
+# ========= Main Program (replay, no camera) =========
+def run_replay(dispatcher, source):
+    """
+    Feed recorded landmarks through the same dispatch path (classify / debounce / send,
+    or velocity streaming) as the live modes. The dispatcher's sender may be None to
+    measure the client side alone.
+    """
+    frames = 0
+    t0 = time.perf_counter()
+
+    for _, points, hand_label in source:
+        dispatcher.process(points, hand_label, new_trace())
+        frames += 1
+
+    elapsed = time.perf_counter() - t0
+    rate = frames / elapsed if elapsed > 0 else 0.0
+    print(f"[Replay] {frames} frames, {dispatcher.commands} commands in {elapsed:.3f} s ({rate:.0f} frames/s)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gesture recognition client")
+    parser.add_argument("--pipelined", action="store_true", default=PIPELINED,
+                        help="run capture / detection / classification in separate threads")
+    parser.add_argument("--tracking", choices=["full", "roi"], default=TRACKING_MODE,
+                        help="hand detection mode: full frame every time, or ROI tracking")
+    parser.add_argument("--detect-scale", type=float, default=DETECT_SCALE,
+                        help="downscale factor for full-frame search in ROI mode")
+    parser.add_argument("--record", metavar="DIR",
+                        help="record per-frame landmarks, handedness and timestamps")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="replay a landmark recording instead of using the camera")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay at the original frame timing (default: as fast as possible)")
+    parser.add_argument("--loops", type=int, default=1, help="repeat the replay N times")
+    parser.add_argument("--transport", choices=TRANSPORTS, default=TRANSPORT,
+                        help="command transport to the controller")
+    parser.add_argument("--priority", type=int, default=CLIENT_PRIORITY,
+                        help="arbitration priority announced to the controller (0-255)")
+    parser.add_argument("--no-send", action="store_true",
+                        help="do not connect to the controller, only count commands")
+    parser.add_argument("--stream", action="store_true", default=STREAM_VELOCITY,
+                        help="stream (linear, angular) velocity setpoints every frame")
+    parser.add_argument("--latency", metavar="FILE.json",
+                        help="enable per-stage latency instrumentation, write percentiles at exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    global latency_stats
+    startup.milestone("main")
+    args = parse_args(argv)
+    if args.latency:
+        latency_stats = LatencyStats()
+
+    sender = None
+    try:
+        if args.replay:
+            # No camera: only the classifier and the controller connection are needed
+            with startup.span("classifier load + warm-up"):
+                warm_classifier()
+            if not args.no_send:
+                with startup.span("connect"):
+                    sender = connect_controller(args.transport, args.priority)
+            dispatcher = create_dispatcher(sender, args.stream)
+            source = ReplaySource(LandmarkRecording.load(args.replay), args.realtime, args.loops)
+            print(f"[Client] Replaying {args.replay} ({len(source)} frames, "
+                  f"{'realtime' if args.realtime else 'as fast as possible'})")
+            run_replay(dispatcher, source)
+            return
+
+        # Open webcam, hand tracker, classifier and connection in parallel
+        cap, hands, sender = warm_up(args.transport, args.priority, send=not args.no_send)
+        dispatcher = create_dispatcher(sender, args.stream)
+
+        if not cap.isOpened():
+            hands.close()
+            print("[Client] Failed to open camera")
+            return
+
+        print(f"[Client] Camera activated ({'pipelined' if args.pipelined else 'sequential'} mode, "
+              f"{args.tracking} detection, {'velocity streaming' if args.stream else 'discrete commands'}), "
+              f"press 'q' to exit")
+
+        recorder = LandmarkRecorder(args.record) if args.record else None
+        try:
+            if args.pipelined:
+                run_pipelined(dispatcher, cap, args.tracking, args.detect_scale, recorder, hands)
+            else:
+                run_sequential(dispatcher, cap, args.tracking, args.detect_scale, recorder, hands)
         finally:
             cap.release()
             cv2.destroyAllWindows()
-            sock.close()
-            print("[Client] Exited")
+            if recorder is not None:
+                recorder.close()
+    finally:
+        if sender is not None:
+            sender.close()
+        if "first_command" not in startup.milestones:
+            startup.print_summary("[Startup]")
+        if latency_stats is not None:
+            latency_stats.print_summary("[Latency]")
+            latency_stats.write(args.latency)
+        print("[Client] Exited")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,161 @@
+# landmark_recording.py
+# Record per-frame hand landmarks to disk and replay them without a camera.
+#
+# A recording is a directory of uncompressed .npy files, memory-mapped on load so a
+# replay only reads the frames it touches:
+#   timestamps.npy     (N,)        float64  seconds since the first frame
+#   landmarks.npy      (N, 21, 3)  float32  frame-normalized (x, y, z), NaN when no hand
+#   handedness.npy     (N,)        int8     0 = Left, 1 = Right, -1 = no hand
+#   format_version.npy ()          int32
+# Version 1 recordings (a single .npz file with the same arrays) are still loaded, eagerly.
+import os
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 2
+ARRAYS = ("timestamps", "landmarks", "handedness")
+NUM_LANDMARKS = 21
+
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_NAMES = {code: name for name, code in HANDEDNESS_CODES.items()}
+
+
+class LandmarkRecorder:
+    """
+    Appends one record per processed frame. Buffers grow by doubling, so
+    add() stays cheap on the hot path; the file is written by close().
+    """
+
+    def __init__(self, path, capacity=4096):
+        self.path = path
+        self.count = 0
+        self._t0 = None
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._landmarks = np.empty((capacity, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._handedness = np.empty(capacity, dtype=np.int8)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _grow(self):
+        new_cap = 2 * len(self._timestamps)
+        self._timestamps = np.resize(self._timestamps, new_cap)
+        self._landmarks = np.resize(self._landmarks, (new_cap, NUM_LANDMARKS, 3))
+        self._handedness = np.resize(self._handedness, new_cap)
+
+    def add(self, points, hand_label, timestamp=None):
+        """points: (21, 2|3) array or None when no hand was detected."""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = timestamp
+        if self.count == len(self._timestamps):
+            self._grow()
+
+        i = self.count
+        self._timestamps[i] = timestamp - self._t0
+        if points is None:
+            self._landmarks[i] = np.nan
+            self._handedness[i] = -1
+        else:
+            dims = points.shape[1]
+            self._landmarks[i, :, :dims] = points
+            if dims < 3:
+                self._landmarks[i, :, dims:] = 0.0
+            self._handedness[i] = HANDEDNESS_CODES.get(hand_label, -1)
+        self.count += 1
+
+    def close(self):
+        if self.path is None:
+            return
+        n = self.count
+        os.makedirs(self.path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(self.path, name + ".npy"), getattr(self, "_" + name)[:n])
+        # Written last: a directory without it is an interrupted save
+        np.save(os.path.join(self.path, "format_version.npy"), np.int32(FORMAT_VERSION))
+        print(f"[Record] Saved {n} frames to {self.path}")
+        self.path = None
+
+
+class LandmarkRecording:
+    """Arrays of a recording loaded from disk."""
+
+    def __init__(self, timestamps, landmarks, handedness):
+        self.timestamps = timestamps
+        self.landmarks = landmarks
+        self.handedness = handedness
+
+    @classmethod
+    def load(cls, path):
+        if os.path.isfile(path):
+            return cls._load_npz(path)
+        version_path = os.path.join(path, "format_version.npy")
+        if not os.path.exists(version_path):
+            raise ValueError(f"{path} is not a complete landmark recording")
+        version = int(np.load(version_path))
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording format version {version} in {path}")
+        return cls(*(np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in ARRAYS))
+
+    @classmethod
+    def _load_npz(cls, path):
+        with np.load(path) as data:
+            version = int(data["format_version"])
+            if version != 1:
+                raise ValueError(f"Unsupported recording format version {version} in {path}")
+            return cls(*(data[name] for name in ARRAYS))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def hand_present(self):
+        return self.handedness >= 0
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1]) if len(self) else 0.0
+
+
+class ReplaySource:
+    """
+    Iterates a recording as (timestamp, points, hand_label) tuples, points being
+    None for frames without a hand.
+    realtime=False replays as fast as possible; realtime=True sleeps to reproduce
+    the original frame timing. loops > 1 repeats the recording for longer runs.
+    """
+
+    def __init__(self, recording, realtime=False, loops=1):
+        self.recording = recording
+        self.realtime = realtime
+        self.loops = loops
+
+    def __len__(self):
+        return len(self.recording) * self.loops
+
+    def __iter__(self):
+        rec = self.recording
+        period = rec.duration
+        if len(rec) > 1:
+            period += (rec.timestamps[-1] - rec.timestamps[0]) / (len(rec) - 1)
+        start = time.perf_counter()
+
+        for loop in range(self.loops):
+            offset = loop * period
+            for i in range(len(rec)):
+                t = offset + float(rec.timestamps[i])
+                if self.realtime:
+                    delay = t - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+
+                code = int(rec.handedness[i])
+                if code < 0:
+                    yield t, None, None
+                else:
+                    yield t, rec.landmarks[i], HANDEDNESS_NAMES[code]
@@ -0,0 +1,186 @@
+# latency_stats.py
+# Optional per-stage latency instrumentation, shared by gesture_client.py and the
+# Webots controller (controllers/gesture_cam/gesture_cam.py).
+#
+# A FrameTrace collects ordered (stage, timestamp) marks for one camera frame:
+#   capture -> detect -> features -> predict -> debounce -> send      (client)
+#           -> recv -> actuate                                       (controller)
+# The client attaches the marks to every command frame it sends (command_protocol.py),
+# so the controller can compute the end-to-end delay. LatencyStats keeps a rolling window per interval and
+# writes p50/p95/p99 plus a histogram to a JSON file at shutdown.
+# StartupTimer records the client's startup breakdown up to its first command.
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Client and controller run on the same host: perf_counter is a system-wide
+# monotonic clock on Windows, Linux and macOS, so marks are comparable across processes.
+clock = time.perf_counter
+
+# Histogram bin edges in milliseconds (last bin is open-ended)
+HISTOGRAM_EDGES_MS = [0.0, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf")]
+
+
+class FrameTrace:
+    """
+    Timestamps of one frame on its way from the camera to the motors.
+    first_seen is the capture time of the first frame showing the new gesture,
+    i.e. before the STABLE_THRESHOLD debounce started counting.
+    """
+
+    __slots__ = ("marks", "first_seen")
+
+    def __init__(self, start=None):
+        self.marks = [("capture", clock() if start is None else start)]
+        self.first_seen = None
+
+    def mark(self, stage):
+        self.marks.append((stage, clock()))
+
+    @property
+    def start(self):
+        return self.marks[0][1]
+
+    def encode(self):
+        """Compact text form: 'stage=t;stage=t;...' (first_seen included when known)."""
+        marks = self.marks
+        if self.first_seen is not None:
+            marks = [("first_seen", self.first_seen)] + marks
+        return ";".join(f"{name}={t:.6f}" for name, t in marks)
+
+    @classmethod
+    def decode(cls, text):
+        trace = cls.__new__(cls)
+        trace.marks = []
+        trace.first_seen = None
+        for item in text.split(";"):
+            name, _, value = item.partition("=")
+            if name == "first_seen":
+                trace.first_seen = float(value)
+            else:
+                trace.marks.append((name, float(value)))
+        return trace
+
+
+class RollingPercentiles:
+    """The last `window` samples (seconds) of one latency interval."""
+
+    def __init__(self, window=4096):
+        self._buf = np.empty(window, dtype=np.float64)
+        self.count = 0
+
+    def add(self, seconds):
+        self._buf[self.count % len(self._buf)] = seconds
+        self.count += 1
+
+    def values(self):
+        return self._buf[:min(self.count, len(self._buf))]
+
+    def summary(self):
+        ms = self.values() * 1000.0
+        if len(ms) == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        hist, _ = np.histogram(ms, bins=HISTOGRAM_EDGES_MS)
+        return {
+            "count": self.count,
+            "window": len(ms),
+            "mean_ms": float(ms.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(ms.max()),
+            "histogram_edges_ms": HISTOGRAM_EDGES_MS[:-1],
+            "histogram_counts": hist.tolist(),
+        }
+
+
+class LatencyStats:
+    """Rolling latency windows keyed by interval name ('capture->detect', 'total', ...)."""
+
+    def __init__(self, window=4096):
+        self.window = window
+        self.intervals = {}
+
+    def add(self, name, seconds):
+        hist = self.intervals.get(name)
+        if hist is None:
+            hist = self.intervals[name] = RollingPercentiles(self.window)
+        hist.add(seconds)
+
+    def add_trace(self, trace):
+        """Record every consecutive interval of a trace plus the end-to-end total."""
+        marks = trace.marks
+        for (prev, t0), (name, t1) in zip(marks, marks[1:]):
+            self.add(f"{prev}->{name}", t1 - t0)
+        if len(marks) > 1:
+            self.add(f"{marks[0][0]}->{marks[-1][0]}", marks[-1][1] - marks[0][1])
+        if trace.first_seen is not None:
+            self.add(f"first_seen->{marks[-1][0]}", marks[-1][1] - trace.first_seen)
+
+    def report(self):
+        return {name: hist.summary() for name, hist in self.intervals.items()}
+
+    def print_summary(self, prefix):
+        for name, hist in self.intervals.items():
+            s = hist.summary()
+            if s["count"]:
+                print(f"{prefix} {name:24s} n={s['count']:6d}  p50={s['p50_ms']:8.2f} ms  "
+                      f"p95={s['p95_ms']:8.2f} ms  p99={s['p99_ms']:8.2f} ms")
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"[Latency] Written to {path}")
+
+
+class StartupTimer:
+    """
+    Startup breakdown relative to `origin`: named spans (they may overlap when
+    started from parallel warm-up threads) and one-shot milestones such as the
+    first frame or the first command.
+    """
+
+    def __init__(self, origin=None):
+        self.origin = clock() if origin is None else origin
+        self.spans = []        # (name, start, end)
+        self.milestones = {}   # name -> time
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        t0 = clock()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.spans.append((name, t0, clock()))
+
+    def milestone(self, name):
+        """Record the first occurrence of `name`; returns True only that first time."""
+        if name in self.milestones:
+            return False
+        with self._lock:
+            if name in self.milestones:
+                return False
+            self.milestones[name] = clock()
+            return True
+
+    def report(self):
+        ms = lambda t: (t - self.origin) * 1000.0
+        return {
+            "spans": [{"name": n, "start_ms": ms(t0), "end_ms": ms(t1), "duration_ms": (t1 - t0) * 1000.0}
+                      for n, t0, t1 in sorted(self.spans, key=lambda s: s[1])],
+            "milestones_ms": {n: ms(t) for n, t in sorted(self.milestones.items(), key=lambda m: m[1])},
+        }
+
+    def print_summary(self, prefix):
+        report = self.report()
+        for s in report["spans"]:
+            print(f"{prefix} {s['name']:26s} {s['start_ms']:8.1f} -> {s['end_ms']:8.1f} ms  "
+                  f"({s['duration_ms']:7.1f} ms)")
+        for name, t in report["milestones_ms"].items():
+            print(f"{prefix} {name:26s} at {t:8.1f} ms")
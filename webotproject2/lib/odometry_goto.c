@@ -23,7 +23,6 @@
 
 #include <math.h>
 #include <stdlib.h>
-#include <webots/robot.h>
 
 #define PI 3.14159265358979
 
@@ -84,9 +83,17 @@ void odometry_goto_step(struct sOdometryGoto *og) {
   float v_e     = v_c * v_adapt;
   float omega_e = omega_c * omega_adapt;
 
-  // Wheel commands
-  og->result.speed_left  = (int)(v_e - omega_e / 2.f);
-  og->result.speed_right = (int)(v_e + omega_e / 2.f);
+  // Wheel commands, scaled down together to [-1000, 1000] so that the commanded
+  // curvature is kept (clamping each wheel alone drives straight while far away)
+  float speed_left  = v_e - omega_e / 2.f;
+  float speed_right = v_e + omega_e / 2.f;
+  float speed_max   = fmaxf(fabsf(speed_left), fabsf(speed_right));
+  if (speed_max > 1000.f) {
+    speed_left  *= 1000.f / speed_max;
+    speed_right *= 1000.f / speed_max;
+  }
+  og->result.speed_left  = (int)speed_left;
+  og->result.speed_right = (int)speed_right;
 
   // Secondary clamping (double safety): limit to [-1000, 1000]
   if (og->result.speed_left  >  1000) og->result.speed_left  =  1000;
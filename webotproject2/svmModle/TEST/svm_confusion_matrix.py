@@ -1,63 +1,26 @@
+# svm_confusion_matrix.py
+# Confusion matrix of TEST/svmModel.joblib on gesture_test_data.csv.
+# Thin wrapper around ../evaluate.py: predictions are cached, and the heatmap is
+# written to TEST/eval/ instead of being shown in a window.
 import os
-import joblib
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import confusion_matrix
+import sys
 
-# ======== Class label mapping (numeric → gesture name) ========
-LABEL_NAME_MAP = {
-    0: "FIST / Stop",
-    1: "Palm Up / Forward",
-    2: "Palm Right / TurnR",
-    3: "Palm Left / TurnL",
-    4: "One Finger / Speed+",
-    5: "Two Fingers / Speed-",
-}
+import numpy as np
 
 # ======== Path settings ========
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "svmModel.joblib")
 TEST_CSV = os.path.join(BASE_DIR, "gesture_test_data.csv")  # Test dataset
+OUT_DIR = os.path.join(BASE_DIR, "eval")
 
-print("Loading model from:", MODEL_PATH)
-clf = joblib.load(MODEL_PATH)
-
-print("Loading test data from:", TEST_CSV)
-df = pd.read_csv(TEST_CSV)
-
-# ======== Data preparation ========
-y_true = df["label"].values
-X = df.drop(columns=["label"]).values
-
-y_pred = clf.predict(X)
-
-# All labels present in the dataset
-labels = sorted(np.unique(y_true).tolist())
-
-# Display names for visualization
-display_names = [LABEL_NAME_MAP[l] for l in labels]
-
-# ======== Generate Confusion Matrix ========
-cm = confusion_matrix(y_true, y_pred, labels=labels)
-
-print("\nConfusion Matrix (Rows = True, Columns = Pred):\n")
-print(cm)
-
-# ======== Plot Confusion Matrix Heatmap ========
-plt.figure(figsize=(10, 7))
-sns.heatmap(cm,
-            annot=True,
-            fmt="d",
-            cmap="Blues",
-            xticklabels=display_names,
-            yticklabels=display_names)
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from evaluate import evaluate_pair
 
-plt.xlabel("Predicted Class")
-plt.ylabel("True Class")
-plt.title("SVM Confusion Matrix for Gesture Classification")
+if __name__ == "__main__":
+    print("Evaluating model:", MODEL_PATH)
+    print("On test data:", TEST_CSV)
+    result = evaluate_pair(MODEL_PATH, TEST_CSV, OUT_DIR)
 
-plt.xticks(rotation=30, ha="right")
-plt.tight_layout()
-plt.show()
+    print("\nConfusion Matrix (Rows = True, Columns = Pred):\n")
+    print(np.array(result["confusion_matrix"]))
+    print(f"\nHeatmap written to: {os.path.join(result['out_dir'], 'confusion_matrix.png')}")
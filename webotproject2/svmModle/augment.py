@@ -0,0 +1,146 @@
+# augment.py
+# Streaming landmark augmentation for training ("train_svm.py --augment N").
+#
+# A feature row (f0..f41) is the hand's 21 landmarks relative to the wrist, divided by
+# the wrist -> middle fingertip distance, so it can be transformed as a point set:
+#   rotation  in-plane rotation of the hand (±MAX_ROTATION_DEG)
+#   scale     independent x / y stretch (camera aspect / perspective); a uniform
+#             scale would be removed again by the hand-size normalization
+#   jitter    Gaussian noise on every landmark, wrist included (detector noise)
+#   mirror    x -> -x, i.e. the other hand; PALM_LEFT and PALM_RIGHT swap labels
+# after which the features are re-normalized with extract_features_batch.
+#
+# augment_stream() draws rows at random and yields augmented (X, y) batches of
+# batch_size rows, so only one batch exists at a time. fit_stream() trains an SVC on
+# such a stream the same way incremental_train.py learns new rows: each batch is
+# fitted together with the current support vectors only. Rows the current model
+# already classifies outside the margin of every pair of their class cannot become
+# support vectors, so they are dropped first; the remaining margin rows are pooled
+# and fitted once REFIT_ROWS of them are collected (and at the end of the stream).
+# 1M samples: 245 fits / 44 s with one fit per batch, 7 fits / 22 s with pooling,
+# same test accuracy (python svmModle/train_svm.py --augment 1000000).
+import time
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVC
+
+from extract_features import FEATURE_DIM, NUM_LANDMARKS, extract_features_batch
+from rbf_engine import RbfSvmEngine
+
+MAX_ROTATION_DEG = 15.0
+SCALE_RANGE = (0.9, 1.1)
+JITTER_STD = 0.02          # in hand-size units
+MIRROR_PROB = 0.5
+MIRROR_LABELS = {2: 3, 3: 2}   # PALM_RIGHT <-> PALM_LEFT (ML_LABELS in gesture_client.py)
+BATCH_SIZE = 4096
+REFIT_ROWS = 1024          # pooled margin rows per SVC fit in fit_stream
+REPORT_EVERY = 10          # batches between progress lines in fit_stream
+
+
+def augment_batch(X, y, rng, rotation=MAX_ROTATION_DEG, scale=SCALE_RANGE, jitter=JITTER_STD,
+                  mirror=MIRROR_PROB):
+    """Randomly transformed copies of the feature rows X (N, 42) with their labels."""
+    n = len(X)
+    pts = np.asarray(X, dtype=np.float64).reshape(n, NUM_LANDMARKS, 2).copy()
+    labels = np.asarray(y, dtype=np.int32).copy()
+
+    if rotation:
+        theta = np.deg2rad(rng.uniform(-rotation, rotation, n))
+        cos, sin = np.cos(theta)[:, None], np.sin(theta)[:, None]
+        px, py = pts[:, :, 0].copy(), pts[:, :, 1].copy()
+        pts[:, :, 0] = cos * px - sin * py
+        pts[:, :, 1] = sin * px + cos * py
+    if scale is not None:
+        pts *= rng.uniform(scale[0], scale[1], (n, 1, 2))
+    if jitter:
+        pts += rng.normal(0.0, jitter, pts.shape)
+    if mirror:
+        flip = rng.random(n) < mirror
+        pts[flip, :, 0] *= -1.0
+        lookup = np.arange(max(labels.max(initial=0), *MIRROR_LABELS) + 1, dtype=np.int32)
+        for src, dst in MIRROR_LABELS.items():
+            lookup[src] = dst
+        labels[flip] = lookup[labels[flip]]
+
+    return extract_features_batch(pts), labels
+
+
+def augment_stream(X, y, n_samples=None, batch_size=BATCH_SIZE, seed=None, **params):
+    """
+    Yield (X_aug float32 (b, 42), y_aug int32 (b,)) batches of randomly chosen, augmented
+    rows until n_samples rows were produced (endless with n_samples=None).
+    params are passed on to augment_batch.
+    """
+    X = np.asarray(X)
+    if X.ndim != 2 or X.shape[1] != FEATURE_DIM:
+        raise ValueError(f"Expected features of shape (N, {FEATURE_DIM}), got {X.shape}")
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    produced = 0
+    while n_samples is None or produced < n_samples:
+        b = batch_size if n_samples is None else min(batch_size, n_samples - produced)
+        idx = rng.integers(0, len(X), b)
+        yield augment_batch(X[idx], y[idx], rng, **params)
+        produced += b
+
+
+def margin_rows(engine, X, y):
+    """
+    Mask of the rows that are misclassified or inside the margin (|decision| < 1) of a
+    class pair involving their own label; only these can change the SVM.
+    """
+    pos = engine.classes[engine.pair_pos]
+    neg = engine.classes[engine.pair_neg]
+    decision = engine.decision_function(X)
+    y = np.asarray(y)[:, None]
+    # Signed margin towards the true class; pairs without the true class do not count
+    margin = np.where(y == pos, decision, np.where(y == neg, -decision, np.inf))
+    unknown = ~np.isin(y[:, 0], engine.classes)
+    return unknown | (margin < 1.0).any(axis=1)
+
+
+def _refit(svc, scaler, params, X_new, y_new):
+    """SVC fitted on svc's support vectors plus the unscaled rows X_new, and its engine."""
+    labels = np.repeat(svc.classes_, svc.n_support_)
+    svc = SVC(**params).fit(np.vstack([svc.support_vectors_, scaler.transform(X_new)]),
+                            np.concatenate([labels, y_new]))
+    return svc, RbfSvmEngine.from_pipeline(Pipeline([("scaler", scaler), ("svm", svc)]))
+
+
+def fit_stream(model, stream, refit_rows=REFIT_ROWS):
+    """
+    Continue training a fitted Pipeline([("scaler", ...), ("svm", SVC)]) on (X, y) batches.
+    The margin rows of the batches (margin_rows) are pooled and, every refit_rows rows,
+    fitted together with the current support vectors; the scaler, C and the numeric gamma
+    stay fixed. Returns the new Pipeline.
+    """
+    scaler = model.named_steps["scaler"]
+    svc = model.named_steps["svm"]
+    params = dict(svc.get_params(), gamma=svc._gamma)
+    engine = RbfSvmEngine.from_pipeline(model)
+    t0 = time.perf_counter()
+    seen = used = fits = 0
+    pool_X, pool_y = [], []
+    for i, (X_batch, y_batch) in enumerate(stream, 1):
+        seen += len(y_batch)
+        keep = margin_rows(engine, X_batch, y_batch)
+        pool_X.append(X_batch[keep])
+        pool_y.append(y_batch[keep])
+        pooled = sum(len(p) for p in pool_y)
+        if pooled >= refit_rows:
+            svc, engine = _refit(svc, scaler, params, np.vstack(pool_X), np.concatenate(pool_y))
+            pool_X, pool_y = [], []
+            used += pooled
+            fits += 1
+        if i % REPORT_EVERY == 0:
+            print(f"[Augment] {seen} samples ({used} in margin, {fits} fits), "
+                  f"{svc.support_.size} support vectors, {time.perf_counter() - t0:.1f} s")
+    pooled = sum(len(p) for p in pool_y)
+    if pooled:
+        svc, engine = _refit(svc, scaler, params, np.vstack(pool_X), np.concatenate(pool_y))
+        used += pooled
+        fits += 1
+    print(f"[INFO] Trained on {seen} augmented samples in {time.perf_counter() - t0:.1f} s: "
+          f"{used} in the margin, {fits} fits, {svc.support_.size} support vectors")
+    return Pipeline([("scaler", scaler), ("svm", svc)])
@@ -0,0 +1,88 @@
+# bench_features.py
+# Micro-benchmark: original per-landmark Python loop vs. vectorized feature extraction.
+#
+#   python svmModle/bench_features.py [--batch 1000] [--repeat 2000]
+import argparse
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+
+from extract_features import (
+    NUM_LANDMARKS,
+    extract_features_batch,
+    extract_hand_features,
+    landmarks_to_array,
+)
+
+
+def extract_hand_features_loop(landmarks):
+    """Reference implementation: the original per-frame Python loop."""
+    wrist = landmarks[0]
+    wx, wy = wrist.x, wrist.y
+
+    middle_tip = landmarks[12]
+    hand_size = np.sqrt((middle_tip.x - wx) ** 2 + (middle_tip.y - wy) ** 2)
+    if hand_size < 1e-6:
+        hand_size = 1e-6
+
+    features = []
+    for p in landmarks:
+        rx = (p.x - wx) / hand_size
+        ry = (p.y - wy) / hand_size
+        features.extend([rx, ry])
+
+    return np.array(features, dtype=np.float32)
+
+
+def make_fake_hands(n, seed=0):
+    """Random hands as (n, 21, 3) float32 arrays plus MediaPipe-like landmark lists."""
+    rng = np.random.default_rng(seed)
+    points = rng.random((n, NUM_LANDMARKS, 3), dtype=np.float32)
+    hands = [
+        [SimpleNamespace(x=float(p[0]), y=float(p[1]), z=float(p[2])) for p in hand]
+        for hand in points
+    ]
+    return points, hands
+
+
+def per_call_us(stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hand feature extraction")
+    parser.add_argument("--batch", type=int, default=1000, help="hands per batch call")
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per timing run")
+    args = parser.parse_args()
+
+    points, hands = make_fake_hands(args.batch)
+    one_hand = hands[0]
+    one_array = landmarks_to_array(one_hand)
+
+    # Sanity check: every implementation must produce identical features
+    ref = np.stack([extract_hand_features_loop(h) for h in hands])
+    assert np.array_equal(ref, extract_features_batch(points)), "batch mismatch"
+    assert np.array_equal(ref[0], extract_hand_features(one_hand)), "single (landmarks) mismatch"
+    assert np.array_equal(ref[0], extract_hand_features(one_array)), "single (array) mismatch"
+
+    print(f"[Bench] Single hand, {args.repeat} calls each")
+    loop_us = per_call_us(lambda: extract_hand_features_loop(one_hand), args.repeat)
+    lm_us = per_call_us(lambda: extract_hand_features(one_hand), args.repeat)
+    arr_us = per_call_us(lambda: extract_hand_features(one_array), args.repeat)
+    print(f"  loop (original)       : {loop_us:8.2f} us/hand")
+    print(f"  fast path (landmarks) : {lm_us:8.2f} us/hand  ({loop_us / lm_us:.1f}x)")
+    print(f"  fast path (array)     : {arr_us:8.2f} us/hand  ({loop_us / arr_us:.1f}x)")
+
+    number = max(1, args.repeat // args.batch)
+    print(f"\n[Bench] Batch of {args.batch} hands")
+    loop_batch_us = per_call_us(lambda: [extract_hand_features_loop(h) for h in hands], number)
+    vec_batch_us = per_call_us(lambda: extract_features_batch(points), max(number, 20))
+    print(f"  loop (original)       : {loop_batch_us / args.batch:8.3f} us/hand")
+    print(f"  vectorized batch      : {vec_batch_us / args.batch:8.3f} us/hand"
+          f"  ({loop_batch_us / vec_batch_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# benchmark_models.py
+# Accuracy / latency benchmark of candidate classifiers for recognize_gesture_ml.
+#
+#   python benchmark_models.py                          write benchmark_models.json
+#   python benchmark_models.py --compare old.json       also compare with an earlier run
+#   python benchmark_models.py --models rbf_svc knn_kdtree
+#
+# Every model is trained on gesture_data.csv and evaluated on TEST/gesture_test_data.csv.
+# Per model the report holds: accuracy, single-sample latency percentiles (one
+# 1x42 predict call, as the client does per frame), batch throughput, size of the
+# saved model and its load time. --compare exits with status 1 on a regression, or
+# when a model of the old report is missing and --models did not restrict the run.
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC, LinearSVC
+
+from dataset import file_hash, load_dataset
+from rbf_engine import RbfSvmEngine
+from train_svm import DATA_FILE
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRAIN_CSV = os.path.join(BASE_DIR, DATA_FILE)
+TEST_CSV = os.path.join(BASE_DIR, "TEST", "gesture_test_data.csv")
+REPORT_FILE = "benchmark_models.json"
+
+# --compare thresholds (relative changes unless noted); timings of two runs on the
+# same machine easily differ by 20-30 %, so only larger changes count as regressions
+MAX_ACCURACY_DROP = 0.005     # absolute
+MAX_LATENCY_INCREASE = 0.5
+MAX_THROUGHPUT_DROP = 0.5
+MAX_SIZE_INCREASE = 0.25
+
+
+def scaled(estimator):
+    return Pipeline([("scaler", StandardScaler()), ("clf", estimator)])
+
+
+# name -> factory; "rbf_svc_engine" is the NumPy engine exported from rbf_svc (what the client runs)
+CANDIDATES = {
+    "rbf_svc": lambda: scaled(SVC(kernel="rbf", C=10.0, gamma="scale")),
+    "linear_svm": lambda: scaled(LinearSVC(C=1.0, max_iter=10000)),
+    "knn_kdtree": lambda: scaled(KNeighborsClassifier(n_neighbors=5, algorithm="kd_tree")),
+    "mlp": lambda: scaled(MLPClassifier(hidden_layer_sizes=(64,), max_iter=2000, random_state=0)),
+    "random_forest": lambda: RandomForestClassifier(n_estimators=100, random_state=0),
+}
+MODEL_NAMES = list(CANDIDATES) + ["rbf_svc_engine"]
+
+
+class EngineModel:
+    """Adapter so the NumPy engine is measured like the sklearn models."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def predict(self, X):
+        return self.engine.predict(X)
+
+    def predict_one(self, x):
+        return self.engine.predict_one(x)
+
+
+def save_and_load(model, directory, name, repeat=3):
+    """(size in bytes, best load time in ms) of the saved model."""
+    if isinstance(model, EngineModel):
+        path = os.path.join(directory, name + ".npz")
+        model.engine.save(path)
+        load = RbfSvmEngine.load
+    else:
+        path = os.path.join(directory, name + ".joblib")
+        joblib.dump(model, path)
+        load = joblib.load
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        load(path)
+        best = min(best, time.perf_counter() - t0)
+    return os.path.getsize(path), best * 1000.0
+
+
+def single_latency_us(model, X, n):
+    """Per-call latency of predicting one sample, n calls (after a short warm-up)."""
+    if isinstance(model, EngineModel):
+        rows = [X[i % len(X)] for i in range(n)]
+        call = model.predict_one
+    else:
+        rows = [X[i % len(X)][None, :] for i in range(n)]
+        call = model.predict
+    for row in rows[:20]:
+        call(row)
+    times = np.empty(n)
+    clock = time.perf_counter_ns
+    for i, row in enumerate(rows):
+        t0 = clock()
+        call(row)
+        times[i] = clock() - t0
+    return times / 1000.0
+
+
+def batch_throughput(model, X, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        model.predict(X)
+        best = min(best, time.perf_counter() - t0)
+    return len(X) / best
+
+
+def benchmark(names, X_train, y_train, X_test, y_test, samples):
+    results = {}
+    trained = {}
+    with tempfile.TemporaryDirectory(prefix="model_bench_") as tmp:
+        for name in names:
+            t0 = time.perf_counter()
+            if name == "rbf_svc_engine":
+                base = trained.get("rbf_svc") or CANDIDATES["rbf_svc"]().fit(X_train, y_train)
+                model = EngineModel(RbfSvmEngine.from_pipeline(base))
+            else:
+                model = CANDIDATES[name]().fit(X_train, y_train)
+                trained[name] = model
+            train_s = time.perf_counter() - t0
+
+            accuracy = float(np.mean(model.predict(X_test) == y_test))
+            lat = single_latency_us(model, X_test, samples)
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            size, load_ms = save_and_load(model, tmp, name)
+            results[name] = {
+                "accuracy": accuracy,
+                "train_seconds": train_s,
+                "latency_us_p50": float(p50),
+                "latency_us_p95": float(p95),
+                "latency_us_p99": float(p99),
+                "batch_samples_per_s": batch_throughput(model, X_test),
+                "size_bytes": size,
+                "load_ms": load_ms,
+            }
+            print(f"[Bench] {name:15s} acc={accuracy:.4f}  p50={p50:8.1f} us  p99={p99:8.1f} us  "
+                  f"batch={results[name]['batch_samples_per_s']:10.0f}/s  size={size / 1024:8.1f} KiB  "
+                  f"load={load_ms:6.2f} ms")
+    return results
+
+
+def compare(old, new, restricted=False):
+    """
+    Print the change per model and metric; returns a list of regression messages.
+    Models of the old report missing from the new one are regressions unless the
+    run was restricted to a subset on purpose (restricted=True).
+    """
+    regressions = []
+    print(f"\n[Compare] {old['meta']['timestamp']} -> {new['meta']['timestamp']}")
+    if old["meta"].get("train_hash") != new["meta"].get("train_hash"):
+        print("[Compare] Note: training data differs between the runs")
+    for name, cur in new["models"].items():
+        prev = old["models"].get(name)
+        if prev is None:
+            print(f"  {name:15s} (new)")
+            continue
+        d_acc = cur["accuracy"] - prev["accuracy"]
+        r_lat = cur["latency_us_p50"] / prev["latency_us_p50"] - 1.0
+        r_thr = cur["batch_samples_per_s"] / prev["batch_samples_per_s"] - 1.0
+        r_size = cur["size_bytes"] / prev["size_bytes"] - 1.0
+        print(f"  {name:15s} acc {d_acc:+.4f}  p50 {r_lat:+.1%}  batch {r_thr:+.1%}  size {r_size:+.1%}")
+        if d_acc < -MAX_ACCURACY_DROP:
+            regressions.append(f"{name}: accuracy dropped by {-d_acc:.4f}")
+        if r_lat > MAX_LATENCY_INCREASE:
+            regressions.append(f"{name}: p50 latency up {r_lat:.1%}")
+        if r_thr < -MAX_THROUGHPUT_DROP:
+            regressions.append(f"{name}: batch throughput down {-r_thr:.1%}")
+        if r_size > MAX_SIZE_INCREASE:
+            regressions.append(f"{name}: model size up {r_size:.1%}")
+    for name in old["models"]:
+        if name not in new["models"]:
+            print(f"  {name:15s} (missing{', not selected' if restricted else ''})")
+            if not restricted:
+                regressions.append(f"{name}: missing from the new report")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candidate gesture classifiers")
+    parser.add_argument("--models", nargs="+", choices=MODEL_NAMES,
+                        help="benchmark only these models (default: all)")
+    parser.add_argument("--train", default=TRAIN_CSV)
+    parser.add_argument("--test", default=TEST_CSV)
+    parser.add_argument("--samples", type=int, default=1000, help="single-sample predict calls per model")
+    parser.add_argument("--out", default=REPORT_FILE, help="JSON report")
+    parser.add_argument("--compare", metavar="OLD.json", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    X_train, y_train = load_dataset(args.train)
+    X_test, y_test = load_dataset(args.test)
+    X_train, X_test = np.ascontiguousarray(X_train), np.ascontiguousarray(X_test)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "train": os.path.abspath(args.train),
+            "train_hash": file_hash(args.train),
+            "test": os.path.abspath(args.test),
+            "test_hash": file_hash(args.test),
+            "n_train": int(len(y_train)),
+            "n_test": int(len(y_test)),
+            "single_samples": args.samples,
+        },
+        "models": benchmark(args.models or MODEL_NAMES, X_train, y_train, X_test, y_test, args.samples),
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[Bench] Report written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        regressions = compare(old, report, restricted=args.models is not None)
+        if regressions:
+            print("[Compare] Regressions:")
+            for msg in regressions:
+                print(f"  - {msg}")
+            raise SystemExit(1)
+        print("[Compare] No regressions")
+
+
+if __name__ == "__main__":
+    main()
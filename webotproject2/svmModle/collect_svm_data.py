@@ -1,9 +1,25 @@
 # collect_svm_data.py
-import cv2
+#   python collect_svm_data.py [--record session]           live collection from the camera
+#   python collect_svm_data.py --replay session --label 3    convert a recording, no camera
+#   python collect_svm_data.py --auto-update                 collect into the training CSV and
+#                                                            refresh the model while collecting
+import argparse
 import csv
 import os
-import mediapipe as mp
-from extract_features import extract_hand_features
+import sys
+from extract_features import (
+    FEATURE_COLUMNS,
+    FEATURE_DIM,
+    extract_features_batch,
+    extract_hand_features,
+    landmarks_to_array,
+)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Landmark recorder / replay shared with gesture_client.py
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+from landmark_recording import LandmarkRecorder, LandmarkRecording
 
 # =========================================================
 # 1. Set dataset directory (auto-create)
@@ -13,6 +29,8 @@ os.makedirs(DATA_DIR, exist_ok=True)
 
 # Final CSV save path
 DATA_FILE = os.path.join(DATA_DIR, "gesture_test_data.csv")
+# --auto-update collects into the training CSV instead: the model must never learn the test set
+TRAIN_DATA_FILE = os.path.join(SCRIPT_DIR, "gesture_data.csv")
 
 # Label descriptions (for display only; training uses numeric labels)
 LABEL_NAMES = {
@@ -24,16 +42,53 @@ LABEL_NAMES = {
     5: "TWO (2 fingers extended: Slow Down)",
 }
 
-def main():
+def open_dataset(path=DATA_FILE):
     # Create file and write header if not exists
-    file_exists = os.path.exists(DATA_FILE)
-    f = open(DATA_FILE, "a", newline="")
+    file_exists = os.path.exists(path)
+    f = open(path, "a", newline="")
     writer = csv.writer(f)
 
     if not file_exists:
         # 42-dimensional features: f0 ... f41 + label
-        header = [f"f{i}" for i in range(42)] + ["label"]
+        header = FEATURE_COLUMNS + ["label"]
         writer.writerow(header)
+    return f, writer
+
+
+def replay_to_dataset(recording_path, label):
+    """Append every hand frame of a landmark recording to the dataset with one label."""
+    rec = LandmarkRecording.load(recording_path)
+    features = extract_features_batch(rec.landmarks[rec.hand_present])
+
+    f, writer = open_dataset()
+    with f:
+        writer.writerows(list(row) + [label] for row in features)
+    print(f"[Collect] Replayed {len(rec)} frames from {recording_path}: "
+          f"saved {len(features)} samples with label {label} - {LABEL_NAMES[label]}")
+
+
+def start_auto_update(data_path):
+    """Learn saved samples in the background (incremental_train.py) while collecting."""
+    from incremental_train import ARTIFACT_FILE, ENGINE_FILE, MODEL_FILE, STATE_FILE, start_background
+    return start_background(
+        data_path,
+        os.path.join(SCRIPT_DIR, MODEL_FILE),
+        os.path.join(SCRIPT_DIR, ENGINE_FILE),
+        os.path.join(SCRIPT_DIR, STATE_FILE),
+        os.path.join(SCRIPT_DIR, ARTIFACT_FILE),
+    )
+
+
+def main(record_path=None, auto_update=False):
+    # Camera path only: --replay must not pay for importing OpenCV and MediaPipe
+    import cv2
+    import mediapipe as mp
+
+    data_path = TRAIN_DATA_FILE if auto_update else DATA_FILE
+    f, writer = open_dataset(data_path)
+    stop_update = start_auto_update(data_path) if auto_update else None
+    if auto_update:
+        print("[Collect] Auto-update: saving samples to the training set", data_path)
 
     cap = cv2.VideoCapture(0)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
@@ -48,6 +103,7 @@ def main():
 
     current_label = 0
     saved_count = 0
+    recorder = LandmarkRecorder(record_path) if record_path else None
 
     print("[Collect] Camera initialized.")
     print("[Collect] Instructions:")
@@ -75,6 +131,15 @@ def main():
 
                 h, w, _ = frame.shape
 
+                if recorder is not None:
+                    if results.multi_hand_landmarks and results.multi_handedness:
+                        recorder.add(
+                            landmarks_to_array(results.multi_hand_landmarks[0].landmark, dims=3),
+                            results.multi_handedness[0].classification[0].label,
+                        )
+                    else:
+                        recorder.add(None, None)
+
                 if results.multi_hand_landmarks:
                     hand_landmarks = results.multi_hand_landmarks[0]
                     mp_drawing.draw_landmarks(
@@ -113,8 +178,8 @@ def main():
                 if key == ord("s"):
                     if results.multi_hand_landmarks:
                         hand_landmarks = results.multi_hand_landmarks[0]
-                        features = extract_hand_features(hand_landmarks.landmark)
-                        if features.shape[0] != 42:
+                        features = extract_hand_features(landmarks_to_array(hand_landmarks.landmark))
+                        if features.shape[0] != FEATURE_DIM:
                             print("[Collect] Feature dimension is not 42. Check extract_hand_features.")
                         else:
                             row = list(features) + [current_label]
@@ -133,7 +198,27 @@ def main():
             cap.release()
             cv2.destroyAllWindows()
             f.close()
-            print("[Collect] Data collection finished. File saved to:", DATA_FILE)
+            if recorder is not None:
+                recorder.close()
+            if stop_update is not None:
+                stop_update.set()
+            print("[Collect] Data collection finished. File saved to:", data_path)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Collect SVM gesture training data")
+    parser.add_argument("--record", metavar="DIR",
+                        help="also record per-frame landmarks for later replay")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="convert a landmark recording into samples instead of using the camera")
+    parser.add_argument("--label", type=int, choices=sorted(LABEL_NAMES),
+                        help="gesture label of the replayed recording")
+    parser.add_argument("--auto-update", action="store_true",
+                        help="incrementally update the SVM model in the background as samples are saved")
+    args = parser.parse_args()
+
+    if args.replay:
+        if args.label is None:
+            parser.error("--replay requires --label")
+        replay_to_dataset(args.replay, args.label)
+    else:
+        main(record_path=args.record, auto_update=args.auto_update)
@@ -0,0 +1,194 @@
+# compact_svm.py
+# Post-training support-vector reduction for the gesture SVM.
+#
+# The cost of RBF-SVC inference (sklearn or rbf_engine.py) grows linearly with the
+# number of support vectors. Compaction shrinks the support-vector budget step by
+# step (STEP_FACTOR per step) and re-fits a normal SVC on a reduced set in the
+# model's scaled feature space:
+#   prune    keep the support vectors with the largest |dual coefficient| per class
+#            and retrain on them (default)
+#   cluster  replace each class's support vectors by |coefficient|-weighted k-means centres
+# The scaler, C and the numeric gamma of the original model are kept, so the result
+# is a drop-in Pipeline for svmModel.joblib (and is exported to the NumPy engine).
+# Every step reports the number of support vectors, validation accuracy and the
+# engine's per-call latency. Compaction stops at the --budget, or before the accuracy
+# drop exceeds --max-drop. The validation CSV must be held-out data: neither the
+# training rows nor the TEST set, which stays reserved for the final evaluation.
+#
+#   python compact_svm.py --val gesture_val_data.csv --budget 40
+#   python compact_svm.py --val gesture_val_data.csv --max-drop 0.005 --method cluster
+import argparse
+import copy
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVC
+
+from model_artifact import ArtifactError, export_artifact, load_artifact
+from rbf_engine import RbfSvmEngine, per_call_us
+
+METHODS = ("prune", "cluster")
+STEP_FACTOR = 0.8          # budget of the next step relative to the current one
+DEFAULT_MAX_DROP = 0.01    # absolute accuracy drop allowed when no budget is given
+MIN_PER_CLASS = 2
+LATENCY_SAMPLES = 300
+BACKUP_SUFFIX = "_full.joblib"
+REPORT_FILE = "svm_compaction.json"
+
+
+def allocate(n_support, budget):
+    """Split a support-vector budget over the classes in proportion to their current share."""
+    n_support = np.asarray(n_support)
+    share = budget * n_support / n_support.sum()
+    counts = np.minimum(np.maximum(np.floor(share).astype(int), MIN_PER_CLASS), n_support)
+    # Hand out what is left of the budget by largest remainder
+    for i in np.argsort(-(share - np.floor(share)), kind="stable"):
+        if counts.sum() >= budget:
+            break
+        if counts[i] < n_support[i]:
+            counts[i] += 1
+    return counts
+
+
+def reduced_set(svc, budget, method="prune", seed=0):
+    """(vectors in scaled space, labels) of at most ~budget points that replace svc's support vectors."""
+    labels = np.repeat(svc.classes_, svc.n_support_)
+    weight = np.abs(svc.dual_coef_).sum(axis=0)
+    vectors, targets = [], []
+    for cls, k in zip(svc.classes_, allocate(svc.n_support_, budget)):
+        idx = np.flatnonzero(labels == cls)
+        if method == "prune":
+            chosen = svc.support_vectors_[idx[np.argsort(-weight[idx], kind="stable")[:k]]]
+        elif method == "cluster":
+            km = KMeans(n_clusters=k, n_init=4, random_state=seed)
+            chosen = km.fit(svc.support_vectors_[idx], sample_weight=weight[idx]).cluster_centers_
+        else:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+        vectors.append(chosen)
+        targets.append(np.full(len(chosen), cls))
+    return np.vstack(vectors), np.concatenate(targets)
+
+
+def refit(model, vectors, labels):
+    """Pipeline with model's scaler and an SVC (same C, fixed gamma) trained on a reduced set."""
+    svc = model.named_steps["svm"]
+    small = SVC(kernel="rbf", C=svc.C, gamma=svc._gamma).fit(vectors, labels)
+    return Pipeline([("scaler", copy.deepcopy(model.named_steps["scaler"])), ("svm", small)])
+
+
+def measure(model, X_val, y_val):
+    """
+    (accuracy, us per predict_one call, us per sample in batch prediction) of a pipeline
+    on validation data, both timed on the NumPy engine the client runs.
+    """
+    engine = RbfSvmEngine.from_pipeline(model)
+    X_val = np.asarray(X_val, dtype=np.float64)
+    t0 = time.perf_counter()
+    accuracy = float(np.mean(engine.predict(X_val) == y_val))
+    batch_us = (time.perf_counter() - t0) / len(X_val) * 1e6
+    return accuracy, per_call_us(engine.predict_one, X_val[:LATENCY_SAMPLES]), batch_us
+
+
+def compact(model, X_val, y_val, budget=None, max_drop=None, method="prune"):
+    """
+    Shrink the support-vector set of a fitted scaler + RBF-SVC pipeline.
+    Stops once the model has at most `budget` support vectors, or before the validation
+    accuracy falls more than `max_drop` below the original (DEFAULT_MAX_DROP if neither
+    is given). Returns (best accepted model, list of per-step dicts).
+    """
+    if budget is None and max_drop is None:
+        max_drop = DEFAULT_MAX_DROP
+    svc = model.named_steps["svm"]
+    base_acc, base_us, base_batch = measure(model, X_val, y_val)
+    steps = [{"step": 0, "n_support": int(svc.support_.size), "accuracy": base_acc,
+              "latency_us": base_us, "batch_us": base_batch, "speedup": 1.0,
+              "batch_speedup": 1.0, "accepted": True}]
+    print(f"[INFO] Original model: {svc.support_.size} support vectors, accuracy {base_acc:.4f}, "
+          f"{base_us:.1f} us/call, {base_batch:.2f} us/sample in batch")
+
+    best = model
+    floor = MIN_PER_CLASS * len(svc.classes_)
+    target = svc.support_.size
+    while budget is None or best.named_steps["svm"].support_.size > budget:
+        next_target = max(int(target * STEP_FACTOR), floor, budget or 0)
+        if next_target >= target:
+            break
+        target = next_target
+        candidate = refit(model, *reduced_set(svc, target, method))
+        acc, us, batch = measure(candidate, X_val, y_val)
+        n_sv = int(candidate.named_steps["svm"].support_.size)
+        accepted = max_drop is None or base_acc - acc <= max_drop
+        steps.append({"step": len(steps), "n_support": n_sv, "accuracy": acc, "latency_us": us,
+                      "batch_us": batch, "speedup": base_us / us, "batch_speedup": base_batch / batch,
+                      "accepted": accepted})
+        print(f"[Compact] step {len(steps) - 1}: budget {target:4d} -> {n_sv:4d} SVs  "
+              f"acc {acc:.4f} ({acc - base_acc:+.4f})  {us:6.1f} us/call ({base_us / us:.2f}x)  "
+              f"batch {batch:5.2f} us/sample ({base_batch / batch:.2f}x)"
+              f"{'' if accepted else '  rejected'}")
+        if not accepted:
+            break
+        best = candidate
+
+    n_best = best.named_steps["svm"].support_.size
+    if budget is not None and n_best > budget:
+        print(f"[WARN] Budget of {budget} support vectors not reached within an accuracy drop "
+              f"of {max_drop}; keeping {n_best}")
+    return best, steps
+
+
+def main():
+    import joblib
+    import train_svm
+    from dataset import is_test_path, load_dataset
+
+    parser = argparse.ArgumentParser(description="Reduce the support vectors of the trained SVM")
+    parser.add_argument("--model", default=train_svm.MODEL_FILE)
+    parser.add_argument("--out", default=None, help="output model (default: replace --model, "
+                                                    f"keeping the original as *{BACKUP_SUFFIX})")
+    parser.add_argument("--val", required=True,
+                        help="held-out validation CSV (not the training data, not the TEST set)")
+    parser.add_argument("--budget", type=int, default=None, help="target number of support vectors")
+    parser.add_argument("--max-drop", type=float, default=None,
+                        help=f"max. validation accuracy drop (default {DEFAULT_MAX_DROP} without --budget)")
+    parser.add_argument("--method", choices=METHODS, default="prune")
+    args = parser.parse_args()
+    if is_test_path(args.val):
+        parser.error(f"{args.val} is test data; compaction must be chosen on a validation set")
+
+    model = joblib.load(args.model)
+    X_val, y_val = load_dataset(args.val)
+    compacted, steps = compact(model, X_val, y_val, args.budget, args.max_drop, args.method)
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"model": args.model, "method": args.method, "steps": steps}, f, indent=2)
+    print(f"[INFO] Compaction steps saved as: {REPORT_FILE}")
+    if compacted is model:
+        print("[INFO] No smaller model within the limits, nothing written")
+        return
+
+    out = args.out or args.model
+    if out == args.model:
+        backup = os.path.splitext(args.model)[0] + BACKUP_SUFFIX
+        shutil.copyfile(args.model, backup)
+        print(f"[INFO] Original model kept as: {backup}")
+    joblib.dump(compacted, out)
+    print(f"[INFO] Compacted model saved as: {out}")
+    if out == train_svm.MODEL_FILE:
+        RbfSvmEngine.from_pipeline(compacted).save(train_svm.ENGINE_FILE)
+        print(f"[INFO] Inference engine saved as: {train_svm.ENGINE_FILE}")
+        try:
+            data = load_artifact(train_svm.ARTIFACT_FILE).metadata["data"]   # keep the training data record
+        except (OSError, ArtifactError):
+            data = {}
+        final = next(s for s in reversed(steps) if s["accepted"])
+        export_artifact(compacted, train_svm.ARTIFACT_FILE, data.get("hash"), data.get("rows"),
+                        {"val_accuracy": final["accuracy"], "compacted_from": steps[0]["n_support"]})
+        print(f"[INFO] Model artifact saved as: {train_svm.ARTIFACT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# dataset.py
+# Columnar loader for the gesture CSV files (f0..f41,label) with a binary cache.
+#
+# The CSV is parsed in one bulk NumPy call into float32 features / int32 labels.
+# The arrays are then stored next to the CSV as
+#   __datacache__/<csv name>-<content hash>.X.npy / .y.npy
+# and later runs memory-map them instead of parsing again. The key is a hash of the
+# file content, so an edited or re-collected CSV is parsed again automatically.
+import hashlib
+import os
+
+import numpy as np
+
+from extract_features import FEATURE_COLUMNS, FEATURE_DIM
+
+CACHE_DIR_NAME = "__datacache__"
+LABEL_COLUMN = "label"
+HASH_CHUNK = 1 << 20
+TEST_DIR_NAME = "TEST"
+
+
+def file_hash(path):
+    """Short content hash of a file (blake2b, 16 hex digits)."""
+    h = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_paths(csv_path, digest):
+    directory, name = os.path.split(os.path.abspath(csv_path))
+    stem = os.path.join(directory, CACHE_DIR_NAME, f"{name}-{digest}")
+    return stem + ".X.npy", stem + ".y.npy"
+
+
+def is_test_path(path):
+    """True for files inside a TEST directory (the held-out test set)."""
+    parts = os.path.normpath(os.path.abspath(path)).replace("\\", "/").split("/")
+    return TEST_DIR_NAME in parts[:-1]
+
+
+def parse_rows(header, body, source="<csv>"):
+    """
+    Parse CSV data rows (text without the header line) in bulk.
+    header: list of column names; columns may be in any order, extra columns are ignored.
+    """
+    missing = [c for c in FEATURE_COLUMNS + [LABEL_COLUMN] if c not in header]
+    if missing:
+        raise ValueError(f"Missing columns in {source}: {missing}")
+
+    # Blank lines (e.g. a trailing newline after the last row) would read as empty fields
+    body = ",".join(line for line in body.splitlines() if line.strip())
+    values = np.fromstring(body, dtype=np.float64, sep=",")
+    if values.size % len(header):
+        raise ValueError(f"Ragged rows in {source}: {values.size} values for {len(header)} columns")
+    table = values.reshape(-1, len(header))
+
+    X = table[:, [header.index(c) for c in FEATURE_COLUMNS]].astype(np.float32)
+    y = table[:, header.index(LABEL_COLUMN)].astype(np.int32)
+    return X, y
+
+
+def parse_csv(csv_path):
+    """Parse a whole feature CSV in bulk."""
+    with open(csv_path, "r", newline="") as f:
+        header = f.readline().strip().split(",")
+        body = f.read()
+    return parse_rows(header, body, csv_path)
+
+
+def _save_atomic(path, array):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def write_cache(csv_path, digest, X, y):
+    x_path, y_path = cache_paths(csv_path, digest)
+    cache_dir = os.path.dirname(x_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Only the newest version of each CSV is kept
+    prefix = os.path.basename(csv_path) + "-"
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and not name.startswith(prefix + digest):
+            os.remove(os.path.join(cache_dir, name))
+
+    _save_atomic(x_path, X)
+    _save_atomic(y_path, y)
+
+
+def load_dataset(csv_path, use_cache=True, mmap=True):
+    """
+    Returns (X float32 (N, FEATURE_DIM), y int32 (N,)) for a gesture CSV.
+    With mmap=True a cached dataset is memory-mapped read-only.
+    """
+    if not use_cache:
+        X, y = parse_csv(csv_path)
+    else:
+        digest = file_hash(csv_path)
+        x_path, y_path = cache_paths(csv_path, digest)
+        try:
+            mode = "r" if mmap else None
+            X = np.load(x_path, mmap_mode=mode)
+            y = np.load(y_path, mmap_mode=mode)
+            source = "cache"
+        except (OSError, ValueError):
+            X, y = parse_csv(csv_path)
+            source = "csv"
+            try:
+                write_cache(csv_path, digest, X, y)
+            except OSError as e:
+                print(f"[WARN] Could not write dataset cache for {csv_path}: {e}")
+        else:
+            if X.shape != (len(y), FEATURE_DIM):
+                X, y = parse_csv(csv_path)
+                source = "csv"
+        print(f"[INFO] Loaded {len(y)} samples from {csv_path} ({source})")
+
+    if X.ndim != 2 or X.shape[1] != FEATURE_DIM:
+        raise ValueError(f"Expected {FEATURE_DIM} feature columns in {csv_path}, got shape {X.shape}")
+    return X, y
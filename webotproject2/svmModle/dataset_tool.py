@@ -0,0 +1,185 @@
+# dataset_tool.py
+# Merge gesture CSVs, drop near-duplicate rows and check train/test leakage.
+#
+# Holding 's' during collection saves many almost identical frames, which inflate one
+# class and can end up in both the training and the test set. All neighbour searches
+# go through KD-trees over the 42 features (scipy.spatial.cKDTree, installed with
+# sklearn; queries use all cores), so there is no O(N^2) pass:
+#   near-duplicates  rows of the same label within --tol (Euclidean) of an earlier kept
+#                    row are dropped; inputs are merged in the given order, so rows of
+#                    earlier files win. Only kept rows query the tree, so a long run of
+#                    held frames costs one radius query, not one per frame
+#   conflicts        rows within --tol of a row with a different label (reported only)
+#   leakage          test rows within --tol of a (merged) training row
+#
+#   python dataset_tool.py gesture_data.csv                                      report only
+#   python dataset_tool.py gesture_data.csv gesture_data_old.csv --out merged.csv
+#   python dataset_tool.py gesture_data.csv --test TEST/gesture_test_data.csv --fail-on-leak
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from dataset import LABEL_COLUMN, file_hash, load_dataset
+from extract_features import FEATURE_COLUMNS
+from rbf_engine import TEST_CSV
+
+DEFAULT_TOLERANCE = 0.02   # in feature units (hand-size normalized landmark coordinates)
+QUERY_CHUNK = 256          # max. rows per batched radius query in dedupe
+SCAN_WINDOW = 4096         # rows scanned at once for the next rows still to be queried
+REPORT_FILE = "dataset_report.json"
+
+
+def near_duplicates(X, tol):
+    """
+    Boolean mask of rows within tol of an earlier row that is kept (greedy, in row order).
+    Rows already removed are never queried. The others are queried in chunks whose size
+    adapts to how often a row removes later rows of its own chunk.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    removed = np.zeros(len(X), dtype=bool)
+    if len(X) < 2 or tol <= 0:
+        return removed
+    tree = cKDTree(X)
+    pos, size = 0, 1
+    while pos < len(X):
+        free = np.flatnonzero(~removed[pos:pos + SCAN_WINDOW])
+        if not len(free):
+            pos += SCAN_WINDOW
+            continue
+        chunk = pos + free[:size]
+        wasted = 0
+        for i, neighbours in zip(chunk, tree.query_ball_point(X[chunk], tol, workers=-1)):
+            if removed[i]:   # removed by an earlier row of the same chunk
+                wasted += 1
+                continue
+            neighbours = np.asarray(neighbours, dtype=np.int64)
+            removed[neighbours[neighbours > i]] = True
+        pos = chunk[-1] + 1
+        # Big batches for distinct rows, single queries inside runs of held frames
+        size = max(1, size // 2) if wasted else min(size * 2, QUERY_CHUNK)
+    return removed
+
+
+def dedupe(X, y, tol):
+    """Keep mask over (X, y): near-duplicates are only looked for within the same label."""
+    keep = np.ones(len(y), dtype=bool)
+    for label in np.unique(y):
+        idx = np.flatnonzero(y == label)
+        keep[idx[near_duplicates(X[idx], tol)]] = False
+    return keep
+
+
+def label_conflicts(X, y, tol):
+    """Mask of rows that have a row with a different label within tol."""
+    X = np.asarray(X, dtype=np.float64)
+    conflict = np.zeros(len(y), dtype=bool)
+    if tol <= 0:
+        return conflict
+    for label in np.unique(y):
+        mine, others = y == label, y != label
+        if not others.any():
+            continue
+        # Nearest row of any other label, searched no further than tol (inf if none)
+        dist, _ = cKDTree(X[others]).query(X[mine], k=1, distance_upper_bound=tol, workers=-1)
+        conflict[mine] = dist <= tol
+    return conflict
+
+
+def leakage(X_train, X_test, tol):
+    """
+    (leaked mask over the test rows, index of their nearest training row, distance).
+    A test row leaks when a training row lies within tol of it.
+    """
+    tree = cKDTree(np.asarray(X_train, dtype=np.float64))
+    dist, nearest = tree.query(np.asarray(X_test, dtype=np.float64), k=1, workers=-1)
+    return dist <= tol, nearest, dist
+
+
+def per_label(y, mask=None):
+    labels, counts = np.unique(y if mask is None else y[mask], return_counts=True)
+    return {str(int(l)): int(c) for l, c in zip(labels, counts)}
+
+
+def write_csv(path, X, y):
+    """Write rows in the collect_svm_data.py layout (f0..f41,label), atomically."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        f.write(",".join(FEATURE_COLUMNS + [LABEL_COLUMN]) + "\n")
+        table = np.column_stack([np.asarray(X, dtype=np.float64), y])
+        np.savetxt(f, table, fmt=["%.9g"] * len(FEATURE_COLUMNS) + ["%d"], delimiter=",")
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge gesture datasets, drop near-duplicates, check leakage")
+    parser.add_argument("inputs", nargs="+", help="training CSVs, merged in this order")
+    parser.add_argument("--out", default=None, help="write the merged, deduplicated rows to this CSV")
+    parser.add_argument("--test", default=TEST_CSV, help="test CSV checked for leakage ('' to skip)")
+    parser.add_argument("--tol", type=float, default=DEFAULT_TOLERANCE,
+                        help="Euclidean feature distance below which rows count as the same frame")
+    parser.add_argument("--keep-duplicates", action="store_true", help="merge without dropping near-duplicates")
+    parser.add_argument("--fail-on-leak", action="store_true", help="exit with status 1 if test rows leak")
+    parser.add_argument("--report", default=REPORT_FILE)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    parts = [load_dataset(path) for path in args.inputs]
+    X = np.concatenate([np.asarray(p[0], dtype=np.float32) for p in parts])
+    y = np.concatenate([np.asarray(p[1], dtype=np.int32) for p in parts])
+    source = np.repeat(np.arange(len(parts)), [len(p[1]) for p in parts])
+
+    keep = np.ones(len(y), dtype=bool) if args.keep_duplicates else dedupe(X, y, args.tol)
+    conflicts = label_conflicts(X[keep], y[keep], args.tol)
+    print(f"[INFO] {len(y)} rows from {len(parts)} file(s): {int((~keep).sum())} near-duplicates "
+          f"(tol {args.tol}), {int(keep.sum())} kept, {int(conflicts.sum())} rows near another label")
+    for i, path in enumerate(args.inputs):
+        mine = source == i
+        print(f"[INFO]   {path}: {int((keep & mine).sum())} of {int(mine.sum())} rows kept")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "tolerance": args.tol,
+        "inputs": [{"path": os.path.abspath(path), "hash": file_hash(path), "rows": int((source == i).sum()),
+                    "kept": int((keep & (source == i)).sum())} for i, path in enumerate(args.inputs)],
+        "rows": int(len(y)),
+        "kept": int(keep.sum()),
+        "kept_per_label": per_label(y, keep),
+        "dropped_per_label": per_label(y, ~keep),
+        "conflicts_per_label": per_label(y[keep], conflicts),
+    }
+
+    if args.test:
+        X_test, y_test = load_dataset(args.test)
+        leaked, nearest, dist = leakage(X[keep], X_test, args.tol)
+        same_label = leaked & (y[keep][nearest] == y_test)
+        print(f"[INFO] Leakage: {int(leaked.sum())} of {len(y_test)} test rows within {args.tol} of a "
+              f"training row ({int(same_label.sum())} with the same label); nearest distance "
+              f"median {np.median(dist):.4f}")
+        report["leakage"] = {
+            "test": os.path.abspath(args.test),
+            "test_hash": file_hash(args.test),
+            "leaked": int(leaked.sum()),
+            "leaked_same_label": int(same_label.sum()),
+            "leaked_per_label": per_label(np.asarray(y_test), leaked),
+            "leaked_rows": np.flatnonzero(leaked).tolist(),   # 0-based data rows of the test CSV
+            "nearest_distance_median": float(np.median(dist)),
+        }
+
+    if args.out:
+        write_csv(args.out, X[keep], y[keep])
+        report["out"] = os.path.abspath(args.out)
+        print(f"[INFO] Merged dataset saved as: {args.out}")
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Report saved as: {args.report} ({time.perf_counter() - t0:.2f} s)")
+
+    if args.fail_on_leak and report.get("leakage", {}).get("leaked"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
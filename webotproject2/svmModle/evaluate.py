@@ -0,0 +1,274 @@
+# evaluate.py
+# Headless evaluation of gesture classifiers on labelled test CSVs.
+#
+# Every (model, test set) pair is evaluated in one pass: confusion matrix, per-class
+# precision / recall / F1, and the confusion-matrix / per-class score plots, all
+# written to files (nothing is shown on screen). Models can be sklearn pipelines
+# (.joblib), NumPy engines (.npz) or model artifacts (.bin).
+#
+# Predictions are cached next to the test CSV as
+#   __datacache__/pred-<model hash>-<data hash>.npy
+# so evaluating an unchanged model on an unchanged CSV again neither loads the model
+# nor predicts. Several pairs are evaluated in parallel worker processes.
+#
+#   python evaluate.py                                         svmModel.joblib on TEST/gesture_test_data.csv
+#   python evaluate.py --models svmModel.joblib svmModel_artifact.bin --data TEST/gesture_test_data.csv old.csv
+#   python evaluate.py --jobs 4 --out eval_results
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset import CACHE_DIR_NAME, file_hash, load_dataset
+from rbf_engine import MODEL_FILE, TEST_CSV
+
+EVAL_DIR = "eval_results"
+SUMMARY_FILE = "evaluation_summary.json"
+
+# Class label mapping (numeric -> gesture name for reports and plots)
+LABEL_NAME_MAP = {
+    0: "FIST / Stop",
+    1: "Palm Up / Forward",
+    2: "Palm Right / TurnR",
+    3: "Palm Left / TurnL",
+    4: "One Finger / Speed+",
+    5: "Two Fingers / Speed-",
+}
+
+
+# ========= Predictions =========
+def load_predictor(model_path):
+    """predict(X) function of a .joblib pipeline, .npz engine or .bin model artifact."""
+    ext = os.path.splitext(model_path)[1].lower()
+    if ext == ".bin":
+        from model_artifact import load_artifact
+        return load_artifact(model_path).engine.predict
+    if ext == ".npz":
+        from rbf_engine import RbfSvmEngine
+        return RbfSvmEngine.load(model_path).predict
+    import joblib
+    return joblib.load(model_path).predict
+
+
+def prediction_cache_path(data_path, model_hash, data_hash):
+    directory = os.path.dirname(os.path.abspath(data_path))
+    return os.path.join(directory, CACHE_DIR_NAME, f"pred-{model_hash}-{data_hash}.npy")
+
+
+def cached_predict(model_path, data_path, X, use_cache=True):
+    """(y_pred, source) for X = features of data_path; source is "cache" or "model"."""
+    if use_cache:
+        path = prediction_cache_path(data_path, file_hash(model_path), file_hash(data_path))
+        try:
+            y_pred = np.load(path)
+            if y_pred.shape == (len(X),):
+                return y_pred, "cache"
+        except (OSError, ValueError):
+            pass
+
+    y_pred = np.asarray(load_predictor(model_path)(X))
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, y_pred)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[WARN] Could not cache predictions for {model_path}: {e}")
+    return y_pred, "model"
+
+
+# ========= Metrics =========
+def confusion(y_true, y_pred, labels):
+    """(n, n) confusion matrix, rows = true label, columns = predicted label."""
+    n = len(labels)
+    index = {label: i for i, label in enumerate(labels)}
+    flat = np.array([index[t] * n + index[p] for t, p in zip(y_true.tolist(), y_pred.tolist())],
+                    dtype=np.int64)
+    return np.bincount(flat, minlength=n * n).reshape(n, n)
+
+
+def class_scores(cm):
+    """Per-class precision, recall, F1 and support from a confusion matrix (0 where undefined)."""
+    tp = np.diag(cm).astype(np.float64)
+    predicted = cm.sum(axis=0)
+    support = cm.sum(axis=1)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+    return precision, recall, f1, support
+
+
+def metrics_dict(cm, labels):
+    precision, recall, f1, support = class_scores(cm)
+    total = int(support.sum())
+    weights = support / max(total, 1)
+    return {
+        "accuracy": float(np.trace(cm) / max(total, 1)),
+        "samples": total,
+        "labels": [int(l) for l in labels],
+        "per_class": {
+            LABEL_NAME_MAP.get(int(l), str(l)): {
+                "label": int(l), "precision": float(p), "recall": float(r), "f1": float(f),
+                "support": int(s),
+            }
+            for l, p, r, f, s in zip(labels, precision, recall, f1, support)
+        },
+        # Over all labels, like classification_report: a label only ever predicted counts as 0 recall
+        "macro_avg": {"precision": float(precision.mean()), "recall": float(recall.mean()),
+                      "f1": float(f1.mean())},
+        "weighted_avg": {"precision": float(weights @ precision), "recall": float(weights @ recall),
+                         "f1": float(weights @ f1)},
+        "confusion_matrix": cm.tolist(),
+    }
+
+
+def format_report(metrics):
+    """Text report in the layout of sklearn's classification_report."""
+    lines = [f"{'':>22s} {'precision':>9s} {'recall':>9s} {'f1-score':>9s} {'support':>9s}", ""]
+    for name, s in metrics["per_class"].items():
+        lines.append(f"{name:>22s} {s['precision']:9.2f} {s['recall']:9.2f} {s['f1']:9.2f} {s['support']:9d}")
+    n = metrics["samples"]
+    lines.append("")
+    lines.append(f"{'accuracy':>22s} {'':9s} {'':9s} {metrics['accuracy']:9.2f} {n:9d}")
+    for key, title in (("macro_avg", "macro avg"), ("weighted_avg", "weighted avg")):
+        avg = metrics[key]
+        lines.append(f"{title:>22s} {avg['precision']:9.2f} {avg['recall']:9.2f} {avg['f1']:9.2f} {n:9d}")
+    return "\n".join(lines)
+
+
+# ========= Plots =========
+def save_plots(metrics, out_dir, title):
+    """Confusion-matrix heatmap and per-class score bars as PNG; skipped without matplotlib."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[WARN] matplotlib is not installed, skipping plots")
+        return []
+
+    names = list(metrics["per_class"])
+    cm = np.array(metrics["confusion_matrix"])
+    paths = []
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+    im = ax.imshow(cm, cmap="Blues")
+    fig.colorbar(im, ax=ax)
+    for i in range(cm.shape[0]):
+        for j in range(cm.shape[1]):
+            ax.text(j, i, str(cm[i, j]), ha="center", va="center",
+                    color="white" if cm[i, j] > cm.max() / 2 else "black")
+    ax.set_xticks(range(len(names)), names, rotation=30, ha="right")
+    ax.set_yticks(range(len(names)), names)
+    ax.set_xlabel("Predicted Class")
+    ax.set_ylabel("True Class")
+    ax.set_title(f"Confusion Matrix: {title}")
+    fig.tight_layout()
+    paths.append(os.path.join(out_dir, "confusion_matrix.png"))
+    fig.savefig(paths[-1], dpi=120)
+    plt.close(fig)
+
+    scores = [metrics["per_class"][n] for n in names]
+    x = np.arange(len(names))
+    width = 0.25
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(x - width, [s["precision"] for s in scores], width, label="Precision")
+    ax.bar(x, [s["recall"] for s in scores], width, label="Recall")
+    ax.bar(x + width, [s["f1"] for s in scores], width, label="F1-score")
+    ax.set_xticks(x, names, rotation=20, ha="right")
+    ax.set_ylim(0, 1.0)
+    ax.set_ylabel("Score")
+    ax.set_xlabel("Gesture Class")
+    ax.set_title(f"Performance per Gesture Class: {title}")
+    ax.legend()
+    fig.tight_layout()
+    paths.append(os.path.join(out_dir, "per_class_scores.png"))
+    fig.savefig(paths[-1], dpi=120)
+    plt.close(fig)
+    return paths
+
+
+# ========= Evaluation =========
+def result_dir(out_root, model_path, data_path):
+    model_name = os.path.splitext(os.path.basename(model_path))[0]
+    data_name = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(out_root, f"{model_name}-{file_hash(model_path)[:6]}__{data_name}")
+
+
+def evaluate_pair(model_path, data_path, out_root=EVAL_DIR, use_cache=True, plots=True):
+    """
+    Evaluate one model on one test CSV and write confusion_matrix.csv, metrics.json,
+    report.txt and (with matplotlib) the plots to a directory under out_root.
+    Returns the metrics dict with "model", "data", "out_dir" and "source" added.
+    """
+    t0 = time.perf_counter()
+    X, y_true = load_dataset(data_path)
+    y_pred, source = cached_predict(model_path, data_path, X, use_cache)
+    labels = sorted(set(np.unique(y_true).tolist()) | set(np.unique(y_pred).tolist()))
+    cm = confusion(np.asarray(y_true), y_pred, labels)
+    metrics = metrics_dict(cm, labels)
+
+    out_dir = result_dir(out_root, model_path, data_path)
+    os.makedirs(out_dir, exist_ok=True)
+    np.savetxt(os.path.join(out_dir, "confusion_matrix.csv"), cm, fmt="%d", delimiter=",",
+               header=",".join(str(l) for l in labels), comments="")
+    with open(os.path.join(out_dir, "report.txt"), "w", encoding="utf-8") as f:
+        f.write(format_report(metrics) + "\n")
+    metrics.update(model=os.path.abspath(model_path), data=os.path.abspath(data_path),
+                   out_dir=out_dir, source=source)
+    with open(os.path.join(out_dir, "metrics.json"), "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    if plots:
+        save_plots(metrics, out_dir, f"{os.path.basename(model_path)} on {os.path.basename(data_path)}")
+    metrics["seconds"] = time.perf_counter() - t0
+    return metrics
+
+
+def evaluate_all(models, datasets, out_root=EVAL_DIR, jobs=None, use_cache=True, plots=True):
+    """Evaluate every model on every dataset, in up to `jobs` processes; returns the metrics in order."""
+    pairs = [(m, d) for m in models for d in datasets]
+    jobs = min(jobs or os.cpu_count() or 1, len(pairs))
+    if jobs <= 1:
+        return [evaluate_pair(m, d, out_root, use_cache, plots) for m, d in pairs]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(evaluate_pair, m, d, out_root, use_cache, plots) for m, d in pairs]
+        return [f.result() for f in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate gesture classifiers on labelled test CSVs")
+    parser.add_argument("--models", nargs="+", default=[MODEL_FILE], help=".joblib, .npz or .bin models")
+    parser.add_argument("--data", nargs="+", default=[TEST_CSV], help="labelled test CSVs")
+    parser.add_argument("--out", default=EVAL_DIR, help="output directory")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--no-cache", action="store_true", help="always predict, ignore cached predictions")
+    parser.add_argument("--no-plots", action="store_true")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    results = evaluate_all(args.models, args.data, args.out, args.jobs, not args.no_cache, not args.no_plots)
+    for r in results:
+        print(f"\n=== {os.path.basename(r['model'])} on {os.path.basename(r['data'])} "
+              f"(predictions from {r['source']}, {r['seconds']:.2f} s) ===")
+        print("Confusion Matrix (rows = true label, cols = predicted label):")
+        print(np.array(r["confusion_matrix"]))
+        print(format_report(r))
+        print(f"[INFO] Results written to {r['out_dir']}")
+
+    summary = [{k: r[k] for k in ("model", "data", "accuracy", "macro_avg", "out_dir", "source")}
+               for r in results]
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"\n[INFO] Evaluated {len(results)} model/test-set pairs in {time.perf_counter() - t0:.2f} s")
+    print(f"[INFO] Summary written to {os.path.join(args.out, SUMMARY_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,74 @@
 import numpy as np
 
+# MediaPipe Hands layout
+NUM_LANDMARKS = 21
+WRIST = 0
+MIDDLE_TIP = 12
+
+# 21 keypoints (x, y) -> 42-dimensional feature vector
+FEATURE_DIM = NUM_LANDMARKS * 2
+FEATURE_COLUMNS = [f"f{i}" for i in range(FEATURE_DIM)]
+
+# Version of the feature layout / normalization below. Bump it whenever they change:
+# model artifacts record it and the client refuses artifacts built for another version.
+FEATURE_SCHEMA_VERSION = 1
+
+MIN_HAND_SIZE = 1e-6  # Prevent division by zero
+
+
+def landmarks_to_array(landmarks, dims=2):
+    """
+    Convert hand_landmarks.landmark (length = 21) into a (21, dims) float64 array.
+    dims = 2 keeps (x, y), dims = 3 keeps (x, y, z).
+    """
+    if dims == 3:
+        coords = (c for p in landmarks for c in (p.x, p.y, p.z))
+    else:
+        coords = (c for p in landmarks for c in (p.x, p.y))
+    return np.fromiter(coords, dtype=np.float64, count=NUM_LANDMARKS * dims).reshape(NUM_LANDMARKS, dims)
+
+
+def extract_features_batch(points):
+    """
+    points: (N, 21, 2) or (N, 21, 3) array of landmark coordinates (z is ignored)
+    Returns the (N, 42) float32 feature matrix in a single vectorized pass,
+    using the same normalization as extract_hand_features.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    if pts.ndim != 3 or pts.shape[1] != NUM_LANDMARKS or pts.shape[2] < 2:
+        raise ValueError(f"Expected landmarks of shape (N, 21, 2|3), got {pts.shape}")
+
+    # Relative coordinates with the wrist (landmark 0) as the origin
+    rel = pts[:, :, :2] - pts[:, WRIST:WRIST + 1, :2]
+
+    # Hand scale per sample: distance from wrist to middle fingertip
+    tip = rel[:, MIDDLE_TIP]
+    hand_size = np.sqrt(tip[:, 0] ** 2 + tip[:, 1] ** 2)
+    np.maximum(hand_size, MIN_HAND_SIZE, out=hand_size)
+
+    rel /= hand_size[:, None, None]
+    return rel.reshape(len(pts), FEATURE_DIM).astype(np.float32)
+
+
 def extract_hand_features(landmarks):
     """
-    landmarks: hand_landmarks.landmark (length = 21)
+    landmarks: hand_landmarks.landmark (length = 21) or a (21, 2|3) array
     Feature extraction method:
     Relative coordinates based on the wrist (landmark 0) as the origin,
     normalized by an estimated hand size, producing a 42-dimensional feature vector.
+    This is the single-hand fast path of extract_features_batch.
     """
-    wrist = landmarks[0]
-    wx, wy = wrist.x, wrist.y
+    if isinstance(landmarks, np.ndarray):
+        pts = landmarks[:, :2].astype(np.float64, copy=False)
+    else:
+        pts = landmarks_to_array(landmarks)
+
+    rel = pts - pts[WRIST]
 
     # Compute hand scale: distance from wrist to middle fingertip
-    middle_tip = landmarks[12]
-    hand_size = np.sqrt((middle_tip.x - wx) ** 2 + (middle_tip.y - wy) ** 2)
-    if hand_size < 1e-6:
-        hand_size = 1e-6  # Prevent division by zero
-
-    features = []
-    for p in landmarks:
-        rx = (p.x - wx) / hand_size   # translation + scale normalization
-        ry = (p.y - wy) / hand_size
-        features.extend([rx, ry])
-
-    return np.array(features, dtype=np.float32)
+    dx, dy = rel[MIDDLE_TIP]
+    hand_size = np.sqrt(dx ** 2 + dy ** 2)
+    if hand_size < MIN_HAND_SIZE:
+        hand_size = MIN_HAND_SIZE
+
+    return (rel / hand_size).astype(np.float32).ravel()
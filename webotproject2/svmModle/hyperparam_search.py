@@ -0,0 +1,163 @@
+# hyperparam_search.py
+# Cross-validated C / gamma (and kernel) search for the gesture SVM, used by
+# "train_svm.py --search".
+#
+# For every stratified fold the scaler is fit on the training part once and the
+# Gram and squared-distance matrices (train x train, val x train) are computed once
+# and saved as .npy files in a temporary directory. Worker processes memory-map them,
+# so a candidate only applies its kernel function to the cached matrix and fits an
+# SVC(kernel="precomputed"); one kernel matrix is shared by every C value.
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+KERNELS = ("rbf", "linear", "poly")
+DEFAULT_C = [0.1, 1.0, 10.0, 100.0]
+DEFAULT_GAMMA = ["scale", 0.003, 0.01, 0.03, 0.1, 0.3]
+POLY_DEGREE = 3   # SVC defaults, so the refit model matches the searched one
+POLY_COEF0 = 0.0
+
+_folds = None  # per process: [(arrays, scale_gamma), ...] memory-mapped from disk
+
+
+def prepare_folds(X, y, n_folds, cache_dir, seed=42):
+    """Scale each fold and store its matrices in cache_dir; returns [(paths, scale_gamma), ...]."""
+    folds = []
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for i, (train_idx, val_idx) in enumerate(splitter.split(X, y)):
+        scaler = StandardScaler().fit(X[train_idx])
+        Xt = scaler.transform(X[train_idx]).astype(np.float64)
+        Xv = scaler.transform(X[val_idx]).astype(np.float64)
+
+        gram_tt = Xt @ Xt.T
+        gram_vt = Xv @ Xt.T
+        sq_t = np.einsum("ij,ij->i", Xt, Xt)
+        sq_v = np.einsum("ij,ij->i", Xv, Xv)
+        arrays = {
+            "gram_tt": gram_tt,
+            "gram_vt": gram_vt,
+            "dist_tt": np.maximum(sq_t[:, None] + sq_t[None, :] - 2.0 * gram_tt, 0.0),
+            "dist_vt": np.maximum(sq_v[:, None] + sq_t[None, :] - 2.0 * gram_vt, 0.0),
+            "y_t": y[train_idx],
+            "y_v": y[val_idx],
+        }
+        paths = {}
+        for name, array in arrays.items():
+            paths[name] = os.path.join(cache_dir, f"fold{i}_{name}.npy")
+            np.save(paths[name], array)
+
+        # gamma="scale" as SVC computes it on the (scaled) training data
+        folds.append((paths, 1.0 / (Xt.shape[1] * Xt.var())))
+    return folds
+
+
+def _init_worker(folds):
+    global _folds
+    _folds = [
+        ({name: np.load(path, mmap_mode="r") for name, path in paths.items()}, scale_gamma)
+        for paths, scale_gamma in folds
+    ]
+
+
+def kernel_matrices(fold, kernel, gamma):
+    """(train x train, val x train) kernel matrices of a fold from its cached matrices."""
+    arrays, scale_gamma = fold
+    g = scale_gamma if gamma == "scale" else gamma
+    if kernel == "rbf":
+        return np.exp(-g * arrays["dist_tt"]), np.exp(-g * arrays["dist_vt"])
+    if kernel == "linear":
+        return np.asarray(arrays["gram_tt"]), np.asarray(arrays["gram_vt"])
+    if kernel == "poly":
+        return ((g * arrays["gram_tt"] + POLY_COEF0) ** POLY_DEGREE,
+                (g * arrays["gram_vt"] + POLY_COEF0) ** POLY_DEGREE)
+    raise ValueError(f"Unknown kernel {kernel!r}")
+
+
+def evaluate_task(task):
+    """task = (kernel, gamma, fold index, C values) -> [(kernel, C, gamma, acc, n_sv, fit_s), ...]"""
+    kernel, gamma, fold_index, c_values = task
+    arrays = _folds[fold_index][0]
+    K_tt, K_vt = kernel_matrices(_folds[fold_index], kernel, gamma)
+    y_t, y_v = arrays["y_t"], arrays["y_v"]
+
+    results = []
+    for C in c_values:
+        t0 = time.perf_counter()
+        clf = SVC(kernel="precomputed", C=C).fit(K_tt, y_t)
+        fit_s = time.perf_counter() - t0
+        acc = float(np.mean(clf.predict(K_vt) == y_v))
+        results.append((kernel, C, gamma, acc, int(clf.support_.size), fit_s))
+    return results
+
+
+def make_tasks(kernels, c_values, gamma_values, n_folds):
+    tasks = []
+    for kernel in kernels:
+        # gamma has no effect on the linear kernel
+        gammas = ["scale"] if kernel == "linear" else gamma_values
+        for gamma in gammas:
+            for fold in range(n_folds):
+                tasks.append((kernel, gamma, fold, list(c_values)))
+    return tasks
+
+
+def search(X, y, kernels=("rbf",), c_values=DEFAULT_C, gamma_values=DEFAULT_GAMMA,
+           n_folds=5, jobs=None):
+    """
+    Stratified k-fold search over kernel x C x gamma.
+    Returns rows sorted best first: dicts with kernel, C, gamma, mean/std accuracy
+    and mean number of support vectors (the inference cost of an RBF SVM).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="svm_search_") as cache_dir:
+        folds = prepare_folds(X, y, n_folds, cache_dir)
+        tasks = make_tasks(kernels, c_values, gamma_values, n_folds)
+        print(f"[INFO] Search: {len(tasks)} kernel matrices x {len(c_values)} C values, "
+              f"{n_folds} folds, {jobs} process(es)")
+
+        if jobs == 1:
+            _init_worker(folds)
+            outputs = list(map(evaluate_task, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(folds,)) as pool:
+                outputs = list(pool.map(evaluate_task, tasks))
+
+    per_candidate = {}
+    for results in outputs:
+        for kernel, C, gamma, acc, n_sv, fit_s in results:
+            per_candidate.setdefault((kernel, C, gamma), []).append((acc, n_sv, fit_s))
+
+    rows = []
+    for (kernel, C, gamma), values in per_candidate.items():
+        acc, n_sv, fit_s = (np.array(v) for v in zip(*values))
+        rows.append({
+            "kernel": kernel,
+            "C": C,
+            "gamma": gamma,
+            "accuracy_mean": float(acc.mean()),
+            "accuracy_std": float(acc.std()),
+            "n_support_mean": float(n_sv.mean()),
+            "fit_seconds_mean": float(fit_s.mean()),
+        })
+    # Best accuracy first; among equals the cheaper model (fewer support vectors)
+    rows.sort(key=lambda r: (-round(r["accuracy_mean"], 6), r["n_support_mean"]))
+    print(f"[INFO] Search finished in {time.perf_counter() - t0:.2f} s")
+    return rows
+
+
+def print_table(rows, limit=20):
+    print(f"\n{'rank':>4s}  {'kernel':6s} {'C':>8s} {'gamma':>8s}  {'accuracy':>15s}  {'#SV':>7s}")
+    for rank, r in enumerate(rows[:limit], 1):
+        gamma = r["gamma"] if isinstance(r["gamma"], str) else f"{r['gamma']:g}"
+        print(f"{rank:4d}  {r['kernel']:6s} {r['C']:8g} {gamma:>8s}  "
+              f"{r['accuracy_mean']:.4f} ± {r['accuracy_std']:.4f}  {r['n_support_mean']:7.1f}")
+    if len(rows) > limit:
+        print(f"  ... {len(rows) - limit} more")
@@ -0,0 +1,283 @@
+# incremental_train.py
+# Incremental update of the gesture SVM with newly collected CSV rows.
+#
+# An RBF SVC cannot be updated in place, but its decision function depends only on
+# its support vectors. An update therefore re-fits the SVC on the previous support
+# vectors plus the new rows ("SV-incremental" training). That is a few hundred
+# samples instead of the whole CSV, so a refreshed model is ready in milliseconds and
+# stays an RBF SVC that rbf_engine.py can export for the client.
+# The scaler is updated with partial_fit (exact running mean / variance over all rows)
+# and old support vectors are mapped back to raw features before re-scaling; gamma
+# stays at the numeric value of the last full fit.
+# Hyperparameters (kernel, C, gamma, ...) are those of the deployed model, so a
+# train_svm.py --search winner is kept; they are recorded in STATE_FILE at every full
+# fit. Only RBF models are updated incrementally (the NumPy engine is RBF-only), any
+# other kernel gets a full refit instead.
+# Rows under svmModle/TEST/ are never learned: that is the held-out test set.
+#
+# Dropping the non-support rows is an approximation, so --watch mode also runs a full
+# "consolidation" refit once no new samples have arrived for CONSOLIDATE_AFTER seconds.
+#
+# STATE_FILE records how much of the CSV has been learned: byte offset, row count
+# and a hash of the learned part. If the CSV was rewritten rather than appended to,
+# the next update retrains from scratch.
+#
+#   python incremental_train.py             learn the rows added since the last run
+#   python incremental_train.py --watch     keep running, update whenever the CSV grows
+#   python incremental_train.py --full      retrain on the whole CSV
+import argparse
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from dataset import TEST_DIR_NAME, is_test_path, parse_rows
+from model_artifact import export_artifact
+from rbf_engine import RbfSvmEngine
+from train_svm import ARTIFACT_FILE, DATA_FILE, DEFAULT_PARAMS, ENGINE_FILE, MODEL_FILE
+
+STATE_FILE = "svmModel_incremental.json"
+WATCH_INTERVAL = 0.5      # s between CSV size checks in --watch mode
+CONSOLIDATE_AFTER = 10.0  # s without new samples before --watch does a full refit
+HASH_CHUNK = 1 << 20
+SVC_PARAM_KEYS = ("kernel", "C", "gamma", "degree", "coef0", "class_weight")
+
+
+def svc_params(model):
+    """Hyperparameters of the SVC of a fitted Pipeline."""
+    params = model.named_steps["svm"].get_params()
+    return {key: params[key] for key in SVC_PARAM_KEYS}
+
+
+def prefix_hash(path, size):
+    """blake2b of the first `size` bytes of a file."""
+    h = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        remaining = size
+        while remaining > 0:
+            chunk = f.read(min(HASH_CHUNK, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+
+def read_rows_from(csv_path, offset):
+    """
+    Parse the complete rows after byte `offset` (0 = start of file, header skipped).
+    Returns (X, y, new_offset); a trailing row still being written is left for next time.
+    """
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        f.seek(start)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    columns = header.decode("utf-8").strip().split(",")
+    X, y = parse_rows(columns, data[:end].decode("utf-8"), csv_path)
+    return X, y, start + end
+
+
+def support_set(model):
+    """(support vectors in raw feature space, their labels) of a fitted Pipeline."""
+    svc = model.named_steps["svm"]
+    labels = np.repeat(svc.classes_, svc.n_support_)
+    return model.named_steps["scaler"].inverse_transform(svc.support_vectors_), labels
+
+
+def save_atomic(model, model_path, engine_path, artifact_path=None, data_hash=None, rows=None):
+    """Write model, engine and artifact via temporary files, so a reader never sees half a file."""
+    tmp = model_path + ".tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, model_path)
+    if model.named_steps["svm"].kernel != "rbf":
+        # No NumPy engine for other kernels; a stale one would not match (as in train_svm.py)
+        for path in (engine_path, artifact_path):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+        return
+    tmp = engine_path + ".tmp.npz"
+    RbfSvmEngine.from_pipeline(model).save(tmp)
+    os.replace(tmp, engine_path)
+    if artifact_path is not None:
+        export_artifact(model, artifact_path, data_hash, rows)
+
+
+class IncrementalTrainer:
+    def __init__(self, data_path=DATA_FILE, model_path=MODEL_FILE, engine_path=ENGINE_FILE,
+                 state_path=STATE_FILE, artifact_path=ARTIFACT_FILE):
+        if is_test_path(data_path):
+            raise ValueError(f"{data_path} is in the held-out {TEST_DIR_NAME} set, refusing to train on it")
+        self.data_path = data_path
+        self.model_path = model_path
+        self.engine_path = engine_path
+        self.state_path = state_path
+        self.artifact_path = artifact_path
+        self.state = self._load_state()
+        self.model = None
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("data") != os.path.abspath(self.data_path):
+            return None
+        return state
+
+    def _save_state(self, offset, rows, incremental_rows, n_support, params):
+        self.state = {
+            "data": os.path.abspath(self.data_path),
+            "params": params,   # of the last full fit, reused by the next one
+            "offset": offset,
+            "rows": rows,
+            "incremental_rows": incremental_rows,   # learned since the last full fit
+            "prefix_hash": prefix_hash(self.data_path, offset),
+            "n_support": n_support,
+            "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def _state_valid(self):
+        s = self.state
+        if s is None or not os.path.exists(self.model_path):
+            return False
+        if os.path.getsize(self.data_path) < s["offset"]:
+            return False
+        return prefix_hash(self.data_path, s["offset"]) == s["prefix_hash"]
+
+    def _params(self):
+        """Hyperparameters for a full fit: last full fit, else the deployed model, else the defaults."""
+        if self.state is not None and self.state.get("params"):
+            return dict(self.state["params"])
+        if self.model is None and os.path.exists(self.model_path):
+            self.model = joblib.load(self.model_path)
+        if self.model is not None:
+            return svc_params(self.model)
+        return dict(DEFAULT_PARAMS)
+
+    def full_fit(self):
+        params = self._params()
+        X, y, offset = read_rows_from(self.data_path, 0)
+        scaler = StandardScaler().fit(X)
+        svc = SVC(**params)
+        svc.fit(scaler.transform(X), y)
+        self.model = Pipeline([("scaler", scaler), ("svm", svc)])
+        save_atomic(self.model, self.model_path, self.engine_path, self.artifact_path,
+                    prefix_hash(self.data_path, offset), len(y))
+        self._save_state(offset, len(y), 0, int(svc.support_.size), params)
+        print(f"[INFO] Full fit on {len(y)} rows ({params['kernel']}, C={params['C']}, "
+              f"gamma={params['gamma']}): {svc.support_.size} support vectors")
+        return len(y)
+
+    def update(self, full=False):
+        """Learn the rows added since the last update; returns the number of new rows."""
+        if full or not self._state_valid():
+            if not full and self.state is not None:
+                print("[INFO] Dataset was rewritten or model is missing, retraining from scratch")
+            return self.full_fit()
+
+        X_new, y_new, offset = read_rows_from(self.data_path, self.state["offset"])
+        if len(y_new) == 0:
+            return 0
+        if self.model is None:
+            self.model = joblib.load(self.model_path)
+        old_svc = self.model.named_steps["svm"]
+        if old_svc.kernel != "rbf":
+            print(f"[INFO] {old_svc.kernel} kernel is not updated incrementally, retraining from scratch")
+            return self.full_fit()
+
+        t0 = time.perf_counter()
+        sv, sv_labels = support_set(self.model)
+        scaler = copy.deepcopy(self.model.named_steps["scaler"]).partial_fit(X_new)
+        X = scaler.transform(np.vstack([sv, X_new]))
+        y = np.concatenate([sv_labels, y_new])
+
+        # Fixed numeric gamma: "scale" would change with every (small) training set
+        params = dict(svc_params(self.model), gamma=old_svc._gamma)
+        svc = SVC(**params).fit(X, y)
+        self.model = Pipeline([("scaler", scaler), ("svm", svc)])
+        rows = self.state["rows"] + len(y_new)
+        save_atomic(self.model, self.model_path, self.engine_path, self.artifact_path,
+                    prefix_hash(self.data_path, offset), rows)
+        self._save_state(offset, rows, self.state.get("incremental_rows", 0) + len(y_new),
+                         int(svc.support_.size), self.state.get("params") or svc_params(self.model))
+        print(f"[INFO] Learned {len(y_new)} new rows ({rows} total) in "
+              f"{(time.perf_counter() - t0) * 1000:.1f} ms: {svc.support_.size} support vectors")
+        return len(y_new)
+
+    def watch(self, stop_event=None, interval=WATCH_INTERVAL, consolidate_after=CONSOLIDATE_AFTER):
+        """
+        Update whenever the CSV grows, until stop_event is set (or forever); refit on
+        the whole CSV once it has not changed for consolidate_after seconds.
+        """
+        stop_event = stop_event or threading.Event()
+        last_size = None
+        last_change = time.monotonic()
+        print(f"[INFO] Watching {self.data_path} for new samples")
+        while not stop_event.is_set():
+            try:
+                size = os.path.getsize(self.data_path)
+                if size != last_size:
+                    last_size = size
+                    last_change = time.monotonic()
+                    self.update()
+                elif (self.state and self.state.get("incremental_rows")
+                        and time.monotonic() - last_change > consolidate_after):
+                    print("[INFO] Collection paused, consolidating with a full refit")
+                    self.full_fit()
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Incremental update failed: {e}")
+            stop_event.wait(interval)
+
+
+def start_background(data_path, model_path=MODEL_FILE, engine_path=ENGINE_FILE, state_path=STATE_FILE,
+                     artifact_path=ARTIFACT_FILE):
+    """Run IncrementalTrainer.watch in a daemon thread; returns the stop event."""
+    stop_event = threading.Event()
+    trainer = IncrementalTrainer(data_path, model_path, engine_path, state_path, artifact_path)
+    thread = threading.Thread(target=trainer.watch, args=(stop_event,), name="incremental-train",
+                              daemon=True)
+    thread.start()
+    return stop_event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally update the gesture SVM")
+    parser.add_argument("--data", default=DATA_FILE, help="dataset CSV")
+    parser.add_argument("--full", action="store_true", help="retrain on the whole CSV")
+    parser.add_argument("--watch", action="store_true", help="keep updating while the CSV grows")
+    args = parser.parse_args()
+
+    try:
+        trainer = IncrementalTrainer(args.data)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.watch:
+        if args.full:
+            trainer.update(full=True)
+        try:
+            trainer.watch()
+        except KeyboardInterrupt:
+            pass
+    else:
+        n = trainer.update(full=args.full)
+        if n == 0:
+            print("[INFO] No new rows, model is up to date")
+
+
+if __name__ == "__main__":
+    main()
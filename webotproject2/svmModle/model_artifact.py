@@ -0,0 +1,220 @@
+# model_artifact.py
+# Versioned, memory-mappable model artifact for the gesture classifier.
+#
+# The artifact holds the arrays of the NumPy RBF engine (rbf_engine.py) together with
+# the metadata needed to use them safely:
+#
+#   offset 0      MAGIC (8 bytes), format version (uint32), header length (uint32)
+#   offset 16     header: UTF-8 JSON, zero-padded to a multiple of ALIGNMENT
+#   then          raw little-endian arrays, each starting on an ALIGNMENT boundary
+#
+# The JSON header records the feature schema version and dimension of the extractor
+# the model was trained with, the label map, the training data hash, metrics and, per
+# array, its dtype / shape / offset, plus a checksum of the array region.
+# load_artifact() maps the file and wraps the arrays without copying or unpickling
+# (no sklearn import), after checking magic, versions, bounds and checksum. A model
+# built for another feature schema is refused with FeatureSchemaError.
+#
+#   python model_artifact.py [svmModel_artifact.bin]     show the metadata of an artifact
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from extract_features import FEATURE_DIM, FEATURE_SCHEMA_VERSION
+from rbf_engine import RbfSvmEngine
+
+MAGIC = b"G46MODEL"
+FORMAT_VERSION = 1
+PREFIX = struct.Struct("<8sII")   # magic, format version, header length
+ALIGNMENT = 64
+ENGINE_ARRAYS = ("classes", "mean", "scale", "support_vectors", "pair_coef", "intercept",
+                 "pair_pos", "pair_neg")
+# Header keys read by load_artifact / ModelArtifact and their JSON types
+HEADER_KEYS = {"gamma": (int, float), "label_map": dict, "created": str, "arrays": dict,
+               "data_size": int, "checksum": str}
+
+# Label map stored in every artifact: numerical training labels -> gesture names
+GESTURE_LABELS = {
+    0: "FIST",          # STOP
+    1: "PALM_FORWARD",  # FORWARD
+    2: "PALM_RIGHT",    # TURN_RIGHT
+    3: "PALM_LEFT",     # TURN_LEFT
+    4: "ONE",           # SPEED_UP
+    5: "TWO",           # SLOW_DOWN
+}
+
+
+class ArtifactError(ValueError):
+    """The file is not a valid model artifact."""
+
+
+class FeatureSchemaError(ArtifactError):
+    """The artifact was built for a different feature layout than the running extractor."""
+
+
+class ModelArtifact:
+    def __init__(self, path, metadata, engine):
+        self.path = path
+        self.metadata = metadata
+        self.engine = engine
+        self.label_map = {int(k): v for k, v in metadata["label_map"].items()}
+
+    def describe(self):
+        m = self.metadata
+        return (f"{self.engine.n_support} support vectors, schema v{m['feature_schema_version']}, "
+                f"data {m.get('data', {}).get('hash')}, created {m['created']}")
+
+
+def _align(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def save_artifact(path, engine, label_map=None, data_hash=None, data_rows=None, metrics=None):
+    """Write engine arrays and metadata to path (atomically, via a temporary file)."""
+    label_map = GESTURE_LABELS if label_map is None else label_map
+    arrays = {name: np.ascontiguousarray(getattr(engine, name)) for name in ENGINE_ARRAYS}
+    arrays = {name: a.astype(a.dtype.newbyteorder("<")) for name, a in arrays.items()}
+
+    directory = {}
+    offset = 0
+    for name, a in arrays.items():
+        directory[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset,
+                           "nbytes": a.nbytes}
+        offset = _align(offset + a.nbytes)
+    data_size = offset
+
+    checksum = hashlib.blake2b(digest_size=8)
+    for name, a in arrays.items():
+        checksum.update(a.tobytes())
+    header = {
+        "format_version": FORMAT_VERSION,
+        "feature_schema_version": FEATURE_SCHEMA_VERSION,
+        "feature_dim": FEATURE_DIM,
+        "model": "rbf_svc_ovo",
+        "gamma": engine.gamma,
+        "label_map": {str(k): v for k, v in label_map.items()},
+        "data": {"hash": data_hash, "rows": data_rows},
+        "metrics": metrics or {},
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "arrays": directory,
+        "data_size": data_size,
+        "checksum": checksum.hexdigest(),
+    }
+    header_bytes = json.dumps(header, indent=1).encode("utf-8")
+    data_start = _align(PREFIX.size + len(header_bytes))
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - PREFIX.size - len(header_bytes)))
+        for name, a in arrays.items():
+            f.seek(data_start + directory[name]["offset"])
+            f.write(a.tobytes())
+        f.truncate(data_start + data_size)
+    os.replace(tmp, path)
+
+
+def export_artifact(model, path, data_hash=None, data_rows=None, metrics=None):
+    """
+    Build the engine from a fitted scaler + RBF-SVC pipeline and save it as an artifact.
+    data_hash: content hash of the training CSV (dataset.file_hash), data_rows: rows trained on.
+    """
+    engine = RbfSvmEngine.from_pipeline(model)
+    data_rows = int(data_rows) if data_rows is not None else None
+    metrics = dict(metrics or {}, n_support=engine.n_support)
+    save_artifact(path, engine, GESTURE_LABELS, data_hash, data_rows, metrics)
+    return engine
+
+
+def _read_header(mm, path):
+    if len(mm) < PREFIX.size:
+        raise ArtifactError(f"{path} is too short to be a model artifact")
+    magic, version, header_len = PREFIX.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ArtifactError(f"{path} is not a model artifact (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ArtifactError(f"{path} has format version {version}, expected {FORMAT_VERSION}")
+    if PREFIX.size + header_len > len(mm):
+        raise ArtifactError(f"{path} is truncated (header)")
+    try:
+        meta = json.loads(bytes(mm[PREFIX.size:PREFIX.size + header_len]))
+    except ValueError as e:
+        raise ArtifactError(f"{path} has a corrupt header: {e}") from None
+    if not isinstance(meta, dict):
+        raise ArtifactError(f"{path} has a corrupt header: not a JSON object")
+    for key, types in HEADER_KEYS.items():
+        value = meta.get(key)
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ArtifactError(f"{path} has a corrupt header: missing or invalid {key!r}")
+    if not all(k.lstrip("-").isdigit() and isinstance(v, str) for k, v in meta["label_map"].items()):
+        raise ArtifactError(f"{path} has a corrupt header: invalid 'label_map'")
+    return meta, _align(PREFIX.size + header_len)
+
+
+def load_artifact(path, verify=True):
+    """
+    Map an artifact and return a ModelArtifact whose engine arrays are views of the file.
+    Raises FeatureSchemaError for a different feature schema, ArtifactError for anything
+    else that is wrong with the file (OSError if it cannot be opened).
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    meta, data_start = _read_header(mm, path)
+
+    schema, dim = meta.get("feature_schema_version"), meta.get("feature_dim")
+    if schema != FEATURE_SCHEMA_VERSION or dim != FEATURE_DIM:
+        raise FeatureSchemaError(
+            f"{path} was built for feature schema v{schema} ({dim} features), the running "
+            f"extractor is v{FEATURE_SCHEMA_VERSION} ({FEATURE_DIM} features); retrain the model")
+    arrays = {}
+    try:
+        if data_start + meta["data_size"] > len(mm):
+            raise ArtifactError(f"{path} is truncated (data)")
+        for name in ENGINE_ARRAYS:
+            spec = meta["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            if count * dtype.itemsize != spec["nbytes"] or spec["offset"] + spec["nbytes"] > meta["data_size"]:
+                raise ArtifactError(f"{path}: array {name!r} does not fit its declared size")
+            arrays[name] = np.frombuffer(mm, dtype, count, data_start + spec["offset"]).reshape(spec["shape"])
+    except (KeyError, TypeError) as e:
+        raise ArtifactError(f"{path} has an incomplete array directory: {e}") from None
+
+    if verify:
+        checksum = hashlib.blake2b(digest_size=8)
+        for name in ENGINE_ARRAYS:
+            checksum.update(arrays[name].tobytes())
+        if checksum.hexdigest() != meta["checksum"]:
+            raise ArtifactError(f"{path} failed its checksum")
+
+    n_sv = arrays["support_vectors"].shape[0]
+    if (arrays["support_vectors"].shape[1:] != (FEATURE_DIM,) or arrays["pair_coef"].shape[1:] != (n_sv,)
+            or len(arrays["intercept"]) != len(arrays["pair_coef"])):
+        raise ArtifactError(f"{path} has inconsistent array shapes")
+
+    engine = RbfSvmEngine(arrays["classes"], arrays["mean"], arrays["scale"], arrays["support_vectors"],
+                          arrays["pair_coef"], arrays["intercept"], meta["gamma"],
+                          arrays["pair_pos"], arrays["pair_neg"])
+    return ModelArtifact(path, meta, engine)
+
+
+def main():
+    import train_svm
+
+    path = sys.argv[1] if len(sys.argv) > 1 else train_svm.ARTIFACT_FILE
+    t0 = time.perf_counter()
+    artifact = load_artifact(path)
+    print(f"[INFO] Loaded {path} in {(time.perf_counter() - t0) * 1000:.2f} ms: {artifact.describe()}")
+    meta = {k: v for k, v in artifact.metadata.items() if k != "arrays"}
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# rbf_engine.py
+# Flat NumPy inference engine for the trained StandardScaler + RBF-SVC pipeline.
+#
+# Export and verify against the sklearn model:
+#   python svmModle/rbf_engine.py [--model svmModel.joblib] [--out svmModel_engine.npz]
+import argparse
+import os
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_FILE = os.path.join(BASE_DIR, "svmModel.joblib")
+ENGINE_FILE = os.path.join(BASE_DIR, "svmModel_engine.npz")
+ARTIFACT_FILE = os.path.join(BASE_DIR, "svmModel_artifact.bin")
+TEST_CSV = os.path.join(BASE_DIR, "TEST", "gesture_test_data.csv")
+
+
+class RbfSvmEngine:
+    """
+    One-vs-one RBF-SVC decision function evaluated with plain NumPy.
+
+    All parameters are stored as contiguous float64 arrays:
+      mean, scale       StandardScaler statistics (scale already has zeros replaced by 1)
+      support_vectors   (n_sv, n_features) support vectors in scaled space
+      sv_sq_norms       (n_sv,) squared norms of the support vectors
+      pair_coef         (n_pairs, n_sv) dual coefficients of every class pair,
+                        zero for support vectors that do not belong to the pair
+      intercept         (n_pairs,) intercept of every class pair
+      gamma             RBF kernel coefficient
+    Pair p = (pair_pos[p], pair_neg[p]) votes for pair_pos[p] when its decision value is > 0,
+    following libsvm's ordering so predictions match SVC.predict exactly.
+    """
+
+    def __init__(self, classes, mean, scale, support_vectors, pair_coef, intercept,
+                 gamma, pair_pos, pair_neg):
+        self.classes = np.ascontiguousarray(classes)
+        self.mean = np.ascontiguousarray(mean, dtype=np.float64)
+        self.scale = np.ascontiguousarray(scale, dtype=np.float64)
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=np.float64)
+        self.sv_sq_norms = np.einsum("ij,ij->i", self.support_vectors, self.support_vectors)
+        self.pair_coef = np.ascontiguousarray(pair_coef, dtype=np.float64)
+        self.intercept = np.ascontiguousarray(intercept, dtype=np.float64)
+        self.gamma = float(gamma)
+        self.pair_pos = np.ascontiguousarray(pair_pos, dtype=np.intp)
+        self.pair_neg = np.ascontiguousarray(pair_neg, dtype=np.intp)
+
+        n_classes = len(self.classes)
+        # One-hot vote matrices: votes = win @ pos_onehot + (1 - win) @ neg_onehot
+        self._pos_onehot = np.eye(n_classes)[self.pair_pos]
+        self._neg_onehot = np.eye(n_classes)[self.pair_neg]
+
+    @property
+    def n_support(self):
+        return self.support_vectors.shape[0]
+
+    @property
+    def n_features(self):
+        return self.support_vectors.shape[1]
+
+    # ========= Construction =========
+    @classmethod
+    def from_pipeline(cls, model):
+        """Build an engine from a fitted Pipeline([("scaler", StandardScaler()), ("svm", SVC(kernel="rbf"))])
+        or a bare RBF SVC. Raises ValueError for anything else."""
+        scaler = None
+        svc = model
+        if hasattr(model, "steps"):
+            if len(model.steps) == 2:
+                scaler = model.steps[0][1]
+            elif len(model.steps) != 1:
+                raise ValueError(f"Unsupported pipeline with {len(model.steps)} steps")
+            svc = model.steps[-1][1]
+
+        if getattr(svc, "kernel", None) != "rbf" or not hasattr(svc, "support_vectors_"):
+            raise ValueError(f"Only fitted RBF SVC models are supported, got {type(svc).__name__}")
+
+        support_vectors = svc.support_vectors_
+        n_features = support_vectors.shape[1]
+        if scaler is not None:
+            if not hasattr(scaler, "scale_"):
+                raise ValueError(f"Unsupported preprocessing step {type(scaler).__name__}")
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        else:
+            mean = np.zeros(n_features)
+            scale = np.ones(n_features)
+
+        # libsvm internals (sign conventions differ from the public attributes for binary problems)
+        dual_coef = svc._dual_coef_
+        intercept = svc._intercept_
+        n_support = svc._n_support
+        n_classes = len(svc.classes_)
+        sv_start = np.concatenate([[0], np.cumsum(n_support)])
+
+        pair_pos, pair_neg = [], []
+        pair_coef = np.zeros((n_classes * (n_classes - 1) // 2, len(support_vectors)))
+        p = 0
+        for i in range(n_classes):
+            for j in range(i + 1, n_classes):
+                si = slice(sv_start[i], sv_start[i + 1])
+                sj = slice(sv_start[j], sv_start[j + 1])
+                pair_coef[p, si] = dual_coef[j - 1, si]
+                pair_coef[p, sj] = dual_coef[i, sj]
+                pair_pos.append(i)
+                pair_neg.append(j)
+                p += 1
+
+        return cls(svc.classes_, mean, scale, support_vectors, pair_coef, intercept,
+                   svc._gamma, pair_pos, pair_neg)
+
+    def save(self, path):
+        """Store all arrays in an uncompressed .npz file."""
+        np.savez(
+            path,
+            classes=self.classes,
+            mean=self.mean,
+            scale=self.scale,
+            support_vectors=self.support_vectors,
+            pair_coef=self.pair_coef,
+            intercept=self.intercept,
+            gamma=np.float64(self.gamma),
+            pair_pos=self.pair_pos,
+            pair_neg=self.pair_neg,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["classes"], data["mean"], data["scale"], data["support_vectors"],
+                data["pair_coef"], data["intercept"], float(data["gamma"]),
+                data["pair_pos"], data["pair_neg"],
+            )
+
+    # ========= Inference =========
+    def decision_function(self, X):
+        """(N, n_features) -> (N, n_pairs) one-vs-one decision values."""
+        Xs = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        sq_dist = (np.einsum("ij,ij->i", Xs, Xs)[:, None]
+                   + self.sv_sq_norms
+                   - 2.0 * (Xs @ self.support_vectors.T))
+        np.maximum(sq_dist, 0.0, out=sq_dist)
+        kernel = np.exp(-self.gamma * sq_dist)
+        return kernel @ self.pair_coef.T + self.intercept
+
+    def predict(self, X):
+        """Batch prediction, same labels as SVC.predict."""
+        win = self.decision_function(X) > 0
+        votes = win @ self._pos_onehot + (~win) @ self._neg_onehot
+        return self.classes[np.argmax(votes, axis=1)]
+
+    def predict_one(self, features):
+        """Single-sample fast path for per-frame inference. Returns the raw class label."""
+        xs = (features - self.mean) / self.scale
+        sq_dist = (xs @ xs) + self.sv_sq_norms - 2.0 * (self.support_vectors @ xs)
+        kernel = np.exp(-self.gamma * np.maximum(sq_dist, 0.0))
+        win = (self.pair_coef @ kernel + self.intercept) > 0
+        votes = win @ self._pos_onehot + (~win) @ self._neg_onehot
+        return self.classes[np.argmax(votes)]
+
+
+# ========= Export / Verification =========
+def per_call_us(fn, samples, repeat=3):
+    """Mean time of fn(x) over samples in microseconds (best of `repeat` passes)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for x in samples:
+            fn(x)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(samples) * 1e6
+
+
+def main():
+    import joblib
+    import train_svm
+    from dataset import file_hash
+    from model_artifact import export_artifact
+
+    parser = argparse.ArgumentParser(description="Export the sklearn SVM pipeline to a flat NumPy engine")
+    parser.add_argument("--model", default=MODEL_FILE, help="trained sklearn pipeline (.joblib)")
+    parser.add_argument("--out", default=ENGINE_FILE, help="output engine file (.npz)")
+    parser.add_argument("--artifact", default=ARTIFACT_FILE, help="output model artifact (model_artifact.py)")
+    parser.add_argument("--test", default=TEST_CSV, help="CSV used to verify predictions")
+    parser.add_argument("--data", default=os.path.join(BASE_DIR, train_svm.DATA_FILE),
+                        help="training CSV of the model, recorded in the artifact")
+    args = parser.parse_args()
+
+    clf = joblib.load(args.model)
+    engine = RbfSvmEngine.from_pipeline(clf)
+    engine.save(args.out)
+    engine = RbfSvmEngine.load(args.out)
+    print(f"[Engine] Exported {args.model} -> {args.out} "
+          f"({engine.n_support} support vectors, {len(engine.intercept)} class pairs)")
+
+    X, y = train_svm.load_data(args.test)
+    ref = clf.predict(X)
+    batch = engine.predict(X)
+    single = np.array([engine.predict_one(x) for x in X])
+    mismatches = int(np.count_nonzero(ref != batch) + np.count_nonzero(ref != single))
+    print(f"[Engine] Verified on {len(X)} samples: {mismatches} label mismatches")
+    if mismatches:
+        raise SystemExit("[Engine] Engine predictions differ from the sklearn model")
+    # Same record as train_svm.py: training data hash and rows (seen by the scaler), test metrics
+    svc = clf.named_steps["svm"]
+    export_artifact(clf, args.artifact, file_hash(args.data), clf.named_steps["scaler"].n_samples_seen_,
+                    {"test_accuracy": float(np.mean(ref == y)),
+                     "params": {"kernel": svc.kernel, "C": svc.C, "gamma": svc.gamma}})
+    print(f"[Engine] Model artifact saved as: {args.artifact}")
+
+    samples = X[:500]
+    sk_us = per_call_us(lambda x: clf.predict([x]), samples)
+    eng_us = per_call_us(engine.predict_one, samples)
+    print(f"[Engine] sklearn Pipeline.predict([x]) : {sk_us:8.1f} us/call")
+    print(f"[Engine] RbfSvmEngine.predict_one(x)   : {eng_us:8.1f} us/call  ({sk_us / eng_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
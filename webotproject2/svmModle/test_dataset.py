@@ -0,0 +1,104 @@
+# test_dataset.py
+# The bulk CSV parser must read the same values as the csv.DictReader loop it replaced,
+# and the hash-keyed cache must never serve data of an older CSV.
+#   python -m pytest svmModle/test_dataset.py
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from dataset import cache_paths, file_hash, is_test_path, load_dataset, parse_csv
+from extract_features import FEATURE_COLUMNS, FEATURE_DIM
+
+
+def dictreader_parse(path):
+    """The original train_svm.py loader (skips blank lines)."""
+    X, y = [], []
+    with open(path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            X.append([float(row[key]) for key in FEATURE_COLUMNS])
+            y.append(int(row["label"]))
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.int32)
+
+
+def write_csv(path, rows, columns=None, newline="\n", blank_lines=()):
+    columns = columns or FEATURE_COLUMNS + ["label"]
+    lines = [",".join(columns)]
+    for i, row in enumerate(rows):
+        if i in blank_lines:
+            lines.append("")
+        lines.append(",".join(repr(float(row[c])) if c != "label" else str(int(row[c])) for c in columns))
+    with open(path, "w", newline="") as f:
+        f.write(newline.join(lines) + newline)
+
+
+def sample_rows(n=20, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        row = dict(zip(FEATURE_COLUMNS, rng.normal(0.0, 1.0, FEATURE_DIM)))
+        row["label"] = i % 6
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_matches_dictreader_with_blank_lines(tmp_path, newline):
+    path = str(tmp_path / "data.csv")
+    write_csv(path, sample_rows(), newline=newline, blank_lines=(0, 7, 8))
+    with open(path, "a", newline="") as f:
+        f.write(newline * 2)   # trailing empty lines
+    X, y = parse_csv(path)
+    X_ref, y_ref = dictreader_parse(path)
+    assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+    assert X.dtype == np.float32 and y.dtype == np.int32
+
+
+def test_columns_in_any_order_extra_columns_ignored(tmp_path):
+    path = str(tmp_path / "data.csv")
+    rows = sample_rows(seed=1)
+    for row in rows:
+        row["note"] = 1.0
+    columns = ["label", "note"] + FEATURE_COLUMNS[::-1]
+    write_csv(path, rows, columns=columns)
+    X, y = parse_csv(path)
+    X_ref, y_ref = dictreader_parse(path)
+    assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+
+
+def test_rejects_missing_columns_and_ragged_rows(tmp_path):
+    path = str(tmp_path / "missing.csv")
+    write_csv(path, sample_rows(), columns=FEATURE_COLUMNS[:-1] + ["label"])
+    with pytest.raises(ValueError, match="Missing columns"):
+        parse_csv(path)
+
+    path = str(tmp_path / "ragged.csv")
+    write_csv(path, sample_rows())
+    with open(path, "a", newline="") as f:
+        f.write("1.0,2.0\n")
+    with pytest.raises(ValueError, match="Ragged"):
+        parse_csv(path)
+
+
+def test_cache_roundtrip_and_invalidation(tmp_path):
+    path = str(tmp_path / "data.csv")
+    write_csv(path, sample_rows(seed=2))
+    X1, y1 = load_dataset(path)
+    x_path, y_path = cache_paths(path, file_hash(path))
+    assert os.path.exists(x_path) and os.path.exists(y_path)
+
+    X2, y2 = load_dataset(path)   # memory-mapped from the cache
+    assert isinstance(X2, np.memmap)
+    assert np.array_equal(X1, X2) and np.array_equal(y1, y2)
+
+    write_csv(path, sample_rows(n=30, seed=3))   # new content: new hash, parsed again
+    X3, y3 = load_dataset(path)
+    assert np.array_equal(X3, dictreader_parse(path)[0]) and len(y3) == 30
+    assert not os.path.exists(x_path)   # the stale cache entry was removed
+
+
+def test_is_test_path():
+    assert is_test_path(os.path.join("svmModle", "TEST", "gesture_test_data.csv"))
+    assert not is_test_path(os.path.join("svmModle", "gesture_data.csv"))
+    assert not is_test_path(os.path.join("svmModle", "TEST"))   # a file named TEST
@@ -0,0 +1,29 @@
+# test_evaluate.py
+# The NumPy metrics of evaluate.py must match sklearn's classification_report.
+#   python -m pytest svmModle/test_evaluate.py
+import numpy as np
+import pytest
+from sklearn.metrics import classification_report
+
+from evaluate import confusion, metrics_dict
+
+
+@pytest.mark.parametrize("case", ["same labels", "predicted only", "true only"])
+def test_matches_classification_report(case):
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 4, 200)
+    y_pred = np.where(rng.random(200) < 0.8, y_true, rng.integers(0, 4, 200))
+    if case == "predicted only":
+        y_pred[:5] = 5   # a class the test set does not contain
+    elif case == "true only":
+        y_true[:5] = 5   # a class the model never predicts
+    labels = sorted(set(y_true.tolist()) | set(y_pred.tolist()))
+    metrics = metrics_dict(confusion(y_true, y_pred, labels), labels)
+    ref = classification_report(y_true, y_pred, labels=labels, output_dict=True, zero_division=0)
+
+    assert metrics["accuracy"] == pytest.approx(np.mean(y_true == y_pred))
+    for key, ref_key in (("macro_avg", "macro avg"), ("weighted_avg", "weighted avg")):
+        for score, ref_score in (("precision", "precision"), ("recall", "recall"), ("f1", "f1-score")):
+            assert metrics[key][score] == pytest.approx(ref[ref_key][ref_score])
+    for s in metrics["per_class"].values():
+        assert s["f1"] == pytest.approx(ref[str(s["label"])]["f1-score"])
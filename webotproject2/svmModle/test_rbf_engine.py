@@ -0,0 +1,60 @@
+# test_rbf_engine.py
+# RbfSvmEngine must give exactly the labels of the sklearn pipeline it was built from.
+#   python -m pytest svmModle/test_rbf_engine.py
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from dataset import load_dataset
+from rbf_engine import MODEL_FILE, TEST_CSV, RbfSvmEngine
+
+
+def fit_pipeline(n_classes, seed=0, n=60, dim=42):
+    rng = np.random.default_rng(seed)
+    y = np.repeat(np.arange(n_classes), n)
+    X = rng.normal(0.0, 1.0, (len(y), dim)) + y[:, None] * 0.8
+    model = Pipeline([("scaler", StandardScaler()), ("svm", SVC(kernel="rbf", C=10.0, gamma="scale"))])
+    return model.fit(X, y), X
+
+
+@pytest.mark.skipif(not (os.path.exists(MODEL_FILE) and os.path.exists(TEST_CSV)),
+                    reason="shipped model or test CSV missing")
+def test_matches_shipped_model_on_test_csv():
+    model = joblib.load(MODEL_FILE)
+    X, _ = load_dataset(TEST_CSV, use_cache=False)
+    engine = RbfSvmEngine.from_pipeline(model)
+    ref = model.predict(X)
+    assert np.array_equal(engine.predict(X), ref)
+    assert np.array_equal([engine.predict_one(x) for x in np.asarray(X, dtype=np.float64)], ref)
+
+
+@pytest.mark.parametrize("n_classes", [2, 3, 6])
+def test_matches_svc_predict(n_classes):
+    # Two classes exercise libsvm's flipped sign convention for binary problems
+    model, X = fit_pipeline(n_classes)
+    engine = RbfSvmEngine.from_pipeline(model)
+    ref = model.predict(X)
+    assert np.array_equal(engine.predict(X), ref)
+    assert np.array_equal([engine.predict_one(x) for x in X], ref)
+
+
+def test_save_load_roundtrip(tmp_path):
+    model, X = fit_pipeline(4, seed=1)
+    engine = RbfSvmEngine.from_pipeline(model)
+    path = str(tmp_path / "engine.npz")
+    engine.save(path)
+    loaded = RbfSvmEngine.load(path)
+    assert np.array_equal(loaded.predict(X), engine.predict(X))
+    assert loaded.gamma == engine.gamma
+
+
+def test_rejects_other_kernels():
+    model = Pipeline([("scaler", StandardScaler()), ("svm", SVC(kernel="linear"))])
+    model.fit(np.eye(4), [0, 1, 0, 1])
+    with pytest.raises(ValueError):
+        RbfSvmEngine.from_pipeline(model)
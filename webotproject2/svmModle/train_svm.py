@@ -1,5 +1,8 @@
 # train_svm.py
-import csv
+import argparse
+import json
+import os
+
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -8,35 +11,58 @@ from sklearn.pipeline import Pipeline
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 
+from augment import MIRROR_PROB, augment_stream, fit_stream
+from compact_svm import METHODS as COMPACT_METHODS, compact
+from dataset import file_hash, load_dataset
+from hyperparam_search import DEFAULT_C, DEFAULT_GAMMA, KERNELS, print_table, search
+from model_artifact import export_artifact
+from rbf_engine import RbfSvmEngine
+
 DATA_FILE = "gesture_data.csv"
 MODEL_FILE = "svmModel.joblib"   # output model filename
+ENGINE_FILE = "svmModel_engine.npz"   # flat NumPy inference engine used by the client
+ARTIFACT_FILE = "svmModel_artifact.bin"   # versioned, memory-mappable engine + metadata (model_artifact.py)
+SEARCH_REPORT_FILE = "svm_search_results.json"   # ranked table written by --search
+
+# Default model (used unless --search picks another one)
+DEFAULT_PARAMS = {"kernel": "rbf", "C": 10.0, "gamma": "scale"}
+# Share of the training split held out to choose the compaction step (--max-sv / --max-drop)
+VAL_SIZE = 0.2
 
 
 def load_data(csv_path):
-    X = []
-    y = []
-
-    with open(csv_path, "r", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            features = []
-            for key in row.keys():
-                # extract features: f0, f1, ..., f41
-                if key.startswith("f"):
-                    features.append(float(row[key]))
-            label = int(row["label"])
-            X.append(features)
-            y.append(label)
-
-    X = np.array(X, dtype=np.float32)
-    y = np.array(y, dtype=np.int32)
-
-    print(f"[INFO] Loaded data from {csv_path}")
+    # Bulk CSV parse, cached as memory-mapped .npy files keyed on the file hash (dataset.py)
+    X, y = load_dataset(csv_path)
     print(f"[INFO] X shape: {X.shape}, y shape: {y.shape}")
     return X, y
 
 
-def main():
+def parse_gamma(value):
+    return value if value == "scale" else float(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the gesture SVM")
+    parser.add_argument("--search", action="store_true",
+                        help="cross-validated C/gamma/kernel search, train the best candidate")
+    parser.add_argument("--folds", type=int, default=5, help="stratified folds for --search")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--kernels", nargs="+", choices=KERNELS, default=["rbf"])
+    parser.add_argument("--C", nargs="+", type=float, default=DEFAULT_C, dest="c_values")
+    parser.add_argument("--gamma", nargs="+", type=parse_gamma, default=DEFAULT_GAMMA, dest="gamma_values")
+    parser.add_argument("--augment", type=int, default=0, metavar="N",
+                        help="continue training on N augmented samples, streamed in batches (augment.py)")
+    parser.add_argument("--no-mirror", action="store_true", help="no mirrored (other hand) samples")
+    parser.add_argument("--max-sv", type=int, default=None,
+                        help="compact the model to at most this many support vectors (compact_svm.py)")
+    parser.add_argument("--max-drop", type=float, default=None,
+                        help="compact the model while the validation accuracy drops by at most this much")
+    parser.add_argument("--compact-method", choices=COMPACT_METHODS, default="prune")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     X, y = load_data(DATA_FILE)
 
     # Split into training and testing sets
@@ -47,18 +73,53 @@ def main():
         stratify=y
     )
 
-    # Standardization + SVM (RBF kernel)
+    # Compaction is judged on a validation split of the training data, never on the test split
+    compacting = args.max_sv is not None or args.max_drop is not None
+    if compacting:
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_train, y_train,
+            test_size=VAL_SIZE,
+            random_state=42,
+            stratify=y_train
+        )
+        print(f"[INFO] Validation split for compaction: {len(y_val)} samples")
+
+    params = DEFAULT_PARAMS
+    if args.search:
+        # Only the training split is searched; the test split stays untouched for the report below
+        rows = search(X_train, y_train, args.kernels, args.c_values, args.gamma_values,
+                      args.folds, args.jobs)
+        print_table(rows)
+        with open(SEARCH_REPORT_FILE, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"[INFO] Search results saved as: {SEARCH_REPORT_FILE}")
+        params = {key: rows[0][key] for key in ("kernel", "C", "gamma")}
+        print(f"[INFO] Selected: {params}")
+
+    # Standardization + SVM
     svm_clf = Pipeline([
         ("scaler", StandardScaler()),
         ("svm", SVC(
-            kernel="rbf",
-            C=10.0,
-            gamma="scale"
+            kernel=params["kernel"],
+            C=params["C"],
+            gamma=params["gamma"]
         ))
     ])
 
     print("[INFO] Training SVM model...")
     svm_clf.fit(X_train, y_train)
+    print(f"[INFO] Support vectors: {svm_clf.named_steps['svm'].support_.size} "
+          f"(per class {svm_clf.named_steps['svm'].n_support_.tolist()})")
+
+    if args.augment:
+        mirror = 0.0 if args.no_mirror else MIRROR_PROB
+        stream = augment_stream(X_train, y_train, args.augment, seed=42, mirror=mirror)
+        svm_clf = fit_stream(svm_clf, stream)
+
+    # Optional support-vector reduction; inference cost grows with the number of SVs
+    if compacting and params["kernel"] == "rbf":
+        svm_clf, _ = compact(svm_clf, X_val, y_val, args.max_sv, args.max_drop, args.compact_method)
+        print(f"[INFO] Compacted to {svm_clf.named_steps['svm'].support_.size} support vectors")
 
     print("[INFO] Evaluating on test set...")
     y_pred = svm_clf.predict(X_test)
@@ -68,11 +129,26 @@ def main():
 
     print("\n[RESULT] Classification Report:")
     print(classification_report(y_test, y_pred, digits=4))
+    test_accuracy = float(np.mean(y_pred == y_test))
 
     # Save trained model
     joblib.dump(svm_clf, MODEL_FILE)
     print(f"\n[INFO] Model saved as: {MODEL_FILE}")
 
+    # Export the flat inference engine and artifact so the client stays in sync with the model
+    if params["kernel"] == "rbf":
+        RbfSvmEngine.from_pipeline(svm_clf).save(ENGINE_FILE)
+        print(f"[INFO] Inference engine saved as: {ENGINE_FILE}")
+        export_artifact(svm_clf, ARTIFACT_FILE, file_hash(DATA_FILE), len(y_train),
+                        {"test_accuracy": test_accuracy, "params": params})
+        print(f"[INFO] Model artifact saved as: {ARTIFACT_FILE}")
+    else:
+        # A stale engine would not match the new model; the client falls back to sklearn
+        for path in (ENGINE_FILE, ARTIFACT_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"[INFO] {params['kernel']} kernel has no NumPy engine, removed {path}")
+
 
 if __name__ == "__main__":
     main()
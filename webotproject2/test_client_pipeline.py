@@ -0,0 +1,42 @@
+# test_client_pipeline.py
+# LatestQueue keeps only the newest items and never blocks the producer.
+#   python -m pytest test_client_pipeline.py
+import queue
+import threading
+
+import pytest
+
+from client_pipeline import LatestQueue
+
+
+def test_put_overwrites_the_oldest_item():
+    q = LatestQueue(maxsize=1)
+    for i in range(5):
+        q.put(i)
+    assert q.get_nowait() == 4
+    assert q.put_count == 5 and q.dropped == 4
+    with pytest.raises(queue.Empty):
+        q.get_nowait()
+
+
+def test_keeps_the_newest_items_in_order():
+    q = LatestQueue(maxsize=2)
+    for i in range(4):
+        q.put(i)
+    assert [q.get(timeout=0), q.get(timeout=0)] == [2, 3]
+    assert q.dropped == 2
+
+
+def test_get_times_out_when_empty():
+    with pytest.raises(queue.Empty):
+        LatestQueue().get(timeout=0.01)
+
+
+def test_get_wakes_up_on_put():
+    q = LatestQueue()
+    timer = threading.Timer(0.05, q.put, args=("frame",))
+    timer.start()
+    try:
+        assert q.get(timeout=2.0) == "frame"
+    finally:
+        timer.cancel()
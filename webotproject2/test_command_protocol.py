@@ -0,0 +1,80 @@
+# test_command_protocol.py
+# FrameDecoder must deliver the same frames whatever the chunking of the stream.
+#   python -m pytest test_command_protocol.py
+import pytest
+
+from command_protocol import (
+    COMMAND_OPCODES,
+    LENGTH,
+    MAX_FRAME_SIZE,
+    OP_HELLO,
+    OP_VELOCITY,
+    FrameDecoder,
+    ProtocolError,
+    command_name,
+    decode_hello,
+    decode_velocity,
+    encode_command,
+    encode_frame,
+    encode_hello,
+    encode_velocity,
+)
+
+
+def sample_stream():
+    return [
+        encode_hello("tester", 5, 0, sent_at=1.0),
+        encode_command("FORWARD", 1, sent_at=2.0),
+        encode_velocity(0.25, -1.5, 2, sent_at=3.0, body=b"trace"),
+        encode_command("STOP", 3, sent_at=4.0, body=b"x" * 300),
+    ]
+
+
+def test_one_chunk_with_several_frames():
+    frames = FrameDecoder().feed(b"".join(sample_stream()))
+    assert [f.seq for f in frames] == [0, 1, 2, 3]
+    assert frames[0].opcode == OP_HELLO and decode_hello(frames[0]) == ("tester", 5)
+    assert command_name(frames[1]) == "FORWARD" and frames[1].sent_at == 2.0
+    assert frames[2].opcode == OP_VELOCITY
+    assert decode_velocity(frames[2])[:2] == pytest.approx((0.25, -1.5))
+    assert frames[3].body == b"x" * 300
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 7, 64])
+def test_partial_reads_reassemble(chunk):
+    data = b"".join(sample_stream())
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(0, len(data), chunk):
+        frames.extend(decoder.feed(data[i:i + chunk]))
+    assert frames == FrameDecoder().feed(data)
+    assert decoder.frames == len(frames)
+
+
+def test_incomplete_frame_waits_for_more_data():
+    frame = encode_command("TURN_LEFT", 9)
+    decoder = FrameDecoder()
+    assert decoder.feed(frame[:-1]) == []
+    (decoded,) = decoder.feed(frame[-1:])
+    assert decoded.opcode == COMMAND_OPCODES["TURN_LEFT"] and decoded.seq == 9
+
+
+@pytest.mark.parametrize("length", [0, 1, 12])
+def test_rejects_lengths_shorter_than_the_header(length):
+    with pytest.raises(ProtocolError):
+        FrameDecoder().feed(LENGTH.pack(length) + bytes(16))
+
+
+def test_rejects_oversized_and_unknown_frames():
+    with pytest.raises(ProtocolError):
+        encode_frame(0x01, 0, 0.0, bytes(MAX_FRAME_SIZE))
+    with pytest.raises(ProtocolError):
+        encode_command("JUMP", 0)
+    (short,) = FrameDecoder().feed(encode_frame(OP_VELOCITY, 0, 0.0, b"abc"))
+    with pytest.raises(ProtocolError):
+        decode_velocity(short)
+
+
+def test_sequence_number_wraps():
+    (frame,) = FrameDecoder().feed(encode_command("STOP", 2 ** 32 + 5))
+    assert frame.seq == 5
@@ -0,0 +1,411 @@
+# transport.py
+# Pluggable command transports between gesture_client.py and the controller.
+#
+#   tcp  stream socket with TCP_NODELAY (default, also works across hosts)
+#   udp  one datagram per command frame, no connection setup; lost frames are
+#        counted by the controller's SequenceTracker. A client that crashed never
+#        sends its close datagram, so the server drops clients silent for
+#        UDP_IDLE_TIMEOUT; live clients call CommandSender.keepalive() every frame,
+#        which repeats their HELLO when they have sent nothing for half of it
+#   shm  single-producer / single-consumer byte ring in shared memory, same host
+#        only, no system call per command
+#
+# Client side: connect(kind) returns an object with sendall(data) / close(), which
+# CommandSender uses in place of a socket.
+# Server side: create_server(kind) returns an object whose poll() never blocks and
+# returns a list of (event, client, value) tuples, client being an id unique per server:
+#   (CONNECT, client, peer)  (FRAME, client, Frame)  (DISCONNECT, client, reason)
+# tcp and udp serve any number of concurrent clients; shm has a single writer.
+import selectors
+import socket
+import struct
+import time
+from multiprocessing import shared_memory
+
+from command_protocol import FrameDecoder, ProtocolError
+from latency_stats import clock
+
+TRANSPORTS = ("tcp", "udp", "shm")
+DEFAULT_TRANSPORT = "tcp"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 10020
+
+CONNECT = "connect"
+FRAME = "frame"
+DISCONNECT = "disconnect"
+
+RECV_SIZE = 65536
+UDP_IDLE_TIMEOUT = 30.0   # s without a datagram before the UDP server drops a client
+UDP_EXPIRY_INTERVAL = 1.0 # s between idle checks
+
+# ========= Shared-memory ring layout =========
+# [0:16)    magic u32, capacity u32, session u32, writer_state u32
+# [64:72)   write_pos u64 (written by the client only)
+# [128:136) read_pos  u64 (written by the server only)
+# [192:)    data, `capacity` bytes; positions grow monotonically, offset = pos % capacity
+# Positions are published after the bytes they cover, so the reader never sees a
+# partial frame. They live on separate cache lines to avoid false sharing and use
+# native struct formats: those copy the aligned 8 bytes at once, while standard
+# ("=", "<") formats pack byte by byte and the other process could read a torn value.
+SHM_NAME = "group46_commands"
+SHM_CAPACITY = 1 << 20
+SHM_MAGIC = 0x47343643
+SHM_SEND_TIMEOUT = 1.0   # s, sendall gives up when the ring stays full this long
+RING_INFO = struct.Struct("IIII")
+RING_POS = struct.Struct("Q")
+WRITE_POS_OFFSET = 64
+READ_POS_OFFSET = 128
+DATA_OFFSET = 192
+
+
+# ========= TCP =========
+class TcpClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.sock = socket.create_connection((host, port))
+        # Commands are tiny: send each one immediately instead of waiting for Nagle
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.peer = f"tcp://{host}:{port}"
+
+    def sendall(self, data):
+        self.sock.sendall(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class TcpServer:
+    """
+    Event-driven server: the listening socket and every client share one selector,
+    so poll() is a single select(0) call however many clients are connected and
+    idle clients cost nothing. Each client has its own FrameDecoder.
+    """
+
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT, backlog=8):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(backlog)
+        self.sock.setblocking(False)
+        self.address = f"tcp://{host}:{port}"
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ, None)
+        self.clients = {}   # client id -> (socket, FrameDecoder)
+        self._next_id = 1
+
+    def _accept(self, events):
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            conn.setblocking(False)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = self._next_id
+            self._next_id += 1
+            self.clients[client] = (conn, FrameDecoder())
+            self.selector.register(conn, selectors.EVENT_READ, client)
+            events.append((CONNECT, client, addr))
+
+    def _drop(self, client, events, reason):
+        conn, _ = self.clients.pop(client)
+        self.selector.unregister(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
+        events.append((DISCONNECT, client, reason))
+
+    def _read(self, client, events):
+        conn, decoder = self.clients[client]
+        try:
+            # One recv per ready client and poll keeps a flooding client from starving
+            # the others; whatever is left is still readable on the next poll
+            data = conn.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._drop(client, events, f"error: {e}")
+            return
+        if not data:
+            self._drop(client, events, "closed by client")
+            return
+        try:
+            # A partial frame stays in the decoder until the rest arrives
+            events.extend((FRAME, client, frame) for frame in decoder.feed(data))
+        except ProtocolError as e:
+            self._drop(client, events, f"error: {e}")
+
+    def poll(self):
+        events = []
+        for key, _ in self.selector.select(0):
+            if key.data is None:
+                self._accept(events)
+            else:
+                self._read(key.data, events)
+        return events
+
+    def close(self):
+        for conn, _ in self.clients.values():
+            conn.close()
+        self.clients.clear()
+        self.selector.close()
+        self.sock.close()
+
+
+# ========= UDP =========
+class UdpClient:
+    """One datagram per frame; an empty datagram tells the server the client is gone."""
+
+    idle_timeout = UDP_IDLE_TIMEOUT   # server side expiry, see CommandSender
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect((host, port))
+        self.peer = f"udp://{host}:{port}"
+
+    def sendall(self, data):
+        self.sock.send(data)
+
+    def close(self):
+        try:
+            self.sock.send(b"")
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class UdpServer:
+    """
+    Datagrams are self-contained frames; every source address is a separate client.
+    Clients are dropped on their close datagram or after idle_timeout without one.
+    """
+
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT, idle_timeout=UDP_IDLE_TIMEOUT):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.address = f"udp://{host}:{port}"
+        self.clients = {}   # source address -> client id
+        self.last_seen = {} # source address -> clock() of its last datagram
+        self.idle_timeout = idle_timeout
+        self._next_id = 1
+        self._next_expiry = clock() + UDP_EXPIRY_INTERVAL
+
+    def poll(self):
+        events = []
+        now = clock()
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                # e.g. ICMP port unreachable reported on Windows; datagrams are independent
+                print(f"[Transport] UDP receive error: {e}")
+                break
+
+            client = self.clients.get(addr)
+            if not data:
+                if client is not None:
+                    del self.clients[addr]
+                    del self.last_seen[addr]
+                    events.append((DISCONNECT, client, "closed by client"))
+                continue
+            self.last_seen[addr] = now
+            if client is None:
+                client = self.clients[addr] = self._next_id
+                self._next_id += 1
+                events.append((CONNECT, client, addr))
+            try:
+                events.extend((FRAME, client, frame) for frame in FrameDecoder().feed(data))
+            except ProtocolError as e:
+                print(f"[Transport] Dropped malformed datagram from {addr}: {e}")
+        if now >= self._next_expiry:
+            self._next_expiry = now + UDP_EXPIRY_INTERVAL
+            for addr, seen in list(self.last_seen.items()):
+                if now - seen > self.idle_timeout:
+                    del self.last_seen[addr]
+                    events.append((DISCONNECT, self.clients.pop(addr), f"idle for {now - seen:.0f} s"))
+        return events
+
+    def close(self):
+        self.sock.close()
+
+
+# ========= Shared memory =========
+def _ring_copy_in(buf, capacity, pos, data):
+    offset = pos % capacity
+    first = min(len(data), capacity - offset)
+    buf[DATA_OFFSET + offset:DATA_OFFSET + offset + first] = data[:first]
+    if first < len(data):
+        buf[DATA_OFFSET:DATA_OFFSET + len(data) - first] = data[first:]
+
+
+def _ring_copy_out(buf, capacity, pos, n):
+    offset = pos % capacity
+    first = min(n, capacity - offset)
+    data = bytes(buf[DATA_OFFSET + offset:DATA_OFFSET + offset + first])
+    if first < n:
+        data += bytes(buf[DATA_OFFSET:DATA_OFFSET + n - first])
+    return data
+
+
+def _attach_shared_memory(name):
+    """Attach without registering the segment for cleanup at exit (the server owns it)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python >= 3.13
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class ShmClient:
+    """Writer side of the ring. The server must be running (it creates the segment)."""
+
+    def __init__(self, name=SHM_NAME):
+        try:
+            self.shm = _attach_shared_memory(name)
+        except FileNotFoundError:
+            raise ConnectionRefusedError(f"No shared-memory ring named {name!r} (controller not running?)") from None
+        buf = self.shm.buf
+        magic, self.capacity, session, _ = RING_INFO.unpack_from(buf, 0)
+        if magic != SHM_MAGIC:
+            self.shm.close()
+            raise ConnectionRefusedError(f"Shared memory {name!r} is not a command ring")
+        (self.write_pos,) = RING_POS.unpack_from(buf, WRITE_POS_OFFSET)
+        RING_INFO.pack_into(buf, 0, magic, self.capacity, (session + 1) & 0xFFFFFFFF, 1)
+        self.peer = f"shm://{name}"
+
+    def sendall(self, data):
+        n = len(data)
+        if n > self.capacity:
+            raise ProtocolError(f"Frame of {n} bytes does not fit the ring")
+        buf = self.shm.buf
+        deadline = None
+        while True:
+            (read_pos,) = RING_POS.unpack_from(buf, READ_POS_OFFSET)
+            if self.capacity - (self.write_pos - read_pos) >= n:
+                break
+            now = clock()
+            if deadline is None:
+                deadline = now + SHM_SEND_TIMEOUT
+            elif now > deadline:
+                raise TimeoutError("Shared-memory ring full (controller not reading)")
+            time.sleep(0)
+
+        _ring_copy_in(buf, self.capacity, self.write_pos, data)
+        self.write_pos += n
+        RING_POS.pack_into(buf, WRITE_POS_OFFSET, self.write_pos)
+
+    def close(self):
+        if self.shm is None:
+            return
+        magic, capacity, session, _ = RING_INFO.unpack_from(self.shm.buf, 0)
+        RING_INFO.pack_into(self.shm.buf, 0, magic, capacity, session, 0)
+        self.shm.close()
+        self.shm = None
+
+
+class ShmServer:
+    """Creates (and at close() removes) the ring; a new client session resets the decoder."""
+
+    def __init__(self, name=SHM_NAME, capacity=SHM_CAPACITY):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=DATA_OFFSET + capacity)
+        except FileExistsError:
+            # Left over from a controller that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=DATA_OFFSET + capacity)
+        self.capacity = capacity
+        buf = self.shm.buf
+        buf[:DATA_OFFSET] = bytes(DATA_OFFSET)
+        RING_INFO.pack_into(buf, 0, SHM_MAGIC, capacity, 0, 0)
+        self.address = f"shm://{name}"
+        self.read_pos = 0
+        self.session = 0
+        self.connected = False
+        self.decoder = None
+
+    def poll(self):
+        events = []
+        buf = self.shm.buf
+        _, _, session, writer_state = RING_INFO.unpack_from(buf, 0)
+        if session != self.session:
+            if self.connected:
+                events.append((DISCONNECT, self.session, "replaced by a new client"))
+            self.session = session
+            self.connected = True
+            self.decoder = FrameDecoder()
+            events.append((CONNECT, session, f"session {session}"))
+
+        (write_pos,) = RING_POS.unpack_from(buf, WRITE_POS_OFFSET)
+        pending = write_pos - self.read_pos
+        if pending < 0 or pending > self.capacity:
+            # No writer can get there: the ring is corrupt, resynchronize on the write position
+            self._consume(write_pos)
+            self._drop(events, f"error: corrupt ring ({pending} bytes pending, capacity {self.capacity})")
+            return events
+        if pending > 0:
+            if self.decoder is None:
+                # Session dropped after an error: discard its bytes so the writer never blocks
+                self._consume(write_pos)
+            else:
+                data = _ring_copy_out(buf, self.capacity, self.read_pos, pending)
+                self._consume(write_pos)
+                try:
+                    events.extend((FRAME, self.session, frame) for frame in self.decoder.feed(data))
+                except ProtocolError as e:
+                    self._drop(events, f"error: {e}")
+                    return events
+
+        if self.connected and not writer_state:
+            self.connected = False
+            events.append((DISCONNECT, self.session, "closed by client"))
+        return events
+
+    def _consume(self, pos):
+        self.read_pos = pos
+        RING_POS.pack_into(self.shm.buf, READ_POS_OFFSET, pos)
+
+    def _drop(self, events, reason):
+        """Disconnect the current session; its further bytes are discarded until a new one starts."""
+        self.decoder = None
+        if self.connected:
+            self.connected = False
+            events.append((DISCONNECT, self.session, reason))
+        else:
+            print(f"[Transport] Shared-memory ring: {reason}")
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# ========= Factories =========
+def connect(kind=DEFAULT_TRANSPORT, host=DEFAULT_HOST, port=DEFAULT_PORT, shm_name=SHM_NAME):
+    """Client end of a transport; raises OSError if the server is not reachable."""
+    if kind == "tcp":
+        return TcpClient(host, port)
+    if kind == "udp":
+        return UdpClient(host, port)
+    if kind == "shm":
+        return ShmClient(shm_name)
+    raise ValueError(f"Unknown transport {kind!r}, expected one of {TRANSPORTS}")
+
+
+def create_server(kind=DEFAULT_TRANSPORT, host="0.0.0.0", port=DEFAULT_PORT, shm_name=SHM_NAME):
+    if kind == "tcp":
+        return TcpServer(host, port)
+    if kind == "udp":
+        return UdpServer(host, port)
+    if kind == "shm":
+        return ShmServer(shm_name)
+    raise ValueError(f"Unknown transport {kind!r}, expected one of {TRANSPORTS}")
@@ -0,0 +1,67 @@
+# velocity_stream.py
+# Continuous control: map the hand pose of every frame to a (linear, angular) velocity setpoint.
+#
+#   linear  <- vertical position of the palm centre (hand high = forward, low = backward)
+#   angular <- tilt of the hand (wrist -> middle finger MCP), tilted left = turn left
+# Both use a dead zone around the neutral pose and exponential smoothing.
+import math
+
+import numpy as np
+
+MAX_LINEAR = 0.12        # m/s  (e-puck: 6.28 rad/s * 0.0205 m ~ 0.129 m/s)
+MAX_ANGULAR = 3.0        # rad/s
+
+NEUTRAL_Y = 0.5          # palm centre height (normalized) that means "stand still"
+Y_RANGE = 0.3            # offset from NEUTRAL_Y that gives full speed
+MAX_TILT = math.radians(45.0)  # tilt that gives full turn rate
+DEAD_ZONE = 0.15         # fraction of the range ignored around neutral
+
+FRAME_ASPECT = 640.0 / 480.0   # width / height, landmarks are normalized per axis
+
+PALM_LANDMARKS = [0, 5, 9, 13, 17]
+WRIST = 0
+MIDDLE_MCP = 9
+
+
+def apply_dead_zone(x, dead_zone=DEAD_ZONE):
+    """Clamp x to [-1, 1], zero inside the dead zone and rescale the rest to stay continuous."""
+    x = max(-1.0, min(1.0, x))
+    if abs(x) <= dead_zone:
+        return 0.0
+    return math.copysign((abs(x) - dead_zone) / (1.0 - dead_zone), x)
+
+
+def hand_to_velocity(points, aspect=FRAME_ASPECT):
+    """
+    points: (21, 2|3) landmark array in frame-normalized coordinates.
+    Returns the raw (linear m/s, angular rad/s) setpoint for this frame.
+    """
+    palm_y = float(np.mean(points[PALM_LANDMARKS, 1]))
+    linear = MAX_LINEAR * apply_dead_zone((NEUTRAL_Y - palm_y) / Y_RANGE)
+
+    # Tilt in pixel space (x and y are normalized by different frame sizes); image y points down
+    dx = (points[MIDDLE_MCP, 0] - points[WRIST, 0]) * aspect
+    dy = points[WRIST, 1] - points[MIDDLE_MCP, 1]
+    tilt = math.atan2(dx, dy)   # 0 = upright, > 0 = tilted to the right
+    angular = -MAX_ANGULAR * apply_dead_zone(tilt / MAX_TILT)
+    return linear, angular
+
+
+class VelocityFilter:
+    """Exponential smoothing of the setpoint; reset() when the hand is lost."""
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.linear = 0.0
+        self.angular = 0.0
+
+    def update(self, linear, angular):
+        a = self.alpha
+        self.linear += a * (linear - self.linear)
+        self.angular += a * (angular - self.angular)
+        return self.linear, self.angular
+
+    def reset(self):
+        self.linear = 0.0
+        self.angular = 0.0
+        return 0.0, 0.0